@@ -13,7 +13,6 @@ Application en une seule page (défilement vertical), organisée en 3 blocs :
 Les 3 blocs sont fonctionnels.
 """
 
-import io
 import os
 import tempfile
 
@@ -21,6 +20,7 @@ import streamlit as st
 
 from sources_to_evenements import generate_evenements, MOIS_FR_CAP
 from generate_planning_excel_septembre import generer
+from lecture_xlsx import ouvrir_classeur
 from planning_checker import verifier_planning, resumer, lire_jours_semaine, JOUR_CAPITALISE
 from regeneration_lecture import (
     lire_planning_pour_regeneration, resumer_lecture, ErreurRegeneration,
@@ -83,8 +83,7 @@ def _save_uploaded_list(uploaded_files, tmp_dir):
 def _lister_semaines_disponibles(file_bytes):
     """Repère les onglets 'Semaine_N' présents dans le fichier (juste les
     noms d'onglets, lecture très légère) pour remplir le sélecteur."""
-    import openpyxl as _openpyxl
-    wb = _openpyxl.load_workbook(io.BytesIO(file_bytes), read_only=True)
+    wb = ouvrir_classeur(file_bytes)
     numeros = []
     for nom in wb.sheetnames:
         if nom.startswith("Semaine_") and nom[8:].isdigit():
@@ -96,8 +95,7 @@ def _lister_semaines_disponibles(file_bytes):
 def _lister_jours_disponibles(file_bytes, semaine_num):
     """Repère les jours présents dans l'onglet 'Semaine_N' choisi, avec leur
     date, pour remplir le sélecteur de jours à régénérer."""
-    import openpyxl as _openpyxl
-    wb = _openpyxl.load_workbook(io.BytesIO(file_bytes), data_only=True)
+    wb = ouvrir_classeur(file_bytes)
     ws = wb[f"Semaine_{semaine_num}"]
     jours_data = lire_jours_semaine(ws)
     wb.close()
@@ -357,6 +355,41 @@ if submitted_b2:
         else:
             st.success("Aucune alerte : tous les créneaux ont été couverts.")
 
+        # ── Profil du calcul : quels jours / quelles passes prennent le temps ──
+        profil = metadata.get("profil")
+        if profil:
+            mois = profil["mois"]
+            with st.expander(
+                f"⏱️ Profil du calcul — {mois['temps']:.1f} s de calcul, "
+                f"{mois['plafonds']} jour(s) arrêté(s) par la limite de temps"
+            ):
+                st.markdown("**Par passe** (tout le mois)")
+                st.table([
+                    {
+                        "Passe": nom,
+                        "Nombre": a["nombre"],
+                        "Temps total (s)": round(a["temps"], 2),
+                        "Temps max (s)": round(a["temps_max"], 2),
+                        "Limite atteinte": a["plafonds"],
+                        "Écart max à l'optimum": a["ecart_max"],
+                    }
+                    for nom, a in mois["par_passe"].items()
+                ])
+                st.markdown("**Par semaine**")
+                st.table([
+                    {
+                        "Semaine": s["semaine"],
+                        "Jours": s["jours"],
+                        "Temps (s)": round(s["temps"], 2),
+                        "Limite atteinte": s["plafonds"],
+                        "Jours repris": s["repris"],
+                    }
+                    for s in profil["semaines"]
+                ])
+                st.markdown("**Jours les plus longs**")
+                for date_str, temps in mois["jours_les_plus_longs"]:
+                    st.markdown(f"- {date_str} : {temps:.2f} s")
+
         # ── Nom de fichier dynamique : Planning_MoisAnnée.xlsx, déduit de la
         # première date réellement présente dans le planning calculé ──
         premiere_date = weeks_data[0]["jours"][0]["date"]  # 'YYYY-MM-DD'
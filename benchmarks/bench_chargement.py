@@ -0,0 +1,114 @@
+"""
+bench_chargement.py — Chargement d'un fichier de préparation : classeur
+openpyxl complet (load_excel_data) contre lecture en flux
+(load_excel_data(lecture_seule=True), cf. lecture_xlsx), parsing compris
+(_contexte_calcul + parse_horaires_ouverture, comme ContextePreparation).
+
+Usage :
+    python benchmarks/bench_chargement.py [preparation.xlsx ...]
+        [--agents 16 64 160] [--pas 15] [--evenements 20] [-n 3]
+
+Sans fichier, des fichiers synthétiques (cf. generer_preparation.py) sont
+générés pour chaque nombre d'agents de --agents, au pas et à la densité
+d'événements donnés — de quoi grossir nettement les onglets Événements,
+Planning_type et Horaires_Des_Agents. Affiche par fichier et par mode : la
+durée médiane de n chargements, le pic de mémoire Python (tracemalloc, sur
+un chargement à part : le traçage ralentit la mesure du temps), et « ≠ »
+si les données parsées diffèrent de celles du mode complet.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generer_preparation import generer_preparation  # noqa: E402
+from planning_engine_cpsat import (  # noqa: E402
+    _contexte_calcul, load_excel_data, parse_horaires_ouverture,
+)
+
+MODES = {'complet': False, 'en flux': True}
+
+
+def charger(filepath, lecture_seule):
+    feuilles = load_excel_data(filepath, lecture_seule=lecture_seule)
+    contexte = _contexte_calcul(feuilles)
+    horaires_ouverture = parse_horaires_ouverture(feuilles)
+    if lecture_seule:
+        for ws in feuilles.values():
+            ws.parent.close()
+    return contexte, horaires_ouverture
+
+
+def comparable(valeur):
+    """Données parsées comparables d'un mode à l'autre (les objets, ex.
+    l'index des événements, par leurs attributs)."""
+    if isinstance(valeur, dict):
+        return {k: comparable(v) for k, v in valeur.items()}
+    if isinstance(valeur, (list, tuple)):
+        return [comparable(v) for v in valeur]
+    if hasattr(valeur, '__dict__'):
+        return comparable(vars(valeur))
+    return valeur
+
+
+def mesurer(filepath, lecture_seule, repetitions):
+    durees = []
+    for _ in range(repetitions):
+        t0 = time.perf_counter()
+        resultat = charger(filepath, lecture_seule)
+        durees.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    charger(filepath, lecture_seule)
+    pic = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(durees), pic, comparable(resultat)
+
+
+def comparer(filepath, repetitions):
+    taille = os.path.getsize(filepath) / 1024
+    print(f'\n{os.path.basename(filepath)} ({taille:.0f} Ko)')
+    print(f'{"mode":<10}{"durée":>9}{"mémoire":>11}')
+    reference = None
+    for mode, lecture_seule in MODES.items():
+        duree, pic, donnees = mesurer(filepath, lecture_seule, repetitions)
+        if reference is None:
+            reference = (duree, pic, donnees)
+            ecarts = ''
+        else:
+            ecarts = f'  ×{duree / reference[0]:.2f} temps, ×{pic / reference[1]:.2f} mémoire'
+            if donnees != reference[2]:
+                ecarts += '  ≠'
+        print(f'{mode:<10}{duree:>8.3f}s{pic / 2**20:>8.1f} Mo{ecarts}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('fichiers', nargs='*', help='fichiers de préparation à mesurer')
+    parser.add_argument('--agents', type=int, nargs='+', default=[16, 64, 160],
+                        help='fichiers synthétiques (sans fichier donné) : nombres d\'agents')
+    parser.add_argument('--pas', type=int, default=15, help='granularité des créneaux (minutes)')
+    parser.add_argument('--evenements', type=float, default=20,
+                        help='nombre moyen d\'événements par jour ouvré')
+    parser.add_argument('-n', '--repetitions', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.fichiers:
+        for filepath in args.fichiers:
+            comparer(filepath, args.repetitions)
+        return
+    with tempfile.TemporaryDirectory() as dossier:
+        for agents in args.agents:
+            filepath = os.path.join(dossier, f'preparation_{agents}.xlsx')
+            generer_preparation(filepath, agents, args.pas, args.evenements)
+            comparer(filepath, args.repetitions)
+
+
+if __name__ == '__main__':
+    main()
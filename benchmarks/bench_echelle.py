@@ -0,0 +1,148 @@
+"""
+bench_echelle.py — Benchmark d'échelle de la chaîne complète sur des
+fichiers de préparation synthétiques (cf. generer_preparation.py) :
+compute_full_planning, generer (classeur Excel final) et verifier_planning.
+
+Usage :
+    python benchmarks/bench_echelle.py [--agents 16 24 32] [--pas 60 30]
+        [--evenements 0.5 2] [--vacances 1] [-n 1] [--sortie resultats.json]
+        [--reference resultats_commit_precedent.json]
+
+Chaque combinaison des valeurs données (produit cartésien) est générée
+dans un dossier temporaire puis mesurée `-n` fois (médiane retenue), cache
+de solutions désactivé (PLANNING_CACHE_SOLUTIONS=0, sauf si déjà défini) :
+- compute_full_planning : calcul seul (durée, temps CP-SAT, alertes,
+  plafonds atteints) ;
+- generer : lecture + calcul + écriture du classeur final ;
+- verifier_planning : relecture du classeur produit (nombre d'anomalies
+  indicatif : les prénoms synthétiques ne sont pas dans la liste d'agents
+  connus du vérificateur).
+
+Les résultats (commit git, versions, paramètres, mesures) sont écrits en
+JSON dans --sortie ; --reference affiche le rapport de durée avec un
+fichier de résultats d'un autre commit, pour les mêmes échelles.
+"""
+
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('PLANNING_CACHE_SOLUTIONS', '0')
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import ortools  # noqa: E402
+
+from generate_planning_excel_septembre import generer  # noqa: E402
+from generer_preparation import generer_preparation  # noqa: E402
+from planning_checker import verifier_planning  # noqa: E402
+from planning_engine_cpsat import _coeurs_disponibles, compute_full_planning  # noqa: E402
+
+ETAPES = ('compute_full_planning', 'generer', 'verifier_planning')
+
+
+def commit_git():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RACINE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def cle(echelle):
+    return (echelle['agents'], echelle['pas'], echelle['evenements'], echelle['vacances'])
+
+
+def mesurer(echelle, dossier, repetitions, graine):
+    prep = os.path.join(dossier, 'preparation_{agents}_{pas}_{evenements}_{vacances}.xlsx'
+                        .format(**echelle))
+    sortie = prep.replace('preparation_', 'planning_')
+    generer_preparation(prep, echelle['agents'], echelle['pas'], echelle['evenements'],
+                        echelle['vacances'], graine=graine)
+    durees = {e: [] for e in ETAPES}
+    for _ in range(repetitions):
+        t0 = time.perf_counter()
+        weeks_data, _ = compute_full_planning(prep, cache_solutions=False)
+        t1 = time.perf_counter()
+        generer(prep, sortie)
+        t2 = time.perf_counter()
+        with open(sortie, 'rb') as f:
+            anomalies = verifier_planning(f.read())
+        t3 = time.perf_counter()
+        for e, d in zip(ETAPES, (t1 - t0, t2 - t1, t3 - t2)):
+            durees[e].append(d)
+    jours = [j for w in weeks_data for j in w['jours']]
+    return {
+        'echelle': echelle,
+        'durees': {e: round(statistics.median(d), 3) for e, d in durees.items()},
+        'jours': len(jours),
+        'temps_cpsat': round(sum(j['temps_calcul'] for j in jours), 3),
+        'alertes': sum(len(j['alertes']) for j in jours),
+        'plafonds': sum(j['plafond_atteint'] for j in jours),
+        'anomalies': len(anomalies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--agents', type=int, nargs='+', default=[16, 24, 32])
+    parser.add_argument('--pas', type=int, nargs='+', default=[60],
+                        help='granularité des créneaux (minutes)')
+    parser.add_argument('--evenements', type=float, nargs='+', default=[0.5],
+                        help='nombre moyen d\'événements par jour ouvré')
+    parser.add_argument('--vacances', type=int, nargs='+', default=[1],
+                        help='semaines de vacances scolaires')
+    parser.add_argument('-n', '--repetitions', type=int, default=1)
+    parser.add_argument('--graine', type=int, default=0)
+    parser.add_argument('--sortie', default='bench_echelle.json', help='fichier JSON des résultats')
+    parser.add_argument('--reference', help='résultats JSON d\'un autre commit à comparer')
+    args = parser.parse_args()
+
+    reference = {}
+    if args.reference:
+        with open(args.reference, encoding='utf-8') as f:
+            reference = {cle(r['echelle']): r for r in json.load(f)['resultats']}
+
+    resultats = []
+    print(f'{"agents":>7}{"pas":>5}{"év./j":>7}{"vac.":>6}'
+          + ''.join(f'{e:>24}' for e in ETAPES) + f'{"alertes":>9}{"plafonds":>10}')
+    with tempfile.TemporaryDirectory() as dossier:
+        for agents, pas, evenements, vacances in itertools.product(
+                args.agents, args.pas, args.evenements, args.vacances):
+            echelle = {'agents': agents, 'pas': pas, 'evenements': evenements,
+                       'vacances': vacances}
+            r = mesurer(echelle, dossier, args.repetitions, args.graine)
+            resultats.append(r)
+            ref = reference.get(cle(echelle))
+            colonnes = ''
+            for e in ETAPES:
+                d = r['durees'][e]
+                rapport = f' (×{d / ref["durees"][e]:.2f})' if ref and ref['durees'][e] else ''
+                colonnes += f'{f"{d:.2f}s{rapport}":>24}'
+            print(f'{agents:>7}{pas:>5}{evenements:>7}{vacances:>6}{colonnes}'
+                  f'{r["alertes"]:>9}{r["plafonds"]:>10}')
+
+    with open(args.sortie, 'w', encoding='utf-8') as f:
+        json.dump({
+            'commit': commit_git(),
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'ortools': ortools.__version__,
+            'coeurs': _coeurs_disponibles(),
+            'parametres': vars(args),
+            'resultats': resultats,
+        }, f, ensure_ascii=False, indent=2)
+    print(f'\nRésultats écrits dans {args.sortie}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+bench_indice_pt.py — Temps de résolution de solve_day avec / sans l'indice
+initial tiré du planning-type (paramètre `indice_pt`).
+
+Usage :
+    python benchmarks/bench_indice_pt.py preparation.xlsx [autre.xlsx ...] [-n 3]
+
+Pour chaque jour du mois, solve_day est lancé dans les deux modes sur
+exactement les mêmes données (même cumul d'équité hebdomadaire, repris du
+mode "avec indice"), et on garde la médiane de n lancements. Affiche le
+détail par jour puis le total du mois.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from planning_engine_cpsat import (  # noqa: E402
+    load_excel_data, solve_day, _contexte_calcul, _preparer_jour,
+)
+
+
+def _chrono(args, cumul, indice_pt, repetitions):
+    durees = []
+    resultat = None
+    for _ in range(repetitions):
+        t0 = time.perf_counter()
+        resultat = solve_day(**args, cumul_hebdo_avant=dict(cumul), indice_pt=indice_pt)
+        durees.append(time.perf_counter() - t0)
+    return statistics.median(durees), resultat
+
+
+def comparer(filepath, repetitions):
+    contexte = _contexte_calcul(load_excel_data(filepath))
+    total_avec = total_sans = 0.0
+    print(f'\n{os.path.basename(filepath)}')
+    print(f'{"date":<28}{"sans indice":>12}{"avec indice":>12}{"gain":>8}')
+    for semaine in contexte['calendrier']:
+        cumul = {}
+        for jour_info in semaine['jours']:
+            args = _preparer_jour(semaine, jour_info, contexte)
+            t_sans, _ = _chrono(args, cumul, False, repetitions)
+            t_avec, (_, _, depas) = _chrono(args, cumul, True, repetitions)
+            total_sans += t_sans
+            total_avec += t_avec
+            gain = (1 - t_avec / t_sans) * 100 if t_sans else 0.0
+            print(f'{args["date_str"]:<28}{t_sans:>11.2f}s{t_avec:>11.2f}s{gain:>7.0f}%')
+            for a, d in depas.items():
+                cumul[a] = cumul.get(a, 0) + d
+    gain = (1 - total_avec / total_sans) * 100 if total_sans else 0.0
+    print(f'{"TOTAL":<28}{total_sans:>11.2f}s{total_avec:>11.2f}s{gain:>7.0f}%')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('fichiers', nargs='+', help='fichier(s) de préparation .xlsx')
+    parser.add_argument('-n', '--repetitions', type=int, default=3,
+                        help='lancements par jour et par mode (médiane retenue)')
+    args = parser.parse_args()
+    for f in args.fichiers:
+        comparer(f, args.repetitions)
+
+
+if __name__ == '__main__':
+    main()
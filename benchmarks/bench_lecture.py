@@ -0,0 +1,100 @@
+"""
+bench_lecture.py — Relecture d'un classeur : openpyxl (data_only=True)
+contre le lecteur XLSX du projet (lecture_xlsx.ouvrir_classeur), et
+contrôle qu'ils lisent la même chose.
+
+Usage :
+    python benchmarks/bench_lecture.py classeur.xlsx [autre.xlsx ...] [-n 3]
+
+Pour chaque fichier (préparation, planning généré ou retouché dans un
+tableur...) : durée médiane de n lectures complètes (ouverture + valeurs
+de tous les onglets + cellules fusionnées), puis comparaison onglet par
+onglet — noms, visibilité, dimensions, valeurs, fusions. Toute différence
+est listée : les parseurs (moteur, vérification du Bloc 3, régénération)
+doivent lire exactement les mêmes valeurs avec les deux lecteurs.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openpyxl  # noqa: E402
+
+from lecture_xlsx import ouvrir_classeur  # noqa: E402
+
+LECTEURS = {
+    'openpyxl': lambda chemin: openpyxl.load_workbook(chemin, data_only=True),
+    'lecture_xlsx': ouvrir_classeur,
+}
+
+
+def lire(chemin, ouvrir):
+    """{onglet: (visibilité, dimensions, valeurs, fusions)}."""
+    wb = ouvrir(chemin)
+    contenu = {}
+    for ws in wb.worksheets:
+        contenu[ws.title] = (
+            ws.sheet_state,
+            (ws.max_row, ws.max_column),
+            list(ws.iter_rows(values_only=True)),
+            sorted((m.min_row, m.min_col, m.max_row, m.max_col) for m in ws.merged_cells.ranges),
+        )
+    wb.close()
+    return contenu
+
+
+def differences(reference, contenu):
+    if list(reference) != list(contenu):
+        return [f'onglets : {list(reference)} ≠ {list(contenu)}']
+    ecarts = []
+    for nom, (etat, dims, lignes, fusions) in reference.items():
+        etat2, dims2, lignes2, fusions2 = contenu[nom]
+        if etat != etat2:
+            ecarts.append(f'{nom} : visibilité {etat} ≠ {etat2}')
+        if dims != dims2:
+            ecarts.append(f'{nom} : dimensions {dims} ≠ {dims2}')
+        for r, (l1, l2) in enumerate(zip(lignes, lignes2), start=1):
+            if l1 != l2:
+                ecarts.append(f'{nom} : ligne {r} {l1} ≠ {l2}')
+                break
+        if fusions != fusions2:
+            ecarts.append(f'{nom} : cellules fusionnées différentes')
+    return ecarts
+
+
+def comparer(chemin, repetitions):
+    taille = os.path.getsize(chemin) / 1024
+    print(f'\n{os.path.basename(chemin)} ({taille:.0f} Ko)')
+    contenus, durees = {}, {}
+    for nom, ouvrir in LECTEURS.items():
+        temps = []
+        for _ in range(repetitions):
+            t0 = time.perf_counter()
+            contenus[nom] = lire(chemin, ouvrir)
+            temps.append(time.perf_counter() - t0)
+        durees[nom] = statistics.median(temps)
+    reference = durees['openpyxl']
+    for nom, duree in durees.items():
+        print(f'{nom:<14}{duree:>8.3f}s  ×{duree / reference:.2f}')
+    ecarts = differences(contenus['openpyxl'], contenus['lecture_xlsx'])
+    for ecart in ecarts:
+        print(f'  ≠ {ecart}')
+    return not ecarts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('fichiers', nargs='+', help='classeurs .xlsx à relire')
+    parser.add_argument('-n', '--repetitions', type=int, default=3)
+    args = parser.parse_args()
+    identiques = [comparer(chemin, args.repetitions) for chemin in args.fichiers]
+    if not all(identiques):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
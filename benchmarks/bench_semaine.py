@@ -0,0 +1,77 @@
+"""
+bench_semaine.py — Mode "jour" (cumul hebdo enchaîné jour après jour) vs
+mode "glissant" (équité sur 2 jours, cf. solve_glissant) vs mode "semaine"
+(équité optimisée sur toute la semaine, cf. solve_week).
+
+Usage :
+    python benchmarks/bench_semaine.py preparation.xlsx [autre.xlsx ...]
+
+Pour chaque fichier et chaque mode : durée totale, temps CP-SAT, nombre
+d'alertes et de journées ayant atteint leur plafond de temps, puis la
+qualité de l'équité, recalculée à partir des cumuls hebdomadaires de
+weeks_data avec les mêmes franchises que solve_day (approximation : tous
+les agents du cumul, y compris absents ce jour-là) :
+- pénalité d'équité : somme, sur tous les jours, de l'objectif de la
+  passe 4 (dépassement du jour au-delà de 1h, cumul de la semaine au-delà
+  de 3h, manque cumulé) — plus bas = mieux réparti ;
+- dépassement / manque max : pire cumul d'un agent en fin de semaine.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from planning_engine_cpsat import compute_full_planning  # noqa: E402
+
+GRACE_EQUITE = 60       # cf. solve_day
+FRANCHISE_HEBDO = 180
+
+
+def qualite_equite(weeks_data):
+    penalite, depas_max, manque_max = 0, 0, 0
+    for w in weeks_data:
+        avant = {}
+        for j in w['jours']:
+            apres = j['cumul_hebdo_apres']
+            if apres:
+                depas_jour = max(max(apres[a] - avant.get(a, 0), 0) for a in apres)
+                penalite += max(depas_jour - GRACE_EQUITE, 0)
+                penalite += max(max(apres.values()) - FRANCHISE_HEBDO, 0)
+                penalite += max(max(-v for v in apres.values()), 0)
+            avant = apres
+        if avant:
+            depas_max = max(depas_max, max(avant.values()))
+            manque_max = max(manque_max, max(-v for v in avant.values()))
+    return penalite, depas_max, manque_max
+
+
+def mesurer(filepath, mode):
+    t0 = time.perf_counter()
+    weeks_data, _ = compute_full_planning(filepath, mode=mode, cache_solutions=False)
+    duree = time.perf_counter() - t0
+    jours = [j for w in weeks_data for j in w['jours']]
+    return (duree, sum(j['temps_calcul'] for j in jours),
+            sum(len(j['alertes']) for j in jours),
+            sum(j['plafond_atteint'] for j in jours),
+            *qualite_equite(weeks_data))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('fichiers', nargs='+', help='fichier(s) de préparation .xlsx')
+    args = parser.parse_args()
+    for f in args.fichiers:
+        print(f'\n{os.path.basename(f)}')
+        print(f'{"mode":<10}{"durée":>9}{"CP-SAT":>9}{"alertes":>9}{"plafonds":>10}'
+              f'{"pén. équité":>13}{"dépas. max":>12}{"manque max":>12}')
+        for mode in ('jour', 'glissant', 'semaine'):
+            duree, cpsat, alertes, plafonds, penalite, depas, manque = mesurer(f, mode)
+            print(f'{mode:<10}{duree:>8.1f}s{cpsat:>8.1f}s{alertes:>9}{plafonds:>10}'
+                  f'{penalite:>13}{depas:>11} m{manque:>11} m')
+
+
+if __name__ == '__main__':
+    main()
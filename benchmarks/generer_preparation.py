@@ -0,0 +1,272 @@
+"""
+generer_preparation.py — Générateur de fichiers de préparation synthétiques
+(mêmes onglets et même mise en page que le vrai fichier, lus par
+load_excel_data et les parse_* du moteur), pour les benchmarks d'échelle.
+
+Usage :
+    python benchmarks/generer_preparation.py sortie.xlsx [--agents 16] [--pas 60]
+        [--evenements 0.5] [--vacances 1] [--mois Septembre] [--annee 2026] [--graine 0]
+
+Paramètres d'échelle :
+- agents     : nombre total d'agents (dont ~1 vacataire sur 8). Jusqu'à 20
+  agents réguliers, les horaires sont écrits dans la grille "horaires
+  d'équipes" (4 blocs × 5 fiches) ; au-delà, dans l'ancienne liste à plat
+  "Horaires_Des_Agents" (repli lu par _contexte_calcul) ;
+- pas        : granularité des créneaux en minutes (listes de créneaux de
+  l'onglet Paramètres, lignes du Planning_type et tranches de
+  Besoins_Jeunesse, donc grille des jours de vacances) ;
+- evenements : nombre moyen d'événements par jour ouvré (accueils,
+  réunions, congés, dont quelques-uns sans agent) ;
+- vacances   : nombre de semaines de vacances scolaires (les dernières du
+  mois).
+
+Le tirage est déterministe pour une graine donnée : deux commits comparés
+sur le même jeu de paramètres travaillent sur le même fichier.
+"""
+
+import argparse
+import datetime
+import os
+import random
+import sys
+
+import openpyxl
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from planning_engine_cpsat import (  # noqa: E402
+    _HORAIRES_GRILLE_BLOCS, _HORAIRES_GRILLE_GROUPES, JOURS_SEMAINE,
+    ONGLET_HORAIRES_GRILLE, SECTIONS, build_calendar,
+)
+
+OUVERTURE, FERMETURE = 600, 1140   # 10h-19h
+PRENOMS = ['Anne', 'Bruno', 'Claire', 'David', 'Emma', 'Fabien', 'Gaëlle', 'Hugo',
+           'Inès', 'Julien', 'Karine', 'Louis', 'Maëlle', 'Nicolas', 'Odile', 'Pierre',
+           'Quentin', 'Rose', 'Sophie', 'Thomas', 'Ursule', 'Victor', 'Wendy', 'Yann']
+MOIS_FR = ['janvier', 'février', 'mars', 'avril', 'mai', 'juin', 'juillet', 'août',
+           'septembre', 'octobre', 'novembre', 'décembre']
+JOURS_FR = ['lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi', 'samedi', 'dimanche']
+# Profils d'horaires (début matin, fin matin, début après-midi, fin après-midi)
+PROFILS_HORAIRES = [(570, 750, 810, 1080), (600, 780, 840, 1140), (660, 840, 840, 1140)]
+
+
+def _hhmm(m):
+    return f'{m // 60:02d}:{m % 60:02d}'
+
+
+def _libelle_pt(m):
+    """Format du Planning_type : 600 → '10H', 750 → '12H30'."""
+    return f'{m // 60}H{m % 60:02d}' if m % 60 else f'{m // 60}H'
+
+
+def _temps(m):
+    return datetime.time(m // 60, m % 60)
+
+
+def _date_fr(d):
+    return f'{JOURS_FR[d.weekday()]} {d.day} {MOIS_FR[d.month - 1]} {d.year}'
+
+
+def decouper(pas, debut=OUVERTURE, fin=FERMETURE):
+    """Tranches de `pas` minutes de debut à fin (la dernière éventuellement
+    plus courte)."""
+    tranches, t = [], debut
+    while t < fin:
+        tranches.append((t, min(t + pas, fin)))
+        t += pas
+    return tranches
+
+
+def nommer_agents(nb_agents):
+    """Liste (nom, vacataire) : ~1 vacataire sur 8, au moins un."""
+    nb_vac = max(1, nb_agents // 8)
+    reguliers = [PRENOMS[i % len(PRENOMS)] + (f' {i // len(PRENOMS) + 1}' if i >= len(PRENOMS) else '')
+                 for i in range(nb_agents - nb_vac)]
+    return reguliers, [f'Vacataire {i + 1}' for i in range(nb_vac)]
+
+
+def generer_preparation(chemin, nb_agents=16, pas=60, densite_evenements=0.5,
+                        semaines_vacances=1, mois='Septembre', annee=2026, graine=0):
+    """Écrit un fichier de préparation synthétique dans `chemin` et le
+    retourne. Voir la docstring du module pour les paramètres."""
+    rng = random.Random(graine)
+    reguliers, vacataires = nommer_agents(nb_agents)
+    creneaux = decouper(pas)
+
+    # Semaines et samedis du mois, tels que build_calendar les verra
+    calendrier = build_calendar(mois, annee, {i: 'ROUGE' for i in range(1, 7)})
+    nb_semaines = sum(any(j['jour'] == 'Samedi' for j in s['jours']) for s in calendrier)
+    jours_mois = [datetime.date.fromisoformat(j['date']) for s in calendrier for j in s['jours']]
+
+    # Sections : chaque agent régulier reçoit une section principale tournante
+    # (toutes les sections couvertes) et 0 à 3 sections secondaires.
+    affectations = {}
+    for i, a in enumerate(reguliers):
+        principale = SECTIONS[i % len(SECTIONS)]
+        autres = [s for s in SECTIONS if s != principale]
+        affectations[a] = [principale] + rng.sample(autres, rng.randint(0, 3))
+    for v in vacataires:
+        affectations[v] = ['Jeunesse', 'MF', 'Adulte']
+
+    wb = openpyxl.Workbook()
+
+    # ── Paramètres
+    ws = wb.active
+    ws.title = 'Paramètres'
+    ws.append(['Mois', mois])
+    ws.append(['Année', annee])
+    liste = ';'.join(f'{_hhmm(cs)}-{_hhmm(ce)}' for cs, ce in creneaux)
+    ws.append(['Liste_des_créneaux_mardi_jeudi_vendredi', liste])
+    ws.append(['Liste_des_créneaux_mercredi_samedi', liste])
+    for i in range(1, nb_semaines + 1):
+        ws.append([f'Samedi_{i}', 'ROUGE' if i % 2 else 'BLEU'])
+    for i in range(1, nb_semaines + 1):
+        vac = i > nb_semaines - semaines_vacances
+        ws.append([f'Semaine_{i}', 'Vacances Scolaires' if vac else 'Hors Vacances scolaires'])
+    ws.append([None, None])
+    ws.append(['Présence Vacataire', 'Date', 'Vacataire', 'Heure début', 'Heure fin'])
+    for d in jours_mois:
+        if d.weekday() in (2, 5):   # mercredis et samedis
+            for v in vacataires:
+                if rng.random() < 0.6:
+                    ws.append([None, d, v, rng.choice(['10h', '13h']), '19h'])
+
+    # ── Affectations
+    ws = wb.create_sheet('Affectations')
+    ws.append(['Agent', 'Catégorie', 'Section 1', 'Section 2', 'Section 3', 'Section 4',
+               'Responsable', 'Pause flexible', 'Priorité_remplacement_RDC'])
+    for i, (a, sects) in enumerate(affectations.items()):
+        vac = a in vacataires
+        cat = 'VAC' if vac else ('A' if len(sects) >= 3 and rng.random() < 0.5 else None)
+        ws.append([a, cat] + (sects + [None] * 4)[:4]
+                  + [None if vac or i % 4 else 'OUI',
+                     'OUI' if not vac and rng.random() < 0.4 else None,
+                     (i % 5) + 1])
+
+    # ── Horaires des agents (grille si elle suffit, sinon liste à plat)
+    horaires = {}
+    for i, a in enumerate(reguliers):
+        profil = PROFILS_HORAIRES[i % len(PROFILS_HORAIRES)]
+        off = rng.choice(JOURS_SEMAINE[:4])   # un jour non travaillé hors samedi
+        horaires[a] = {j: (None if j == off else profil) for j in JOURS_SEMAINE}
+    fiches = [(cols, debut) for cols in _HORAIRES_GRILLE_BLOCS.values()
+              for debut, _ in _HORAIRES_GRILLE_GROUPES]
+    if len(reguliers) <= len(fiches):
+        ws = wb.create_sheet(ONGLET_HORAIRES_GRILLE)
+        for titre, (col_jour, *_) in _HORAIRES_GRILLE_BLOCS.items():
+            ws[f'{col_jour}6'] = titre
+        for a, ((col_jour, *cols), debut) in zip(reguliers, fiches):
+            ws[f'{cols[0]}{debut}'] = a
+            for k, j in enumerate(JOURS_SEMAINE):
+                ligne = debut + 1 + k
+                ws[f'{col_jour}{ligne}'] = j
+                if horaires[a][j]:
+                    for col, m in zip(cols, horaires[a][j]):
+                        ws[f'{col}{ligne}'] = _temps(m)
+    else:
+        ws = wb.create_sheet('Horaires_Des_Agents')
+        ws.append(['Agent', 'Jour', 'Début matin', 'Fin matin', 'Début après-midi', 'Fin après-midi'])
+        for a in reguliers:
+            for j in JOURS_SEMAINE:
+                if horaires[a][j]:
+                    ws.append([a, j] + [_temps(m) for m in horaires[a][j]])
+
+    # ── Roulement_Samedi
+    ws = wb.create_sheet('Roulement_Samedi')
+    ws.append(['Roulement type'])
+    ws.append([None, 'Agent', 'Roulement'])
+    for i, a in enumerate(reguliers):
+        ws.append([None, a, 'ROUGE' if i % 2 == 0 else 'BLEU'])
+    ws.append([None])
+    ws.append(['Exceptions par semaine'])
+    ws.append([None, 'Semaine', 'Agent', 'Roulement'])
+    for sem in range(1, nb_semaines + 1):
+        a = rng.choice(reguliers)
+        ws.append([None, f'semaine_{sem}', a, 'BLEU' if reguliers.index(a) % 2 == 0 else 'ROUGE'])
+
+    # ── Besoins_Jeunesse
+    ws = wb.create_sheet('Besoins_Jeunesse')
+    nb_jeunesse = sum('Jeunesse' in s for s in affectations.values())
+    for periode in ('Hors Vacances scolaires', 'Vacances Scolaires'):
+        ws.append([periode])
+        ws.append([None, 'Créneau', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi',
+                   'Samedi_rouge', 'samedi bleu'])
+        for cs, ce in creneaux:
+            besoin = 1 if periode.startswith('Hors') or cs < 720 or cs >= 1080 else 2
+            ws.append([None, f'{_hhmm(cs)}-{_hhmm(ce)}'] + [min(besoin, max(nb_jeunesse // 3, 1))] * 6)
+
+    # ── Planning_type : rotation par blocs de 2h des agents habilités de
+    # chaque section, sans jamais placer un agent sur 2 sections à la fois
+    ws = wb.create_sheet('Planning_type')
+    par_section = {s: [a for a in reguliers if s in affectations[a]] for s in SECTIONS}
+    titres = ['  MARDI', '  MERCREDI', '  JEUDI', '  VENDREDI',
+              '  SAMEDI — SEMAINE ROUGE', '  SAMEDI — SEMAINE BLEU']
+    for k, titre in enumerate(titres):
+        ws.append([titre])
+        ws.append(['Créneau', 'RDC', 'Adulte', 'M&F', 'Jeunesse'])
+        for cs, ce in creneaux:
+            ligne, pris = [f'{_libelle_pt(cs)}-{_libelle_pt(ce)}'], set()
+            for n_s, s in enumerate(SECTIONS):
+                habilites = par_section[s]
+                depart = (cs - OUVERTURE) // 120 + k + n_s
+                candidats = [habilites[(depart + n) % len(habilites)]
+                             for n in range(len(habilites))]
+                candidats = [a for a in candidats if a not in pris]
+                nb = 2 if s == 'Jeunesse' and cs >= 840 else 1
+                ligne += candidats[:nb]
+                pris.update(candidats[:nb])
+            ws.append(ligne)
+
+    # ── Événements
+    ws = wb.create_sheet('Événements')
+    ws.append(['Date', 'Début', 'Fin', 'Nom', 'Agents'])
+    types = [('Accueil de classe', 60, 1), ('Réunion pôle', 90, 2),
+             ('Portage', 120, 1), ('congé', None, 1), ('Accueil libre crèche', 60, 0)]
+    for d in jours_mois:
+        nb = int(densite_evenements) + (rng.random() < densite_evenements % 1)
+        for _ in range(nb):
+            nom, duree, nb_agents_ev = rng.choice(types)
+            if duree is None:
+                debut, fin = 540, 1140
+            else:
+                debut = rng.choice(range(OUVERTURE, FERMETURE - duree + 1, 30))
+                fin = debut + duree
+            agents = '; '.join(rng.sample(reguliers, nb_agents_ev))
+            ws.append([_date_fr(d), f'{debut // 60}h{debut % 60 or ""}',
+                       f'{fin // 60}h{fin % 60 or ""}', nom, agents])
+
+    # ── Jours_speciaux : les jours des semaines de vacances
+    ws = wb.create_sheet('Jours_speciaux')
+    ws.append(['Date', 'Férié', 'Vacances'])
+    for s in calendrier[len(calendrier) - semaines_vacances:] if semaines_vacances else []:
+        for j in s['jours']:
+            ws.append([_date_fr(datetime.date.fromisoformat(j['date'])), 'NON', 'vacances'])
+
+    # ── Horaire_ouverture_mediatheque
+    ws = wb.create_sheet('Horaire_ouverture_mediatheque')
+    ws.append([None, 'Jour', 'Début S1', 'Fin S1', 'Début S2', 'Fin S2'])
+    for j in JOURS_SEMAINE:
+        ws.append([None, j, _temps(OUVERTURE), _temps(750), _temps(750), _temps(FERMETURE)])
+
+    wb.save(chemin)
+    return chemin
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('sortie', help='fichier .xlsx à écrire')
+    parser.add_argument('--agents', type=int, default=16)
+    parser.add_argument('--pas', type=int, default=60, help='granularité des créneaux (minutes)')
+    parser.add_argument('--evenements', type=float, default=0.5,
+                        help='nombre moyen d\'événements par jour ouvré')
+    parser.add_argument('--vacances', type=int, default=1, help='semaines de vacances scolaires')
+    parser.add_argument('--mois', default='Septembre')
+    parser.add_argument('--annee', type=int, default=2026)
+    parser.add_argument('--graine', type=int, default=0)
+    args = parser.parse_args()
+    generer_preparation(args.sortie, args.agents, args.pas, args.evenements,
+                        args.vacances, args.mois, args.annee, args.graine)
+
+
+if __name__ == '__main__':
+    main()
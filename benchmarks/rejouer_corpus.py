@@ -0,0 +1,130 @@
+"""
+rejouer_corpus.py — Rejeu hors ligne d'un corpus de jours enregistré par
+compute_full_planning / regenerer_jours (`enregistrement`, cf.
+enregistreur_corpus) : reproduire et mesurer un jour lent sans le fichier
+de préparation.
+
+Usage :
+    python benchmarks/rejouer_corpus.py corpus.gz [autre.gz ...] [--lister]
+        [--date 2026-09-16 ...] [--parametres "num_search_workers: 8"] [-n 3]
+    python benchmarks/rejouer_corpus.py corpus.gz --complet [--date ...]
+
+Par défaut, chaque passe enregistrée est rejouée telle quelle : même modèle
+CP-SAT (objectif, bornes des passes précédentes et indices compris), mêmes
+paramètres du solveur, auxquels --parametres (texte SatParameters) est
+ajouté — ex. "linearization_level: 2 random_seed: 7" pour essayer un autre
+réglage. Affiche, par jour et par passe : temps enregistré, temps rejoué
+(médiane de n lancements), écart, et « ≠ » si le statut ou l'objectif
+diffère.
+
+--complet relance au contraire solve_day en entier (construction du modèle
+comprise) avec les arguments enregistrés et le moteur ACTUEL — pour mesurer
+un changement du moteur d'un commit à l'autre : temps CP-SAT enregistré et
+rejoué, durée totale rejouée (construction du modèle comprise), « ≠ » si le
+planning obtenu diffère de celui enregistré (à moteur égal, possible entre
+solutions de même score : les chercheurs CP-SAT se partagent les cœurs).
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ortools.sat.python import cp_model  # noqa: E402
+
+from planning_engine_cpsat import BudgetTemps, lire_corpus, solve_day  # noqa: E402
+
+
+def rejouer_passe(modele, parametres, supplementaires, repetitions):
+    """Résout `repetitions` fois le modèle d'une passe enregistrée. Retourne
+    (temps médian, statut, objectif du dernier lancement)."""
+    model = cp_model.CpModel()
+    model.proto.parse_text_format(modele)
+    temps = []
+    for _ in range(repetitions):
+        solver = cp_model.CpSolver()
+        solver.parameters.parse_text_format(parametres)
+        if supplementaires:
+            solver.parameters.merge_text_format(supplementaires)
+        status = solver.solve(model)
+        temps.append(solver.wall_time)
+    resolue = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    return statistics.median(temps), status.name, solver.objective_value if resolue else None
+
+
+def lister(jours):
+    print(f'{"date":<12}{"temps":>9}{"passes":>8}  plafond  moteur')
+    for jour in jours:
+        profil = jour['profil']
+        print(f'{jour["date"]:<12}{profil["utilise"]:>8.2f}s{len(jour["modeles"]):>8}  '
+              f'{"oui" if profil["plafond_atteint"] else "":<7}  {jour["moteur"][:12]}')
+
+
+def rejouer_passes(jours, supplementaires, repetitions):
+    total_avant = total_apres = 0.0
+    print(f'{"date":<12}{"passe":<24}{"enregistré":>11}{"rejoué":>9}{"écart":>8}  statut')
+    for jour in jours:
+        for passe in jour['modeles']:
+            temps, statut, objectif = rejouer_passe(passe['modele'], passe['parametres'],
+                                                   supplementaires, repetitions)
+            total_avant += passe['temps']
+            total_apres += temps
+            marque = '' if (statut, objectif) == (passe['statut'], passe['objectif']) else '  ≠'
+            print(f'{jour["date"]:<12}{passe["passe"]:<24}{passe["temps"]:>10.2f}s'
+                  f'{temps:>8.2f}s{temps - passe["temps"]:>+7.2f}s  {statut}{marque}')
+    return total_avant, total_apres
+
+
+def rejouer_complet(jours, repetitions):
+    total_avant = total_apres = 0.0
+    print(f'{"date":<12}{"enregistré":>11}{"rejoué":>9}{"écart":>8}{"durée":>9}')
+    for jour in jours:
+        temps, durees = [], []
+        for _ in range(repetitions):
+            budget = BudgetTemps()
+            t0 = time.perf_counter()
+            resultat = solve_day(**jour['arguments'], budget=budget)
+            durees.append(time.perf_counter() - t0)
+            temps.append(budget.journal[-1]['utilise'])
+        avant, apres = jour['profil']['utilise'], statistics.median(temps)
+        total_avant += avant
+        total_apres += apres
+        marque = '' if resultat[0] == jour['resultat'][0] else '  ≠'
+        print(f'{jour["date"]:<12}{avant:>10.2f}s{apres:>8.2f}s{apres - avant:>+7.2f}s'
+              f'{statistics.median(durees):>8.2f}s{marque}')
+    return total_avant, total_apres
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('corpus', nargs='+', help='fichier(s) de corpus enregistré(s)')
+    parser.add_argument('--date', nargs='+', help='ne rejouer que ces jours (AAAA-MM-JJ)')
+    parser.add_argument('--lister', action='store_true', help='lister les jours sans rejouer')
+    parser.add_argument('--parametres', default='',
+                        help='paramètres CP-SAT ajoutés à ceux enregistrés (texte SatParameters)')
+    parser.add_argument('--complet', action='store_true',
+                        help='relancer solve_day en entier avec le moteur actuel')
+    parser.add_argument('-n', '--repetitions', type=int, default=1)
+    args = parser.parse_args()
+    if args.complet and args.parametres:
+        parser.error('--parametres ne s\'applique qu\'au rejeu des passes (sans --complet)')
+
+    jours = [jour for chemin in args.corpus for jour in lire_corpus(chemin)
+             if not args.date or jour['date'] in args.date]
+    if args.lister:
+        lister(jours)
+        return
+    if args.complet:
+        avant, apres = rejouer_complet(jours, args.repetitions)
+    else:
+        avant, apres = rejouer_passes(jours, args.parametres, args.repetitions)
+    ecart = (apres / avant - 1) * 100 if avant else 0.0
+    print(f'\nTOTAL ({len(jours)} jour(s), temps CP-SAT enregistré / rejoué) : '
+          f'{avant:.2f}s → {apres:.2f}s ({ecart:+.0f}%)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+verif_objectif_unique.py — Résolution en 4 passes lexicographiques (mode
+par défaut de solve_day) vs objectif unique pondéré (solve_day,
+objectif_unique=True ; mode 'objectif_unique', expérimental, de
+compute_full_planning).
+
+Usage :
+    python benchmarks/verif_objectif_unique.py preparation.xlsx [autre.xlsx ...]
+
+Pour chaque jour du mois, les deux modes sont lancés sur exactement les
+mêmes données (même cumul d'équité hebdomadaire, repris du mode en passes)
+et on compare les valeurs des 4 niveaux de pénalités (couverture,
+stabilité, qualité, équité) de leurs solutions : résolus à l'optimum, les
+deux modes doivent donner les MÊMES valeurs (l'affectation elle-même peut
+différer, à valeurs égales). Affiche le détail par jour (divergences
+marquées « ≠ », « plafond » si un des modes a été arrêté par le temps — la
+comparaison n'est alors plus garantie), puis le total et le gain de temps
+(négatif quand l'objectif unique est plus lent, le cas habituel).
+Code de sortie 1 si un jour résolu à l'optimum dans les deux modes diverge.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from planning_engine_cpsat import (  # noqa: E402
+    BudgetTemps, load_excel_data, _contexte_calcul, _modeliser_jour, _nb_passes,
+    _poids_lexicographiques, _preparer_jour, _preparer_passe_1,
+    _resoudre_objectif_unique, _resoudre_par_passes,
+)
+
+
+def resoudre(args, cumul, objectif_unique, gabarits):
+    """Même enchaînement que solve_day, en gardant les valeurs des niveaux.
+    Retourne (durée, valeurs des 4 niveaux, plafond atteint, depas_jour) —
+    valeurs None si aucune solution (ou objectif unique impossible)."""
+    t0 = time.perf_counter()
+    gabarit, dispo, ev_minutes = _modeliser_jour(**args, gabarits=gabarits)
+    model, x, jeunesse_requis = gabarit.instancier(dispo.dispo, ev_minutes, cumul)
+    borne = _preparer_passe_1(gabarit, model, x, jeunesse_requis,
+                              args.get('swap_map') or {}, True, args['date_str'])
+    niveaux = (gabarit.penalites, gabarit.penalites_stabilite,
+               gabarit.penalites_qualite, gabarit.penalites_equite)
+    budget = BudgetTemps()
+    solver = None
+    if objectif_unique:
+        non_vides = [termes for termes in niveaux if termes]
+        poids = _poids_lexicographiques(model, non_vides)
+        if poids is not None:
+            budget.ouvrir_jour(args['date_str'], 1)
+            solver = _resoudre_objectif_unique(model, non_vides, poids, False, budget,
+                                               borne if niveaux[0] else None)
+            budget.fermer_jour()
+    else:
+        budget.ouvrir_jour(args['date_str'], _nb_passes(*niveaux[1:]))
+        solver = _resoudre_par_passes(model, *niveaux, False, budget, borne)
+        budget.fermer_jour()
+    duree = time.perf_counter() - t0
+    if solver is None:
+        return duree, None, False, {}
+    valeurs = tuple(sum(solver.value(t) for t in termes) for termes in niveaux)
+    depas = {a: solver.value(v) for a, v in gabarit.depas_par_agent.items()}
+    return duree, valeurs, budget.journal[-1]['plafond_atteint'], depas
+
+
+def comparer(filepath):
+    contexte = _contexte_calcul(load_excel_data(filepath))
+    gabarits = {}
+    total_passes = total_unique = 0.0
+    divergences = 0
+    print(f'\n{os.path.basename(filepath)}')
+    print(f'{"date":<28}{"passes":>9}{"unique":>9}  niveaux (passes / unique)')
+    for semaine in contexte['calendrier']:
+        cumul = {}
+        for jour_info in semaine['jours']:
+            args = _preparer_jour(semaine, jour_info, contexte)
+            t_passes, v_passes, plafond_p, depas = resoudre(args, cumul, False, gabarits)
+            t_unique, v_unique, plafond_u, _ = resoudre(args, cumul, True, gabarits)
+            total_passes += t_passes
+            total_unique += t_unique
+            if v_passes == v_unique:
+                marque = ''
+            elif plafond_p or plafond_u:
+                marque = '  plafond'
+            else:
+                marque = '  ≠'
+                divergences += 1
+            print(f'{args["date_str"]:<28}{t_passes:>8.2f}s{t_unique:>8.2f}s  '
+                  f'{v_passes} / {v_unique}{marque}')
+            for a, d in depas.items():
+                cumul[a] = cumul.get(a, 0) + d
+    gain = (1 - total_unique / total_passes) * 100 if total_passes else 0.0
+    print(f'{"TOTAL":<28}{total_passes:>8.2f}s{total_unique:>8.2f}s  '
+          f'gain {gain:.0f}%, {divergences} divergence(s)')
+    return divergences
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('fichiers', nargs='+', help='fichier(s) de préparation .xlsx')
+    args = parser.parse_args()
+    divergences = sum(comparer(f) for f in args.fichiers)
+    sys.exit(1 if divergences else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+verif_portefeuille.py — Reproductibilité du portefeuille de solveurs
+(SolveurPortefeuille, solve_day(portefeuille=True)) : le même problème,
+résolu plusieurs fois, doit rendre exactement la même solution, quelle que
+soit la configuration qui a gagné la course.
+
+Usage :
+    python benchmarks/verif_portefeuille.py [--taille 30] [--chercheurs 12] [-n 8]
+    python benchmarks/verif_portefeuille.py preparation.xlsx --date 2026-09-16 [-n 2]
+
+Sans fichier : modèle d'affectation taille × taille (coûts de 1 à 4, donc
+beaucoup d'affectations optimales à égalité), résolu n fois par un
+SolveurPortefeuille avec --chercheurs chercheurs — il en faut au moins
+2 × NB_CHERCHEURS_MIN pour lancer deux configurations.
+
+Avec un fichier de préparation : chaque jour de --date (ou tout le mois)
+est résolu n fois par solve_day(portefeuille=True), chercheurs accordés par
+le gouverneur (cf. PLANNING_MAX_COEURS_CPSAT) ; on compare le planning et
+les alertes rendus. Sous 2 × NB_CHERCHEURS_MIN cœurs, le portefeuille se
+réduit à la résolution habituelle, dont les chercheurs se partagent les
+cœurs : deux solutions de même score peuvent alors alterner (cf.
+rejouer_corpus.py --complet) — ce n'est plus le portefeuille qui est vérifié.
+
+Affiche, par problème : configuration gagnante et durée de chaque
+lancement, puis « ≠ » si les solutions diffèrent. Code de sortie 1 en cas
+de différence.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ortools.sat.python import cp_model  # noqa: E402
+
+from planning_engine_cpsat import (  # noqa: E402
+    NB_CHERCHEURS_MIN, SolveurPortefeuille, _contexte_calcul, _preparer_jour,
+    load_excel_data, solve_day,
+)
+
+
+def modele_affectation(taille):
+    rnd = random.Random(0)
+    model = cp_model.CpModel()
+    x = {(i, j): model.new_bool_var(f'x_{i}_{j}') for i in range(taille) for j in range(taille)}
+    for i in range(taille):
+        model.add_exactly_one(x[i, j] for j in range(taille))
+    for j in range(taille):
+        model.add_exactly_one(x[i, j] for i in range(taille))
+    model.minimize(sum(rnd.randint(1, 4) * v for v in x.values()))
+    return model, list(x.values())
+
+
+def verifier_affectation(taille, chercheurs, repetitions):
+    model, x = modele_affectation(taille)
+    solutions = []
+    print(f'\naffectation {taille}×{taille}, {chercheurs} chercheurs')
+    if chercheurs < 2 * NB_CHERCHEURS_MIN:
+        print(f'  (moins de {2 * NB_CHERCHEURS_MIN} chercheurs : une seule configuration lancée)')
+    for k in range(repetitions):
+        solver = SolveurPortefeuille()
+        solver.parameters.num_search_workers = chercheurs
+        solver.parameters.random_seed = 42
+        status = solver.solve(model)
+        solutions.append(tuple(solver.value(v) for v in x))
+        print(f'  lancement {k + 1} : configuration {solver.gagnant}, {status.name}, '
+              f'objectif {solver.objective_value:g}, {solver.wall_time:.2f}s')
+    identiques = len(set(solutions)) == 1
+    print('  identiques' if identiques else f'  ≠ {len(set(solutions))} solutions différentes')
+    return identiques
+
+
+def verifier_jours(filepath, dates, repetitions):
+    contexte = _contexte_calcul(load_excel_data(filepath))
+    identiques = True
+    print(f'\n{os.path.basename(filepath)}')
+    for semaine in contexte['calendrier']:
+        for jour_info in semaine['jours']:
+            args = _preparer_jour(semaine, jour_info, contexte)
+            if dates and args['date_str'][:10] not in dates:
+                continue
+            resultats, durees = [], []
+            for _ in range(repetitions):
+                t0 = time.perf_counter()
+                resultats.append(solve_day(**args, portefeuille=True)[:2])
+                durees.append(time.perf_counter() - t0)
+            meme = all(r == resultats[0] for r in resultats)
+            identiques &= meme
+            print(f'  {args["date_str"]:<28}' + ''.join(f'{d:>8.2f}s' for d in durees)
+                  + ('' if meme else '  ≠'))
+    return identiques
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('fichier', nargs='?', help='fichier de préparation .xlsx')
+    parser.add_argument('--date', nargs='+', help='jours à vérifier (AAAA-MM-JJ ; défaut : tous)')
+    parser.add_argument('--taille', type=int, default=30,
+                        help='sans fichier : taille du modèle d\'affectation')
+    parser.add_argument('--chercheurs', type=int, default=12,
+                        help='sans fichier : chercheurs accordés au portefeuille')
+    parser.add_argument('-n', '--repetitions', type=int, default=None,
+                        help='lancements par problème (défaut : 8, ou 2 par jour)')
+    args = parser.parse_args()
+    if args.fichier:
+        identiques = verifier_jours(args.fichier, args.date, args.repetitions or 2)
+    else:
+        identiques = verifier_affectation(args.taille, args.chercheurs, args.repetitions or 8)
+    sys.exit(0 if identiques else 1)
+
+
+if __name__ == '__main__':
+    main()
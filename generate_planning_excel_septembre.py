@@ -13,10 +13,9 @@ from copy import copy
 import re
 
 from planning_engine_cpsat import (
-    compute_full_planning, load_excel_data, parse_jours_speciaux,
-    parse_horaires_agents_grille, ONGLET_HORAIRES_GRILLE,
-    parse_evenements, parse_horaires_ouverture, hhmm_to_min, parse_affectations,
-    parse_parametres, parse_horaires_agents
+    compute_full_planning, load_excel_data, ONGLET_HORAIRES_GRILLE, hhmm_to_min,
+    IndexDisponibilite, ContextePreparation, charger_preparation,
+    _index_evenements,
 )
 
 INPUT_PREP = '/mnt/user-data/uploads/SEPTEMBRE2026_Preparation_Planning_Mediatheque.xlsx'
@@ -583,6 +582,17 @@ ONGLETS_PREP_A_EMBARQUER = [
 ]
 
 
+def _feuilles_preparation(source):
+    """Onglets du fichier de préparation ({nom: worksheet}, cf.
+    load_excel_data) : `source` est ce dict lui-même, un ContextePreparation
+    déjà chargé, ou le chemin du fichier (chargé ici)."""
+    if isinstance(source, ContextePreparation):
+        return source.feuilles
+    if isinstance(source, dict):
+        return source
+    return load_excel_data(source)
+
+
 def embarquer_onglets_preparation(wb, input_path):
     """Copie, en 'très masqué' (invisibles pour un agent qui ouvre le fichier —
     même le clic droit > Afficher ne les propose pas), les onglets de
@@ -592,12 +602,14 @@ def embarquer_onglets_preparation(wb, input_path):
     L'onglet Événements n'est volontairement PAS copié (demande utilisatrice
     09/2026) : une fois le planning ajusté à la main, il n'est plus à jour —
     la référence devient les colonnes H/I/J et les notes agents (W-Z) du
-    planning généré lui-même, pas le fichier de préparation d'origine."""
-    wb_src = openpyxl.load_workbook(input_path, data_only=True)
+    planning généré lui-même, pas le fichier de préparation d'origine.
+    input_path : chemin du fichier de préparation, ou ContextePreparation
+    déjà chargé (le fichier n'est alors pas rouvert)."""
+    feuilles = _feuilles_preparation(input_path)
     for nom in ONGLETS_PREP_A_EMBARQUER:
-        if nom not in wb_src.sheetnames:
+        ws_src = feuilles.get(nom)
+        if ws_src is None:
             continue
-        ws_src = wb_src[nom]
         nom_cible = nom if nom not in wb.sheetnames else f'_prep_{nom}'
         ws_dst = wb.create_sheet(nom_cible)
         for row in ws_src.iter_rows(values_only=True):
@@ -631,26 +643,25 @@ def generer(input_path=None, output_path=None):
     input_path = input_path or INPUT_PREP
     output_path = output_path or OUTPUT_PATH
 
-    raw = load_excel_data(input_path)
-    jours_speciaux = parse_jours_speciaux(raw)
-    params_mois = parse_parametres(raw)
-    evenements = parse_evenements(raw, annee_defaut=params_mois.get('annee'))
-    hor_ouv = parse_horaires_ouverture(raw)
+    # Fichier de préparation chargé et parsé UNE fois (09/2026), partagé avec
+    # compute_full_planning et la recopie des onglets de préparation (cf.
+    # ContextePreparation) — input_path peut aussi en être un, déjà chargé.
+    preparation = charger_preparation(input_path)
+    donnees = preparation.donnees
+    jours_speciaux = donnees['jours_speciaux']
+    evenements = donnees['evenements']
+    hor_ouv = preparation.horaires_ouverture
 
-    weeks_data, metadata = compute_full_planning(input_path)
+    weeks_data, metadata = compute_full_planning(preparation)
 
     # Liste des agents pour le récap heures : tous les agents habilités
     # (réguliers + vacataires, dans l'ordre du fichier Affectations), hors
     # Eloïse (jamais dans ce tableau, cf. parse_affectations).
-    affectations, categories, responsables, pause_flex, priorite_rdc = parse_affectations(raw)
-    agents_recap = list(affectations.keys())
-    # Lecture directe de la grille collaborative "horaires d'équipes" ; repli
-    # sur l'ancienne liste à plat "Horaires_Des_Agents" si le fichier de
-    # préparation n'a pas encore été mis à jour avec le nouvel onglet.
-    if ONGLET_HORAIRES_GRILLE in raw:
-        horaires_agents = parse_horaires_agents_grille(raw)
-    else:
-        horaires_agents = parse_horaires_agents(raw)
+    pause_flex = donnees['pause_flex']
+    agents_recap = list(donnees['affectations'].keys())
+    # Grille collaborative "horaires d'équipes", ou repli sur l'ancienne liste
+    # à plat "Horaires_Des_Agents" (cf. _contexte_calcul).
+    horaires_agents = donnees['horaires_agents']
     # Agents réguliers hors vacataires, dans l'ordre du fichier Affectations —
     # sert de base à la zone de notes agents (09/2026) : 2 groupes de colonnes
     # (7 + 7, ou moins si l'équipe est plus petite / plus grande) à côté de
@@ -797,11 +808,7 @@ def generer(input_path=None, output_path=None):
                 # source (bloc 1) — plus facile à repérer d'un coup d'œil.
                 accueil_incomplet = reunion_incomplet = False
                 accueil_incomplet_msg = reunion_incomplet_msg = None
-                for ev in evenements:
-                    if ev['date'] != date_str:
-                        continue
-                    if not (cs < ev['ce'] and ce > ev['cs']):
-                        continue
+                for ev in evenements.chevauchants(date_str, cs, ce):
                     nom = ev['nom']
                     agents_ev = ev.get('agents', [])
                     if nom.strip().lower() == 'congé':
@@ -977,13 +984,13 @@ def generer(input_path=None, output_path=None):
         generer_vue_agent(wb, week_num, jours, row_lookup, agents_recap_vue_agent,
                            horaires_agents, pause_flex, evenements)
 
-    copier_onglets_preparation_caches(wb, raw)
+    copier_onglets_preparation_caches(wb, preparation)
 
     verrouiller_cellules_formules(wb)
     # Appelé APRÈS verrouiller_cellules_formules (voir docstring) : sinon ses
     # cellules seraient déverrouillées par la passe générique ci-dessus.
-    embarquer_planning_type_visible(wb, raw)
-    embarquer_horaires_agents_visible(wb, raw)
+    embarquer_planning_type_visible(wb, preparation)
+    embarquer_horaires_agents_visible(wb, preparation)
     wb.save(output_path)
     print('Fichier genere:', output_path)
     return output_path, weeks_data, metadata
@@ -1022,6 +1029,9 @@ ONGLET_HORAIRES_ANCIEN = 'Horaires_Des_Agents'
 
 
 def copier_onglets_preparation_caches(wb, raw):
+    """raw : onglets du fichier de préparation, ou ContextePreparation (cf.
+    _feuilles_preparation)."""
+    raw = _feuilles_preparation(raw)
     for nom in ONGLETS_PREPARATION_A_RECOPIER:
         ws_src = raw.get(nom)
         if ws_src is None:
@@ -1099,7 +1109,11 @@ def embarquer_planning_type_visible(wb, raw):
     IMPORTANT : cette fonction doit être appelée APRÈS
     verrouiller_cellules_formules(wb), sinon cette dernière — qui reparcourt
     tous les onglets du classeur — déverrouillerait les cellules sans formule
-    de ce nouvel onglet (comportement voulu partout ailleurs, mais pas ici)."""
+    de ce nouvel onglet (comportement voulu partout ailleurs, mais pas ici).
+
+    raw : onglets du fichier de préparation, ou ContextePreparation (cf.
+    _feuilles_preparation)."""
+    raw = _feuilles_preparation(raw)
     ws_src = raw.get('Planning_type') or raw.get('planning_type')
     if ws_src is None:
         return
@@ -1139,7 +1153,11 @@ def embarquer_horaires_agents_visible(wb, raw):
 
     IMPORTANT : comme pour Planning_type, doit être appelée APRÈS
     verrouiller_cellules_formules(wb) — sinon celle-ci déverrouillerait les
-    cellules sans formule de ce nouvel onglet."""
+    cellules sans formule de ce nouvel onglet.
+
+    raw : onglets du fichier de préparation, ou ContextePreparation (cf.
+    _feuilles_preparation)."""
+    raw = _feuilles_preparation(raw)
     ws_src = raw.get(ONGLET_HORAIRES_GRILLE)
     if ws_src is None:
         return
@@ -1185,31 +1203,6 @@ HATCH_FILL = PatternFill(patternType='lightDown', fgColor='FFBFBFBF', bgColor='F
 CONGE_FILL = PatternFill('solid', fgColor='FFD0D0D0')
 
 
-def _dans_horaires_agent(agent, jour, cs, ce, horaires_agents, pause_flex):
-    """True si le créneau (cs, ce) tombe dans les horaires contractuels de
-    l'agent ce jour-là (matin, après-midi, ou journée continue s'il n'y a pas
-    de vraie coupure, fm == da).
-
-    ⚠️ (correctif 08/2026, demande utilisatrice) : la "pause flexible"
-    (colonne Affectations) autorise le SOLVEUR à placer exceptionnellement un
-    agent sur son créneau de pause si besoin — mais ça ne veut pas dire que
-    cet agent n'a PAS de pause déjeuner. Pour l'AFFICHAGE (cette fonction
-    uniquement, jamais le moteur de résolution), la pause nominale
-    (Horaires_Des_Agents, l'écart entre fm et da) est donc désormais toujours
-    représentée par des hachures, pause flexible ou non — comme pour tous les
-    agents ("tous les agents ont une heure de pause sauf s'ils terminent tôt,
-    14h/15h"). Le paramètre `pause_flex` n'est plus utilisé ici, conservé
-    uniquement pour ne pas casser les appels existants."""
-    h = horaires_agents.get(agent, {}).get(jour)
-    if not h:
-        return False  # pas de contrat ce jour-là → hors horaires
-    dm, fm, da, fa = h
-    dans_matin = (dm is not None and fm is not None and cs >= dm and ce <= fm)
-    dans_apm = (da is not None and fa is not None and cs >= da and ce <= fa)
-    dans_global = (dm is not None and fa is not None and cs >= dm and ce <= fa and fm == da)
-    return dans_matin or dans_apm or dans_global
-
-
 # Arrivée/départ décalés par rapport au créneau (ESSAI 08/2026, demande
 # utilisatrice) : pas de fond dédié (demande utilisatrice, 2e essai) — le
 # texte "Arrivée/Départ HHhMM" en gras suffit à se repérer, sur le fond
@@ -1251,6 +1244,7 @@ def generer_vue_agent(wb, week_num, jours, row_lookup, agents_recap,
     d'un créneau plutôt que pile sur son bord. Vacataires exclus en amont
     (cf. appelant)."""
     sheet_src = f'Semaine_{week_num}'
+    evenements = _index_evenements(evenements)
     ws = wb.create_sheet(f'Semaine_{week_num}_Agent')
     ws.column_dimensions['A'].width = 14
     jours_semaine = [j['jour'] for j in jours]
@@ -1339,15 +1333,11 @@ def generer_vue_agent(wb, week_num, jours, row_lookup, agents_recap,
         date_str = date_par_jour.get(jour)
         if date_str is None:
             return None
-        for ev in evenements:
-            if ev['date'] != date_str:
-                continue
+        # Chevauchement réel avec l'horaire de l'événement, agent concerné
+        for ev in evenements.chevauchants(date_str, cs, ce, agent=agent):
             if ev['nom'].strip().lower() == 'congé':
                 continue  # déjà géré séparément par _en_conge
-            if agent not in ev.get('agents', []):
-                continue
-            if cs < ev['ce'] and ce > ev['cs']:  # chevauchement réel
-                return ev
+            return ev
         return None
 
     # ── Congés par agent/jour : {(agent, jour): [(cs, ce), ...]} ────────
@@ -1356,8 +1346,8 @@ def generer_vue_agent(wb, week_num, jours, row_lookup, agents_recap,
     conge_par_agent_jour = {}
     for j in jours:
         date_str, jour = j['date'], j['jour']
-        for ev in evenements:
-            if ev['date'] != date_str or ev['nom'].strip().lower() != 'congé':
+        for ev in evenements.du_jour(date_str):
+            if ev['nom'].strip().lower() != 'congé':
                 continue
             for ag in ev.get('agents', []):
                 conge_par_agent_jour.setdefault((ag, jour), []).append((ev['cs'], ev['ce']))
@@ -1368,6 +1358,20 @@ def generer_vue_agent(wb, week_num, jours, row_lookup, agents_recap,
                 return True
         return False
 
+    # ── Hachures : créneau dans les horaires contractuels de l'agent ? ──
+    # Précalculé une fois par jour pour tous les agents × créneaux fins
+    # (IndexDisponibilite.contrat). ⚠️ (correctif 08/2026, demande
+    # utilisatrice) : la "pause flexible" autorise le SOLVEUR à placer
+    # exceptionnellement un agent sur son créneau de pause — ça ne veut pas
+    # dire qu'il n'a PAS de pause déjeuner. Pour l'AFFICHAGE, la pause
+    # nominale (écart fm → da) est donc toujours hachurée, pause flexible ou
+    # non ("tous les agents ont une heure de pause sauf s'ils terminent tôt").
+    contrat_par_jour = {
+        j['jour']: IndexDisponibilite(agents_recap, fine, j['jour'], j['date'],
+                                      horaires_agents, evenements, pause_flex)
+        for j in jours
+    }
+
     # ── En-tête unique, figé (ne se répète plus par agent) ──────────────
     hcell = ws.cell(row=1, column=1, value='Créneau')
     hcell.font = Font(size=9, bold=True)
@@ -1451,7 +1455,7 @@ def generer_vue_agent(wb, week_num, jours, row_lookup, agents_recap,
                 if src_row is None:
                     # Pas de créneau réel du planning global ici (avant
                     # l'ouverture, après la fermeture, ou jour non ouvert).
-                    if _dans_horaires_agent(agent, jour, cs, ce, horaires_agents, pause_flex):
+                    if contrat_par_jour[jour].dans_contrat(agent, cs, ce):
                         # L'agent est pourtant censé être là (ex: préparation
                         # avant l'ouverture) → cellule "travaillée" neutre,
                         # dans sa couleur, sans texte (rien à afficher de plus
@@ -1470,7 +1474,7 @@ def generer_vue_agent(wb, week_num, jours, row_lookup, agents_recap,
                         cell.fill = HATCH_FILL
                     continue
 
-                if not _dans_horaires_agent(agent, jour, cs, ce, horaires_agents, pause_flex):
+                if not contrat_par_jour[jour].dans_contrat(agent, cs, ce):
                     # Agent pas censé travailler ici (pause déjeuner ou hors
                     # de ses horaires contractuels) → hachures grises.
                     cell.value = None
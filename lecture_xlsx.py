@@ -0,0 +1,308 @@
+"""
+lecture_xlsx.py — Lecteur XLSX minimal, en lecture seule (09/2026).
+
+openpyxl est de loin le plus gros coût de la RELECTURE d'un classeur :
+fichier de préparation (load_excel_data(lecture_seule=True)), planning
+vérifié par le Bloc 3 (verifier_planning), planning relu pour la
+régénération (lire_planning_pour_regeneration). Ces lectures n'ont besoin
+que des valeurs : ce module ouvre le .xlsx directement (zipfile) et lit
+chaque onglet en flux (iterparse), sans objets cellule ni mise en forme.
+
+Il rend :
+- les valeurs des cellules (résultats en cache des formules, comme
+  openpyxl en data_only=True : None si la formule n'a jamais été calculée
+  par un tableur) ;
+- les cellules fusionnées ;
+- la visibilité des onglets (sheet_state) ;
+avec la table des chaînes partagées et la conversion des dates (formats
+de date des styles, calendrier 1900 ou 1904) faites comme par openpyxl,
+pour que les parseurs lisent exactement les mêmes valeurs.
+
+N'expose que le sous-ensemble de l'API openpyxl utilisé par ces
+parseurs : classeur.sheetnames / classeur[nom] / classeur.worksheets ;
+feuille.title, sheet_state, max_row, max_column, cell(row=, column=),
+feuille['A6'], iter_rows(...), merged_cells.ranges. L'écriture et la
+mise en forme (generate_planning_excel_septembre, regeneration_ecriture)
+restent sur openpyxl.
+"""
+
+import posixpath
+import zipfile
+from collections import defaultdict
+from io import BytesIO
+from xml.etree.ElementTree import iterparse, parse
+
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils.cell import coordinate_to_tuple, range_boundaries
+from openpyxl.utils.datetime import (
+    CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel, from_ISO8601,
+)
+
+_NS       = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_NS_REL   = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_NS_PKG   = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+_ROW, _C, _V, _IS, _T, _R = (_NS + t for t in ('row', 'c', 'v', 'is', 't', 'r'))
+_SI, _MERGE = _NS + 'si', _NS + 'mergeCell'
+
+
+def _texte(noeud):
+    """Texte d'un <si> (chaîne partagée) ou <is> (chaîne en ligne) : texte
+    simple puis morceaux enrichis, sans les indications phonétiques
+    (comme Text.content d'openpyxl)."""
+    morceaux = [noeud.findtext(_T) or '']
+    morceaux += [r.findtext(_T) or '' for r in noeud.iterfind(_R)]
+    return ''.join(morceaux)
+
+
+def _nombre(texte):
+    if '.' in texte or 'E' in texte or 'e' in texte:
+        return float(texte)
+    return int(texte)
+
+
+class _Cellule:
+    """Cellule rendue par cell() / feuille['A6'] : sa seule valeur."""
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class PlageFusionnee:
+    """Plage de cellules fusionnées (bornes comme MergedCellRange)."""
+    __slots__ = ('min_col', 'min_row', 'max_col', 'max_row')
+
+    def __init__(self, ref):
+        self.min_col, self.min_row, self.max_col, self.max_row = range_boundaries(ref)
+
+
+class _Fusions:
+    """Équivalent de ws.merged_cells : .ranges, itérable."""
+
+    def __init__(self, ranges):
+        self.ranges = ranges
+
+    def __iter__(self):
+        return iter(self.ranges)
+
+
+class FeuilleXlsx:
+    """
+    Onglet d'un ClasseurXlsx. Lu au premier accès à son contenu (en flux,
+    ligne par ligne) puis gardé en mémoire sous forme compacte : seules les
+    valeurs non vides, par ligne. max_row / max_column suivent la même
+    règle qu'openpyxl (toute cellule écrite dans le fichier, même vide mais
+    mise en forme, et les plages fusionnées).
+    """
+
+    def __init__(self, parent, title, chemin, sheet_state):
+        self.parent      = parent
+        self.title       = title
+        self.sheet_state = sheet_state
+        self._chemin     = chemin
+        self._lignes     = None   # {ligne: {colonne: valeur}}
+
+    def _charger(self):
+        if self._lignes is not None:
+            return
+        classeur = self.parent
+        lignes = defaultdict(dict)
+        fusions = []
+        max_row = max_col = 0
+        ligne = 0
+        with classeur._archive.open(self._chemin) as f:
+            for _, elem in iterparse(f):
+                tag = elem.tag
+                if tag == _ROW:
+                    r = elem.get('r')
+                    ligne = int(r) if r else ligne + 1
+                    colonne = 0
+                    for c in elem.iterfind(_C):
+                        ref = c.get('r')
+                        if ref:
+                            row, colonne = coordinate_to_tuple(ref)
+                        else:
+                            row, colonne = ligne, colonne + 1
+                        max_row = max(max_row, row)
+                        max_col = max(max_col, colonne)
+                        valeur = classeur._valeur(c)
+                        if valeur is not None:
+                            lignes[row][colonne] = valeur
+                    elem.clear()
+                elif tag == _MERGE:
+                    plage = PlageFusionnee(elem.get('ref'))
+                    fusions.append(plage)
+                    max_row = max(max_row, plage.max_row)
+                    max_col = max(max_col, plage.max_col)
+        self._lignes = dict(lignes)
+        self._fusions = _Fusions(fusions)
+        self._max_row = max_row
+        self._max_col = max_col
+
+    @property
+    def max_row(self):
+        self._charger()
+        return self._max_row or 1
+
+    @property
+    def max_column(self):
+        self._charger()
+        return self._max_col or 1
+
+    @property
+    def merged_cells(self):
+        self._charger()
+        return self._fusions
+
+    def cell(self, row, column):
+        self._charger()
+        return _Cellule(self._lignes.get(row, {}).get(column))
+
+    def __getitem__(self, coordonnee):
+        return self.cell(*coordinate_to_tuple(coordonnee))
+
+    def iter_rows(self, min_row=None, max_row=None, min_col=None, max_col=None,
+                  values_only=False):
+        """Lignes min_row..max_row (par défaut : de 1 à max_row), chacune de
+        min_col à max_col (par défaut : de 1 à max_column) — comme
+        openpyxl, rien pour un onglet vide."""
+        self._charger()
+        if not self._max_row:
+            return
+        min_row, min_col = min_row or 1, min_col or 1
+        max_row, max_col = max_row or self._max_row, max_col or self._max_col
+        colonnes = range(min_col, max_col + 1)
+        for r in range(min_row, max_row + 1):
+            valeurs = self._lignes.get(r, {})
+            if values_only:
+                yield tuple(valeurs.get(c) for c in colonnes)
+            else:
+                yield tuple(_Cellule(valeurs.get(c)) for c in colonnes)
+
+
+class ClasseurXlsx:
+    """
+    Classeur .xlsx ouvert en lecture seule, cf. ouvrir_classeur. Seuls le
+    classeur, ses relations, les chaînes partagées et les styles (formats de
+    date) sont lus à l'ouverture ; chaque onglet l'est au premier accès.
+    Le fichier reste ouvert jusqu'à close() (ou fin de bloc with).
+    """
+
+    def __init__(self, source):
+        if isinstance(source, (bytes, bytearray)):
+            source = BytesIO(source)
+        self._archive = zipfile.ZipFile(source)
+        noms = set(self._archive.namelist())
+
+        cibles = self._relations('xl/_rels/workbook.xml.rels')
+        classeur = self._xml('xl/workbook.xml')
+        proprietes = classeur.find(_NS + 'workbookPr')
+        date1904 = proprietes is not None and proprietes.get('date1904') in ('1', 'true')
+        self.epoch = CALENDAR_MAC_1904 if date1904 else CALENDAR_WINDOWS_1900
+
+        self._chaines = []
+        chemin = cibles.get('sharedStrings', {}).get(None, 'xl/sharedStrings.xml')
+        if chemin in noms:
+            with self._archive.open(chemin) as f:
+                for _, elem in iterparse(f):
+                    if elem.tag == _SI:
+                        self._chaines.append(_texte(elem).replace('x005F_', ''))
+                        elem.clear()
+
+        self._formats_date, self._formats_duree = set(), set()
+        chemin = cibles.get('styles', {}).get(None, 'xl/styles.xml')
+        if chemin in noms:
+            self._lire_styles(self._xml(chemin))
+
+        self.worksheets = []
+        feuilles = cibles.get('worksheet', {})
+        for sheet in classeur.iter(_NS + 'sheet'):
+            chemin = feuilles.get(sheet.get(_NS_REL + 'id'))
+            if chemin in noms:
+                self.worksheets.append(FeuilleXlsx(self, sheet.get('name'), chemin,
+                                                   sheet.get('state', 'visible')))
+        self._par_nom = {ws.title: ws for ws in self.worksheets}
+
+    def _xml(self, chemin):
+        """Racine d'un petit XML de l'archive (classeur, relations, styles)."""
+        with self._archive.open(chemin) as f:
+            return parse(f).getroot()
+
+    def _relations(self, chemin):
+        """{type: {identifiant: chemin dans l'archive}} (type = fin de l'URI,
+        ex. 'worksheet', 'styles' ; identifiant None = premier de son type)."""
+        cibles = defaultdict(dict)
+        for rel in self._xml(chemin).iter(_NS_PKG + 'Relationship'):
+            cible = rel.get('Target')
+            if cible.startswith('/'):
+                cible = cible[1:]
+            else:
+                cible = posixpath.normpath(posixpath.join('xl', cible))
+            par_type = cibles[rel.get('Type').rsplit('/', 1)[-1]]
+            par_type[rel.get('Id')] = cible
+            par_type.setdefault(None, cible)
+        return cibles
+
+    def _lire_styles(self, styles):
+        personnalises = {int(f.get('numFmtId')): f.get('formatCode')
+                         for f in styles.iter(_NS + 'numFmt')}
+        cell_xfs = styles.find(_NS + 'cellXfs')
+        for idx, xf in enumerate(cell_xfs if cell_xfs is not None else ()):
+            num = int(xf.get('numFmtId', 0))
+            fmt = personnalises.get(num, BUILTIN_FORMATS.get(num))
+            if is_date_format(fmt):
+                self._formats_date.add(idx)
+            if is_timedelta_format(fmt):
+                self._formats_duree.add(idx)
+
+    def _valeur(self, c):
+        """Valeur d'un élément <c>, convertie comme par openpyxl (data_only)."""
+        t = c.get('t', 'n')
+        if t == 'inlineStr':
+            noeud = c.find(_IS)
+            return _texte(noeud) if noeud is not None else None
+        valeur = c.findtext(_V) or None
+        if valeur is None:
+            return None
+        if t == 'n':
+            valeur = _nombre(valeur)
+            style = int(c.get('s') or 0)
+            if style in self._formats_date:
+                try:
+                    return from_excel(valeur, self.epoch,
+                                      timedelta=style in self._formats_duree)
+                except (OverflowError, ValueError):
+                    return '#VALUE!'
+            return valeur
+        if t == 's':
+            return self._chaines[int(valeur)]
+        if t == 'b':
+            return bool(int(valeur))
+        if t == 'd':
+            return from_ISO8601(valeur)
+        return valeur   # 'str' (résultat de formule), 'e' (erreur : '#N/A'...)
+
+    @property
+    def sheetnames(self):
+        return [ws.title for ws in self.worksheets]
+
+    def __getitem__(self, nom):
+        return self._par_nom[nom]
+
+    def __contains__(self, nom):
+        return nom in self._par_nom
+
+    def close(self):
+        self._archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def ouvrir_classeur(source):
+    """Ouvre un .xlsx en lecture seule : `source` est un chemin, un fichier
+    ouvert en binaire ou le contenu du fichier (bytes)."""
+    return ClasseurXlsx(source)
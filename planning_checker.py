@@ -13,13 +13,11 @@ import re
 import unicodedata
 from collections import defaultdict
 from dataclasses import dataclass, field
-from io import BytesIO
-
-import openpyxl
 
+from lecture_xlsx import ouvrir_classeur
 from planning_engine_cpsat import (
     parse_parametres, parse_affectations, parse_horaires_agents,
-    parse_roulement_samedi, agent_disponible, is_vacataire, _parse_fr_date,
+    parse_roulement_samedi, IndexDisponibilite, is_vacataire, _parse_fr_date,
     parse_planning_type, parse_besoins_jeunesse, parse_jours_speciaux,
     parse_creneau as parse_creneau_engine,
 )
@@ -520,10 +518,21 @@ def verifier_jour(jour_data, semaine_label, semaine_num, vue_agent, agents_connu
     roulement_exceptions = prep.get('roulement_exceptions', {}) if prep else {}
     samedis_couleur = prep.get('params', {}).get('samedis', {}) if prep else {}
 
-    for agent, liste in occ_brutes.items():
-        if est_ignore(agent):
-            continue
-        occs = fusionner_occurrences(liste)
+    occs_par_agent = {agent: fusionner_occurrences(liste)
+                      for agent, liste in occ_brutes.items() if not est_ignore(agent)}
+
+    # Disponibilité (R1/R4, présence vacataire) précalculée une seule fois pour
+    # tous les agents × toutes les plages réellement planifiées ce jour-là,
+    # avec exactement la règle du moteur (cf. IndexDisponibilite). Aucun
+    # événement passé : ceux-ci sont contrôlés séparément plus bas.
+    dispo = None
+    if mode_complet:
+        plages = sorted({(o['debut'], o['fin']) for occs in occs_par_agent.values()
+                         for o in occs if o['type'] != 'Absence'})
+        dispo = IndexDisponibilite(list(occs_par_agent), plages, jour_cap, date_str,
+                                   horaires_agents, [], pause_flex, presences_vac)
+
+    for agent, occs in occs_par_agent.items():
         occs_travail = [o for o in occs if o['type'] != 'Absence']
 
         # R8 — Eloïse ne doit jamais apparaître
@@ -538,9 +547,10 @@ def verifier_jour(jour_data, semaine_label, semaine_num, vue_agent, agents_connu
 
         # R1 + R4 — horaires contractuels ET pause déjeuner, en un seul
         # contrôle certain (🔴) si les onglets de préparation sont
-        # disponibles : on réutilise directement agent_disponible(), la
-        # fonction que le moteur de calcul utilise lui-même pour décider si
-        # un agent peut être placé sur un créneau. Même règle, même vérité.
+        # disponibles : on réutilise directement la disponibilité calculée
+        # par le moteur lui-même (IndexDisponibilite, même règle
+        # qu'agent_disponible) pour décider si un agent peut être placé sur
+        # un créneau. Même règle, même vérité.
         if mode_complet and not est_vacataire(agent):
             h = horaires_agents.get(agent, {}).get(jour_cap)
             if h is None:
@@ -553,8 +563,7 @@ def verifier_jour(jour_data, semaine_label, semaine_num, vue_agent, agents_connu
                         'Horaires contractuels'))
             else:
                 for o in occs_travail:
-                    if not agent_disponible(agent, jour_cap, o['debut'], o['fin'], horaires_agents,
-                                             [], date_str, pause_flex):
+                    if not dispo.disponible(agent, o['debut'], o['fin']):
                         anomalies.append(Anomalie(
                             'rouge', semaine_label, jour,
                             f"{agent} est indiqué·e en {o['type']} de {fmt_min(o['debut'])} à {fmt_min(o['fin'])}, "
@@ -565,8 +574,7 @@ def verifier_jour(jour_data, semaine_label, semaine_num, vue_agent, agents_connu
             # Vacataire : présence définie par le tableau "Présence Vacataire"
             # du Paramètres (prioritaire), sinon par Horaires_Des_Agents.
             for o in occs_travail:
-                if not agent_disponible(agent, jour_cap, o['debut'], o['fin'], horaires_agents,
-                                         [], date_str, pause_flex, presences_vac):
+                if not dispo.disponible(agent, o['debut'], o['fin']):
                     anomalies.append(Anomalie(
                         'rouge', semaine_label, jour,
                         f"{agent} (vacataire) est indiqué·e de {fmt_min(o['debut'])} à {fmt_min(o['fin'])}, "
@@ -817,7 +825,9 @@ def verifier_jour(jour_data, semaine_label, semaine_num, vue_agent, agents_connu
 def verifier_planning(file_bytes):
     """file_bytes : bytes du classeur Excel du planning déjà rempli.
     Retourne une liste d'Anomalie."""
-    wb = openpyxl.load_workbook(BytesIO(file_bytes), data_only=True)
+    # Lecture seule, valeurs seules : lecteur du projet plutôt qu'openpyxl
+    # (cf. lecture_xlsx), nettement plus rapide sur un mois complet.
+    wb = ouvrir_classeur(file_bytes)
     anomalies = []
 
     prep = charger_donnees_preparation(wb)
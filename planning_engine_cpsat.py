@@ -5,13 +5,31 @@ Remplace l'ancien moteur glouton.
 """
 
 import datetime
+import gzip
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import queue
 import re
+import sqlite3
+import threading
+import time
 import unicodedata
-from collections import defaultdict
+from bisect import bisect_left
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 
+import numpy as np
 import openpyxl
 from ortools.sat.python import cp_model
 
+from lecture_xlsx import ouvrir_classeur
+
+_journal = logging.getLogger(__name__)
+
 # ══════════════════════════════════════════════════════════════
 #  CONSTANTES
 # ══════════════════════════════════════════════════════════════
@@ -24,13 +42,21 @@ JOURS_VAC    = {'Mercredi', 'Samedi'}   # jours où les vacataires peuvent trava
 # Nettoyé 08/2026 : les entrées H1/H2/H3/K1/K2/I2 ont été supprimées car mortes
 # (remplacées par le bonus vacataire V1/V2 et l'équité en 2 passes, tous deux
 # codés directement dans solve_day plutôt que via ce dictionnaire partagé).
+# Idem 09/2026 pour I1 (non-fragmentation) : ses variables "trou" n'étaient
+# bornées que par le haut, avec un poids positif dans un objectif minimisé —
+# toujours 0, donc jamais de pénalité, depuis l'origine. Supprimée plutôt
+# que réécrite : une vraie pénalité changerait les plannings.
 POIDS = {
     'G1_planning_type':        100,   # respecter le planning type
     'G2_meme_section_repl':     50,   # remplaçant même section principale
     'J1_section_principale':    30,   # agent dans sa section principale
     'J3_responsable':           25,   # responsables déprioritisés
-    'I1_non_fragmentation':     20,   # blocs continus préférés
 }
+# Couverture (passe 1 de solve_day), par place restée vide — aussi reprises
+# par la pré-analyse de couverture (_analyser_couverture)
+ALERTE_POIDS = 5000   # pénalité très forte : remplir RDC/Adulte/MF (D_FILL) — priorité maximale
+JEUNESSE_POIDS = 200  # pénalité plus faible : atteindre le nombre visé en Jeunesse cède
+                      # le pas si ça entre en conflit avec le remplissage RDC/Adulte/MF
 
 
 # ══════════════════════════════════════════════════════════════
@@ -95,15 +121,27 @@ def _detecter_onglet_horaires_grille(feuilles):
     return None
 
 
-def load_excel_data(filepath):
+def load_excel_data(filepath, lecture_seule=False):
     """Charge le fichier Excel et retourne un dict {nom_onglet: worksheet}.
 
     Ajoute automatiquement un alias sous le nom canonique de la grille
     "horaires d'équipes" si elle existe sous un autre nom dans le fichier
     (détection par mise en page, cf. _detecter_onglet_horaires_grille) —
     ainsi tout le reste du code peut continuer à la chercher sous son nom
-    habituel, quel que soit le nom réel de l'onglet dans le fichier source."""
-    wb = openpyxl.load_workbook(filepath, data_only=True)
+    habituel, quel que soit le nom réel de l'onglet dans le fichier source.
+
+    lecture_seule : onglets lus par le lecteur XLSX du projet (cf.
+    lecture_xlsx : valeurs seules, lues en flux) au lieu d'un classeur
+    openpyxl entièrement matérialisé — mêmes valeurs pour les parseurs, pour
+    une fraction de la mémoire et du temps de chargement. Le fichier reste
+    ouvert jusqu'à fermeture du classeur (ws.parent.close(), cf.
+    ContextePreparation) ; pas de mise en forme : les recopies d'onglets
+    mis en forme de generate_planning_excel_septembre exigent le mode
+    complet."""
+    if lecture_seule:
+        wb = ouvrir_classeur(filepath)
+    else:
+        wb = openpyxl.load_workbook(filepath, data_only=True)
     feuilles = {ws.title: ws for ws in wb.worksheets}
 
     if ONGLET_HORAIRES_GRILLE not in feuilles:
@@ -217,6 +255,15 @@ def parse_parametres(raw):
 
             presences_vac.setdefault(date_str, {})[vac_name] = (cs, ce)
 
+    # ── Budget de temps de calcul du mois (optionnel, en minutes) — cf. BudgetTemps
+    budget_calcul = None
+    try:
+        budget_min = float(params.get('Budget_calcul_minutes') or 0)
+    except (TypeError, ValueError):
+        budget_min = 0
+    if budget_min > 0:
+        budget_calcul = budget_min * 60
+
     return {
         'mois':          str(params.get('Mois', '')).strip(),
         'annee':         int(params.get('Année', 2026)),
@@ -227,6 +274,7 @@ def parse_parametres(raw):
         'semaines':      semaines,
         'mode_vac':      mode_vac,       # fallback
         'presences_vac': presences_vac,  # {date_str: {agent: (cs, ce)}}
+        'budget_calcul': budget_calcul,  # secondes, ou None (pas de budget global)
     }
 
 
@@ -837,6 +885,72 @@ def get_besoins_jour_normalise(besoins_periode, jour_key):
     return {}
 
 
+class IndexEvenements:
+    """
+    Événements du mois (sortie de parse_evenements) indexés par date et par
+    (date, agent), chaque liste triée par heure de début — remplace les
+    boucles `for ev in evenements: if ev['date'] != date_str: continue` qui
+    reparcouraient tout le mois pour chaque agent × créneau.
+
+    Les agents de chaque événement sont conservés en interne sous forme de
+    frozenset (test d'appartenance en O(1)) ; les requêtes retournent les
+    dicts d'origine, inchangés (leur liste 'agents' garde l'ordre de saisie,
+    utilisé tel quel pour l'affichage), dans l'ordre de l'onglet Événements.
+
+    Itérable comme la liste d'origine, pour rester compatible avec le code
+    qui parcourt encore `evenements` directement.
+    """
+
+    def __init__(self, evenements):
+        self.evenements = list(evenements)
+        self._par_date = defaultdict(list)        # {date: [(cs, ce, rang, agents, ev)]}
+        self._par_date_agent = defaultdict(list)  # {(date, agent): [idem]}
+        for rang, ev in enumerate(self.evenements):
+            agents = frozenset(ev.get('agents') or ())
+            entree = (ev['cs'], ev['ce'], rang, agents, ev)
+            self._par_date[ev['date']].append(entree)
+            for a in agents:
+                self._par_date_agent[ev['date'], a].append(entree)
+        # Tri par (début, fin, rang) : le rang, unique, évite de comparer
+        # les frozensets/dicts qui suivent dans le tuple.
+        for entrees in self._par_date.values():
+            entrees.sort(key=lambda e: e[:3])
+        for entrees in self._par_date_agent.values():
+            entrees.sort(key=lambda e: e[:3])
+
+    def __iter__(self):
+        return iter(self.evenements)
+
+    def __len__(self):
+        return len(self.evenements)
+
+    def du_jour(self, date_str, agent=None):
+        """Événements de cette date (concernant `agent` s'il est précisé)."""
+        entrees = (self._par_date.get(date_str, []) if agent is None
+                   else self._par_date_agent.get((date_str, agent), []))
+        return [e[4] for e in sorted(entrees, key=lambda e: e[2])]
+
+    def chevauchants(self, date_str, cs, ce, agent=None):
+        """Événements de cette date dont l'intervalle [cs, ce) chevauche
+        réellement le créneau (cs < ev.ce et ce > ev.cs), restreints à ceux
+        qui nomment `agent` s'il est précisé."""
+        entrees = (self._par_date.get(date_str, []) if agent is None
+                   else self._par_date_agent.get((date_str, agent), []))
+        # Listes triées par début : seuls les événements commençant avant la
+        # fin du créneau peuvent le chevaucher.
+        fin = bisect_left(entrees, (ce,))
+        trouves = [e for e in entrees[:fin] if e[1] > cs]
+        trouves.sort(key=lambda e: e[2])
+        return [e[4] for e in trouves]
+
+
+def _index_evenements(evenements):
+    """Accepte indifféremment une liste d'événements ou un IndexEvenements."""
+    if isinstance(evenements, IndexEvenements):
+        return evenements
+    return IndexEvenements(evenements or [])
+
+
 def agent_disponible(agent, jour, cs, ce, horaires_agents, evenements,
                      date_str, pause_flex, presences_vac=None):
     """
@@ -882,145 +996,956 @@ def agent_disponible(agent, jour, cs, ce, horaires_agents, evenements,
                     if not (cs >= dm and ce <= fa):
                         return False
 
-    # Événements bloquants
+    # Événements bloquants : seuls ceux de CE jour qui nomment l'agent
+    # (une liste d'agents vide = événement général sans impact sur les
+    # agents) et qui chevauchent le créneau → agent bloqué
+    if isinstance(evenements, IndexEvenements):
+        return not evenements.chevauchants(date_str, cs, ce, agent=agent)
     for ev in evenements:
         if ev['date'] != date_str:
             continue
-        # Si la liste d'agents est vide → événement général sans impact sur les agents
-        # Si la liste est non vide et l'agent n'y figure pas → pas concerné
         if not ev['agents'] or agent not in ev['agents']:
             continue
-        # Chevauchement → agent bloqué
         if cs < ev['ce'] and ce > ev['cs']:
             return False
 
     return True
 
 
+def _masque_contrat(h, cs, ce, continu):
+    """Version vectorisée (cs, ce : tableaux NumPy) du test "créneau dans les
+    horaires du jour" h = (dm, fm, da, fa) : matin, après-midi, ou journée
+    entière [dm, fa] si `continu` (pas de vraie coupure, ou pause flexible)."""
+    if not h:
+        return np.zeros(len(cs), dtype=bool)
+    dm, fm, da, fa = h
+    masque = np.zeros(len(cs), dtype=bool)
+    if dm is not None and fm is not None:
+        masque |= (cs >= dm) & (ce <= fm)
+    if da is not None and fa is not None:
+        masque |= (cs >= da) & (ce <= fa)
+    if continu and dm is not None and fa is not None:
+        masque |= (cs >= dm) & (ce <= fa)
+    return masque
+
+
+class IndexDisponibilite:
+    """
+    Disponibilité des agents pour UNE journée, précalculée une seule fois en
+    matrices booléennes NumPy (agents × créneaux), puis interrogée en O(1) —
+    au lieu de rappeler agent_disponible (qui relit les horaires et reparcourt
+    tous les événements du mois) pour chaque couple agent/créneau.
+
+    - `dispo`   : exactement la règle d'agent_disponible (horaires, pause
+                  contractuelle hors pause flexible, présence vacataire,
+                  événements bloquants du jour) — utilisée par le moteur et
+                  par le vérificateur.
+    - `contrat` : créneau dans les horaires contractuels au sens de
+                  l'AFFICHAGE (vue par agent) : la pause nominale (écart
+                  fm → da) est toujours exclue, pause flexible ou non, et les
+                  événements sont ignorés (gérés à part par la vue agent).
+
+    Un couple (agent, créneau) absent de l'index retombe sur le calcul
+    direct, pour ne jamais répondre faux.
+    """
+
+    def __init__(self, agents, creneaux, jour, date_str, horaires_agents,
+                 evenements, pause_flex, presences_vac=None):
+        self.agents   = list(agents)
+        self.creneaux = [tuple(cr) for cr in creneaux]
+        self._ligne   = {a: i for i, a in enumerate(self.agents)}
+        self._colonne = {}
+        for j, cr in enumerate(self.creneaux):
+            self._colonne.setdefault(cr, j)
+        evenements = _index_evenements(evenements)
+        self._contexte = (jour, date_str, horaires_agents, evenements,
+                          pause_flex, presences_vac)
+
+        cs = np.array([cr[0] for cr in self.creneaux], dtype=np.int32)
+        ce = np.array([cr[1] for cr in self.creneaux], dtype=np.int32)
+        self.dispo   = np.zeros((len(self.agents), len(self.creneaux)), dtype=bool)
+        self.contrat = np.zeros((len(self.agents), len(self.creneaux)), dtype=bool)
+
+        pv_jour = (presences_vac or {}).get(date_str, {})
+
+        for i, a in enumerate(self.agents):
+            h = horaires_agents.get(a, {}).get(jour)
+            if h:
+                self.contrat[i] = _masque_contrat(h, cs, ce, continu=(h[1] == h[2]))
+
+            if not is_vacataire(a):
+                if not h:
+                    continue  # pas de contrat ce jour → jamais disponible
+                dm, fm, da, fa = h
+                ligne = _masque_contrat(h, cs, ce,
+                                        continu=(fm == da or a in pause_flex))
+                # Pause contractuelle (sans pause flexible) : jamais pendant la pause
+                if a not in pause_flex and fm is not None and da is not None and fm < da:
+                    ligne &= ~((cs >= fm) & (ce <= da))
+            elif a in pv_jour:
+                # Vacataires : présence explicite du tableau Présence Vacataire
+                vac_cs, vac_ce = pv_jour[a]
+                ligne = (cs >= vac_cs) & (ce <= vac_ce)
+            else:
+                # Fallback : horaires contractuels
+                ligne = np.ones(len(self.creneaux), dtype=bool)
+                if h and h[0] is not None and h[3] is not None:
+                    ligne &= (cs >= h[0]) & (ce <= h[3])
+
+            for ev in evenements.du_jour(date_str, agent=a):
+                ligne &= ~((cs < ev['ce']) & (ce > ev['cs']))
+            self.dispo[i] = ligne
+
+    def disponible(self, agent, cs, ce):
+        """Même réponse qu'agent_disponible(agent, jour, cs, ce, ...)."""
+        i, j = self._ligne.get(agent), self._colonne.get((cs, ce))
+        if i is None or j is None:
+            jour, date_str, horaires_agents, evenements, pause_flex, presences_vac = self._contexte
+            return agent_disponible(agent, jour, cs, ce, horaires_agents, evenements,
+                                    date_str, pause_flex, presences_vac=presences_vac)
+        return bool(self.dispo[i, j])
+
+    def dans_contrat(self, agent, cs, ce):
+        """True si (cs, ce) tombe dans les horaires contractuels de l'agent
+        (sens "affichage", cf. docstring de la classe)."""
+        i, j = self._ligne.get(agent), self._colonne.get((cs, ce))
+        if i is None or j is None:
+            jour, _, horaires_agents = self._contexte[:3]
+            h = horaires_agents.get(agent, {}).get(jour)
+            return bool(h) and bool(_masque_contrat(
+                h, np.array([cs]), np.array([ce]), continu=(h[1] == h[2]))[0])
+        return bool(self.contrat[i, j])
+
+    def ligne(self, agent):
+        """Vecteur booléen de disponibilité de l'agent sur tous les créneaux."""
+        return self.dispo[self._ligne[agent]]
+
+
 # ══════════════════════════════════════════════════════════════
 #  MOTEUR CP-SAT — UNE JOURNÉE
 # ══════════════════════════════════════════════════════════════
 
-def solve_day(jour, date_str, creneaux_ouverts, agents_eligibles,
-              affectations, categories, responsables, pause_flex, priorite_rdc,
-              horaires_agents, evenements, besoins_jeunesse,
-              planning_type_jour, roulement_agents,
-              samedi_type=None, periode='Hors Vacances scolaires',
-              mode_vac=None, swap_map=None, presences_vac=None,
-              cumul_hebdo_avant=None):
+# Temps de calcul CP-SAT (secondes) : plafond d'UNE passe de solve_day, et
+# temps minimal garanti à la passe 1 même budget épuisé (sans elle, pas de
+# planning du tout pour la journée).
+TEMPS_MAX_PASSE = 30.0
+TEMPS_MIN_PASSE = 0.2
+TEMPS_DIAGNOSTIC = 10.0  # recherche des règles en conflit d'un jour sans solution
+
+# Familles de contraintes dures, telles que nommées par le diagnostic d'un
+# jour sans solution (cf. diagnostiquer_jour)
+FAMILLES_DURES = {
+    'A1':    'section non habilitée (Affectations)',
+    'A2':    'vacataire jamais en RDC',
+    'A3':    'Stéphane uniquement en MF',
+    'A4':    'au plus 1 agent par section RDC/Adulte/MF',
+    'D13':   'une seule section à la fois par agent',
+    'B1/B2': "hors horaires de l'agent ou pris par un événement",
+    'B3':    'vacataire non présent ce jour',
+    'D1':    'roulement du samedi',
+    'C3':    "pause déjeuner d'1h entre 12h et 14h",
+    'P7':    'plafond de 7h par jour',
+    'K3':    'vacataire seul en Jeunesse hors 12h-14h',
+    'F1/F2': "nombre d'agents en Jeunesse (planning-type / Besoins_Jeunesse)",
+    'D0':    'section sans personne au planning-type',
+    'H2':    "décompte d'heures hors bornes (cumul hebdo)",
+}
+
+
+class BudgetTemps:
     """
-    swap_map : {agent_absent: agent_remplacant} pour ce jour
-               ex: {'Guillaume': 'Robin'} si Guillaume est BLEU ce samedi ROUGE
-               et Robin a pris sa place
-    cumul_hebdo_avant : {agent: minutes de dépassement déjà cumulées cette
-               semaine, avant ce jour} — fourni par compute_full_planning,
-               remis à zéro à chaque nouvelle semaine. Sert à l'équité
-               hebdomadaire (§7bis, 08/2026) : évite qu'un même agent soit
-               systématiquement choisi comme remplaçant tous les jours de la
-               semaine, en tenant compte de ce qu'il a déjà fait en plus les
-               jours précédents.
+    Budget de temps de calcul CP-SAT partagé par un ensemble de jours (tout
+    le mois, ou une semaine en mode parallèle — cf. compute_full_planning).
+
+    Avant : chaque passe de solve_day disposait de 30 s, soit jusqu'à ~45 min
+    pour un mois difficile. Désormais, chaque jour reçoit une part égale de
+    ce qui RESTE du budget (le temps non utilisé par un jour facile revient
+    donc aux jours suivants), elle-même répartie entre les passes restantes
+    du jour, toujours dans la limite de TEMPS_MAX_PASSE par passe. Budget
+    épuisé : la passe 1 garde TEMPS_MIN_PASSE, les passes d'affinage 2 à 4
+    sont sautées (la solution de la passe précédente est conservée). Durée
+    totale bornée par total_secondes + nb_jours × TEMPS_MIN_PASSE.
+
+    total_secondes=None : pas de budget global (30 s par passe, comme avant),
+    mais le suivi par jour (`journal`) reste tenu.
+
+    Profil (09/2026) : chaque jour du journal détaille aussi ses passes
+    ('passes', dans l'ordre) — nom, statut CP-SAT, temps, objectif, meilleure
+    borne prouvée, plafond atteint, taille du modèle avant / après presolve
+    (cf. _taille_modele). Sert à voir quels jours et quelles passes coûtent
+    vraiment (cf. compute_full_planning, metadata['profil']).
+
+    Corpus de rejeu (09/2026) : tant que `modeles` est une liste (None par
+    défaut), chaque passe notée y ajoute aussi le modèle CP-SAT résolu et
+    les paramètres du solveur, en texte protobuf — cf. solve_day,
+    `enregistrement`.
     """
-    if swap_map is None:
-        swap_map = {}
-    if cumul_hebdo_avant is None:
-        cumul_hebdo_avant = {}
+
+    def __init__(self, total_secondes=None, nb_jours=1):
+        self.total          = total_secondes
+        self.restant        = total_secondes
+        self.jours_restants = max(1, nb_jours)
+        self.journal        = []  # [{date, alloue, utilise, plafond_atteint, passes}] par jour
+        self.modeles        = None  # [{passe, modele, parametres, ...}] si enregistrés
+        self._jour          = None
+
+    def ouvrir_jour(self, date_str, nb_passes, nb_jours=1):
+        """Début d'une journée qui fera (au plus) nb_passes passes — ou de
+        nb_jours journées résolues ensemble (solve_week)."""
+        nb_jours = min(nb_jours, self.jours_restants)
+        alloue = (None if self.restant is None
+                  else max(0.0, self.restant) * nb_jours / self.jours_restants)
+        self._jour = {'date': date_str, 'alloue': alloue, 'utilise': 0.0,
+                      'plafond_atteint': False, 'passes': []}
+        self._passes_restantes = max(1, nb_passes)
+        self._nb_jours = nb_jours
+        self._epuise = False
+
+    def temps_passe(self, obligatoire=False):
+        """Temps maximal de la prochaine passe, ou None s'il ne reste pas
+        de quoi la lancer (passe d'affinage à sauter — et toutes les
+        suivantes du jour, chacune ne bornant que le niveau précédent).
+        Plafond : TEMPS_MAX_PASSE × nb_jours de la période, pour une passe
+        commune à ces jours (cf. _equite_jointe) ; les passes d'un seul jour
+        d'une période de plusieurs jours le ramènent à TEMPS_MAX_PASSE
+        (temps_max de _resoudre_par_passes)."""
+        alloue = self._jour['alloue']
+        if self._epuise and not obligatoire:
+            return None
+        if alloue is None:
+            return TEMPS_MAX_PASSE * self._nb_jours
+        part = min(TEMPS_MAX_PASSE * self._nb_jours,
+                   (alloue - self._jour['utilise']) / self._passes_restantes)
+        if part < TEMPS_MIN_PASSE:
+            return TEMPS_MIN_PASSE if obligatoire else None
+        return part
+
+    def noter_passe(self, solver, status, passes=1, nom='passe', model=None):
+        """Enregistre une passe terminée (profil : `nom`). Une passe arrêtée
+        sans preuve d'optimalité (FEASIBLE / UNKNOWN) a atteint son plafond
+        de temps.
+        passes : nombre de passes prévues qu'elle accomplit — 2 quand elle
+        rend la passe 1 inutile, 0 pour une tentative sans suite dont seul
+        le temps compte (cf. _resoudre_par_passes).
+        model : modèle tel qu'il vient d'être résolu (objectif, indices),
+        gardé dans `modeles` si on les enregistre."""
+        plafond = status in (cp_model.FEASIBLE, cp_model.UNKNOWN)
+        resolue = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        self._jour['utilise'] += solver.wall_time
+        self._jour['passes'].append({
+            'passe':    nom,
+            'statut':   status.name,
+            'temps':    solver.wall_time,
+            'objectif': solver.objective_value if resolue else None,
+            'borne':    solver.best_objective_bound if resolue else None,
+            'plafond':  plafond,
+            **_taille_modele(solver),
+        })
+        if self.modeles is not None and model is not None:
+            self.modeles.append(dict(self._jour['passes'][-1],
+                                     modele=str(model.proto),
+                                     parametres=str(solver.parameters)))
+        if not passes:
+            return
+        self._passes_restantes = max(1, self._passes_restantes - passes)
+        if plafond:
+            self._jour['plafond_atteint'] = True
+
+    def reprendre(self):
+        """Nouvelle série de passes dans la journée ouverte (solve_week : un
+        jour après l'autre) — une passe sautée plus tôt n'empêche plus de
+        lancer les suivantes."""
+        self._epuise = False
+
+    def sauter_passe(self, nom='passe'):
+        """Passe d'affinage non lancée faute de budget."""
+        self._jour['passes'].append({'passe': nom, 'statut': 'SAUTÉE', 'temps': 0.0,
+                                     'objectif': None, 'borne': None, 'plafond': True})
+        self._passes_restantes = max(1, self._passes_restantes - 1)
+        self._jour['plafond_atteint'] = True
+        self._epuise = True
+
+    def fermer_jour(self):
+        """Fin de la journée : reporte son temps réel sur le budget restant."""
+        jour, self._jour = self._jour, None
+        if self.restant is not None:
+            self.restant -= jour['utilise']
+        self.jours_restants = max(1, self.jours_restants - self._nb_jours)
+        self.journal.append(jour)
+        return jour
+
+
+# Chercheurs CP-SAT demandés par passe (accordés par le gouverneur ci-dessous,
+# éventuellement moins si la machine est chargée) — jamais moins de
+# NB_CHERCHEURS_MIN : mesuré 09/2026 sur un mois réel, avec 1 ou 2 chercheurs
+# CP-SAT n'arrive plus à prouver l'optimalité de certaines journées de
+# vacances en 30 s (mois 15 à 20 fois plus long), alors que 3 ou 4 chercheurs
+# sur un seul cœur restent aussi rapides. Sur petite machine, mieux vaut donc
+# faire ATTENDRE une résolution que lui retirer des chercheurs.
+NB_CHERCHEURS = 4
+NB_CHERCHEURS_MIN = 3
+
+
+def _coeurs_disponibles():
+    """Cœurs réellement utilisables par CE processus (affinité CPU : un
+    conteneur à 2 vCPU voit souvent tous les cœurs de l'hôte via cpu_count)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # pas d'affinité sur cette plateforme (macOS, Windows)
+        return os.cpu_count() or 1
+
+
+class GouverneurCPU:
+    """
+    Répartit les cœurs du processus entre les résolutions CP-SAT en cours
+    (09/2026). Avant : chaque passe lançait 4 chercheurs, même sur un
+    conteneur à 1-2 vCPU et même quand plusieurs utilisateurs généraient
+    leur planning en même temps (sessions Streamlit = threads d'un même
+    processus) — la machine était sur-souscrite et chaque calcul ralentissait.
+
+    Chaque résolution demande ses chercheurs via `reserver` : elle reçoit au
+    plus ce qui reste de libre, jamais moins de NB_CHERCHEURS_MIN, et attend
+    son tour (file FIFO) tant que ce minimum n'est pas libre — sauf si elle
+    est seule, auquel cas elle part toujours (petite machine : les
+    résolutions passent alors une par une). Capacité = cœurs de l'affinité CPU,
+    plafonnée par `max_coeurs` (ou la variable d'environnement
+    PLANNING_MAX_COEURS_CPSAT). Décisions tracées dans le journal (logging)
+    du module.
     """
-    Résout le planning d'une journée avec CP-SAT.
 
-    Paramètres :
-    - creneaux_ouverts : liste de (cs, ce)
-    - agents_eligibles : liste d'agents pouvant travailler ce jour
-    - planning_type_jour : {creneau_str: {section: [agents]}}
-    - roulement_agents : {agent: 'ROUGE'|'BLEU'} pour ce jour (samedi)
+    def __init__(self, max_coeurs=None):
+        self._condition = threading.Condition()
+        self._file      = deque()  # tickets des résolutions en attente
+        self._ticket    = 0
+        self.occupes    = 0        # chercheurs accordés, résolutions en cours
+        self.en_cours   = 0        # résolutions en cours
+        self.configurer(max_coeurs)
+
+    def configurer(self, max_coeurs=None):
+        if max_coeurs is None:
+            max_coeurs = os.environ.get('PLANNING_MAX_COEURS_CPSAT') or None
+        try:
+            max_coeurs = int(max_coeurs) if max_coeurs else None
+        except ValueError:
+            _journal.warning('PLANNING_MAX_COEURS_CPSAT invalide (%r) : ignoré', max_coeurs)
+            max_coeurs = None
+        coeurs = _coeurs_disponibles()
+        with self._condition:
+            self.capacite = max(1, min(coeurs, max_coeurs) if max_coeurs else coeurs)
+            self._condition.notify_all()
+        _journal.info('Gouverneur CP-SAT : %d cœur(s) (affinité %d, plafond %s)',
+                      self.capacite, coeurs, max_coeurs or '—')
+
+    def _peut_partir(self, ticket):
+        return self._file[0] == ticket and (
+            self.occupes == 0 or self.capacite - self.occupes >= NB_CHERCHEURS_MIN)
+
+    @contextmanager
+    def reserver(self, souhaites=NB_CHERCHEURS):
+        """Attend son tour dans la file (FIFO) jusqu'à ce que
+        NB_CHERCHEURS_MIN cœurs soient libres — ou qu'aucune autre
+        résolution ne soit en cours, auquel cas elle part toujours — puis
+        fournit, pour la durée du bloc `with`, le nombre de chercheurs
+        accordés : min(souhaites, max(NB_CHERCHEURS_MIN, cœurs libres)) —
+        jamais moins de NB_CHERCHEURS_MIN pour une demande d'au moins
+        autant, quitte à dépasser la capacité d'une petite machine (cf.
+        NB_CHERCHEURS_MIN)."""
+        with self._condition:
+            self._ticket += 1
+            ticket = self._ticket
+            self._file.append(ticket)
+            if not self._peut_partir(ticket):
+                _journal.info('CP-SAT saturé (%d/%d cœurs, %d résolution(s)) : '
+                              'résolution #%d en file (%d en attente)',
+                              self.occupes, self.capacite, self.en_cours,
+                              ticket, len(self._file))
+            while not self._peut_partir(ticket):
+                self._condition.wait()
+            self._file.popleft()
+            accordes = min(souhaites, max(NB_CHERCHEURS_MIN, self.capacite - self.occupes))
+            self.occupes  += accordes
+            self.en_cours += 1
+            _journal.debug('Résolution #%d : %d chercheur(s) sur %d demandé(s) '
+                           '(%d/%d cœurs occupés)', ticket, accordes, souhaites,
+                           self.occupes, self.capacite)
+            self._condition.notify_all()  # le suivant de la file peut avoir sa part
+        try:
+            yield accordes
+        finally:
+            with self._condition:
+                self.occupes  -= accordes
+                self.en_cours -= 1
+                self._condition.notify_all()
+
+
+GOUVERNEUR = GouverneurCPU()
+
+
+def configurer_gouverneur(max_coeurs=None):
+    """Plafonne les cœurs utilisés par CP-SAT dans ce processus (sert aussi
+    d'initialiseur aux processus fils du mode parallèle)."""
+    GOUVERNEUR.configurer(max_coeurs)
+
+
+def _resoudre(solver, model):
+    """solver.solve(model), avec le nombre de chercheurs accordé par le
+    gouverneur (attend son tour si la machine est saturée) — pour un
+    SolveurPortefeuille, chercheurs de toutes ses configurations."""
+    souhaites = NB_CHERCHEURS
+    if isinstance(solver, SolveurPortefeuille):
+        souhaites *= len(solver.reglages)
+    with GOUVERNEUR.reserver(souhaites) as chercheurs:
+        solver.parameters.num_search_workers = chercheurs
+        return solver.solve(model)
+
+
+def _creer_solveur(reparer_indices=False, temps_max=TEMPS_MAX_PASSE, portefeuille=False):
+    """Solveur CP-SAT réglé comme pour toutes les passes de solve_day
+    (nombre de chercheurs fixé au lancement, cf. _resoudre) ;
+    portefeuille=True : SolveurPortefeuille avec ces mêmes réglages."""
+    solver = SolveurPortefeuille() if portefeuille else cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = temps_max
+    solver.parameters.num_search_workers  = NB_CHERCHEURS
+    # Graine fixe (08/2026) : sans ça, avec 4 chercheurs en parallèle, le
+    # solveur peut trancher différemment entre deux solutions à égalité de
+    # score d'un lancement à l'autre — même moteur, mêmes données, résultat
+    # parfois différent. Fixer la graine rend le planning reproductible.
+    solver.parameters.random_seed = 42
+    # Journal de CP-SAT gardé dans sa réponse, sans affichage : taille du
+    # modèle avant / après presolve, pour le profil (cf. _taille_modele).
+    solver.parameters.log_search_progress = True
+    solver.parameters.log_to_stdout       = False
+    solver.parameters.log_to_response     = True
+    if reparer_indices:
+        # Mode "réparation" : si l'indice s'avère incompatible avec le modèle
+        # (ne devrait pas arriver entre deux passes, mais sert de filet de
+        # sécurité), le solveur cherche d'abord la solution faisable la plus
+        # proche de l'indice au lieu de l'ignorer silencieusement.
+        solver.parameters.repair_hint = True
+        solver.parameters.hint_conflict_limit = 1000
+    return solver
+
+
+def _indiquer_solution(model, solver):
+    """Remplace les indices du modèle par la solution complète (toutes les
+    variables, y compris auxiliaires) trouvée par `solver` — point de départ
+    de la passe suivante."""
+    _indiquer_valeurs(model, solver.response_proto.solution)
+
+
+def _indiquer_valeurs(model, valeurs):
+    """Remplace les indices du modèle par `valeurs` (une par variable)."""
+    model.clear_hints()
+    model.proto.solution_hint.vars.extend(range(len(valeurs)))
+    model.proto.solution_hint.values.extend(valeurs)
+
+
+def _lire_taille_modele(journal_cpsat):
+    """Nombre de variables et de contraintes du modèle initial et du modèle
+    après presolve, lus dans le journal de CP-SAT (solve_log) — sections
+    "Initial/Presolved optimization model" : ligne #Variables, puis une
+    ligne #kType: n par type de contrainte (milliers séparés par « ' »).
+    None pour ce qui n'y est pas."""
+    taille = dict.fromkeys(('variables', 'contraintes',
+                            'variables_presolve', 'contraintes_presolve'))
+    suffixe = None
+    def nombre(ligne):
+        return int(ligne.split()[1].replace("'", ''))
+
+    for ligne in journal_cpsat.splitlines():
+        if ligne.startswith('Initial optimization model'):
+            suffixe = ''
+        elif ligne.startswith('Presolved optimization model'):
+            suffixe = '_presolve'
+        elif suffixe is None:
+            continue
+        elif ligne.startswith('#Variables:'):
+            taille['variables' + suffixe] = nombre(ligne)
+        elif ligne.startswith('#k'):
+            cle = 'contraintes' + suffixe
+            taille[cle] = (taille[cle] or 0) + nombre(ligne)
+        elif not ligne.strip() and taille['variables' + suffixe] is not None:
+            suffixe = None  # fin de la section
+    return taille
+
+
+def _taille_modele(solver):
+    """Taille du modèle avant / après presolve de la dernière résolution de
+    `solver` (cf. _lire_taille_modele)."""
+    if isinstance(solver, SolveurPortefeuille):
+        return dict(solver.taille_modele)
+    return _lire_taille_modele(solver.response_proto.solve_log)
+
+
+# ── Portefeuille de solveurs (09/2026) ─────────────────────────
+# Réglages CP-SAT lancés en parallèle par SolveurPortefeuille, chacun en
+# plus des réglages communs de _creer_solveur (format texte des
+# SatParameters). L'ordre sert aussi à départager deux résultats
+# équivalents : le premier de la liste l'emporte.
+PORTEFEUILLE = [
+    '',                                            # réglage habituel (graine 42)
+    'random_seed: 7 linearization_level: 2',       # relaxation LP renforcée
+    'random_seed: 1234 optimize_with_core: true',  # bornes par noyaux insatisfiables
+    'random_seed: 2026 search_branching: PORTFOLIO_WITH_QUICK_RESTART_SEARCH',
+]
+
+
+def _resoudre_configuration(texte_modele, texte_parametres, reglage, indice, file):
+    """Processus fils de SolveurPortefeuille : résout le modèle (format
+    texte) avec les paramètres communs + `reglage`, et dépose dans `file`
+    (indice, statut, objectif, meilleure borne, solution, taille du modèle)."""
+    model = cp_model.CpModel()
+    model.proto.parse_text_format(texte_modele)
+    solver = cp_model.CpSolver()
+    solver.parameters.parse_text_format(texte_parametres)
+    solver.parameters.merge_text_format(reglage)
+    status = solver.solve(model)
+    taille = _lire_taille_modele(solver.response_proto.solve_log)
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        file.put((indice, status, solver.objective_value, solver.best_objective_bound,
+                  list(solver.response_proto.solution), taille))
+    else:
+        file.put((indice, status, None, None, None, taille))
 
-    Retourne : {creneau_idx: {section: [agents]}} ou None si infaisable
+
+class SolveurPortefeuille(cp_model.CpSolver):
+    """
+    Solveur "portefeuille" (09/2026), utilisable partout à la place d'un
+    CpSolver (cf. _creer_solveur, portefeuille=True) : `solve` lance les
+    réglages de PORTEFEUILLE en parallèle, chacun dans son propre processus,
+    et garde le meilleur résultat. Dès qu'une configuration a PROUVÉ son
+    résultat (optimum, ou infaisabilité), les autres sont arrêtées. Sert
+    aux journées difficiles (samedis de vacances, grille Jeunesse fine),
+    où un seul réglage tombe parfois sur une recherche longue.
+
+    Résultat reproductible : la première configuration qui prouve
+    l'optimum arrête la course, et laquelle dépend de la charge de la
+    machine — or deux configurations rendent souvent deux affectations
+    différentes, de même score. Seule la VALEUR optimale prouvée est donc
+    gardée : le modèle est résolu une dernière fois ici, objectif fixé à
+    cette valeur, avec le réglage habituel (PORTEFEUILLE[0], graine fixe)
+    et un seul chercheur, donc de façon déterministe — l'affectation rendue
+    ne dépend plus de la configuration gagnante. Sans preuve
+    d'optimum (temps écoulé), départage : meilleur objectif, puis ordre de
+    PORTEFEUILLE ; comme pour un solveur seul arrêté par le temps, le
+    résultat dépend alors de la vitesse de la machine.
+
+    Les chercheurs accordés par le gouverneur (cf. _resoudre) sont répartis
+    entre les configurations, jamais moins de NB_CHERCHEURS_MIN chacune :
+    sur une petite machine, seules les premières sont lancées — une seule,
+    dans ce processus, revient à la résolution habituelle. Il faut donc au
+    moins 2 × NB_CHERCHEURS_MIN = 6 cœurs accordés pour lancer deux
+    configurations : sur 1 à 5 vCPU, portefeuille=True ne change rien
+    (signalé une fois dans le journal du module).
+
+    Sans preuve, la solution gagnante est rejouée dans CE solveur
+    (variables fixées par indice, sans recherche) ; dans les deux cas,
+    value(), objective_value, response_proto... s'utilisent comme
+    d'habitude. wall_time est la durée totale du portefeuille,
+    best_objective_bound et taille_modele (cf. _taille_modele) ceux de la
+    configuration retenue. Si la résolution à objectif fixé ou le rejeu
+    échoue (temps écoulé, indice refusé après l'aller-retour en texte), le
+    modèle est résolu ici normalement, la solution gagnante en simple
+    indice : le statut rendu est alors celui de cette résolution.
     """
-    if mode_vac is None:
-        mode_vac = JOURS_VAC
 
-    model  = cp_model.CpModel()
-    agents = list(agents_eligibles)
+    _repli_signale = False   # portefeuille réduit à une configuration (journal)
+
+    def __init__(self, reglages=None):
+        super().__init__()
+        self.reglages = PORTEFEUILLE if reglages is None else reglages
+        self.gagnant  = None   # indice dans `reglages` du résultat retenu
+        self.taille_modele = _lire_taille_modele('')
+        self._duree   = 0.0
+        self._borne   = None
+
+    @property
+    def wall_time(self):
+        return self._duree
+
+    @property
+    def best_objective_bound(self):
+        return self._borne
+
+    def solve(self, model, solution_callback=None):
+        debut = time.perf_counter()
+        chercheurs = self.parameters.num_search_workers
+        nb = max(1, min(len(self.reglages), chercheurs // NB_CHERCHEURS_MIN))
+        if nb == 1:
+            if len(self.reglages) > 1 and not SolveurPortefeuille._repli_signale:
+                SolveurPortefeuille._repli_signale = True
+                _journal.info('Portefeuille : %d chercheur(s) accordé(s), il en faut %d '
+                              'pour lancer 2 configurations — résolution habituelle',
+                              chercheurs, 2 * NB_CHERCHEURS_MIN)
+            self.parameters.merge_text_format(self.reglages[0])
+            status = super().solve(model, solution_callback)
+            self.gagnant, self._duree = 0, time.perf_counter() - debut
+            self._borne = super().best_objective_bound
+            self.taille_modele = _lire_taille_modele(self.response_proto.solve_log)
+            return status
+
+        self.parameters.num_search_workers = chercheurs // nb
+        # Processus créés comme ceux du mode parallèle de compute_full_planning
+        # (méthode par défaut de la plateforme) ; modèle et paramètres passés
+        # en format texte, valables quelle que soit la méthode.
+        contexte = multiprocessing.get_context()
+        file = contexte.Queue()
+        texte_modele, texte_parametres = str(model.proto), str(self.parameters)
+        processus = [contexte.Process(target=_resoudre_configuration,
+                                      args=(texte_modele, texte_parametres, reglage, i, file))
+                     for i, reglage in enumerate(self.reglages[:nb])]
+        resultats = []
+        try:
+            for p in processus:
+                p.start()
+            while len(resultats) < nb:
+                try:
+                    resultats.append(file.get(timeout=0.05))
+                except queue.Empty:
+                    if not any(p.is_alive() for p in processus) and file.empty():
+                        break  # configuration morte sans résultat
+                    continue
+                if resultats[-1][1] in (cp_model.OPTIMAL, cp_model.INFEASIBLE):
+                    # Preuve obtenue : les résultats déjà arrivés participent
+                    # au départage, les configurations encore en cours sont
+                    # arrêtées.
+                    while True:
+                        try:
+                            resultats.append(file.get_nowait())
+                        except queue.Empty:
+                            break
+                    break
+        finally:
+            for p in processus:
+                if p.is_alive():
+                    p.terminate()
+            for p in processus:
+                if p.pid is not None:
+                    p.join()
+
+        def rang(resultat):
+            indice, status, objectif, _, solution, _ = resultat
+            return (status not in (cp_model.OPTIMAL, cp_model.INFEASIBLE),
+                    solution is None, objectif or 0, indice)
+
+        if not resultats:
+            self._duree = time.perf_counter() - debut
+            return cp_model.UNKNOWN
+        self.gagnant, status, objectif, self._borne, solution, self.taille_modele = min(
+            resultats, key=rang)
+        if solution is not None:
+            self.parameters.num_search_workers = chercheurs
+            self.parameters.merge_text_format(self.reglages[0])
+            if status == cp_model.OPTIMAL and model.has_objective():
+                # Optimum prouvé : affectation recalculée à objectif fixé
+                etape = 'résolution à objectif fixé'
+                resolu = self._resoudre_objectif_fixe(model, objectif)
+            else:
+                # Rejeu de la solution gagnante : chaque variable fixée à sa valeur
+                etape = 'rejeu'
+                resolu = self._rejouer(model, solution)
+            if resolu not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                _journal.warning('Portefeuille : %s de la configuration %d en échec '
+                                 '(%s) — résolution normale, solution en indice',
+                                 etape, self.gagnant, resolu.name)
+                copie = model.clone()
+                _indiquer_valeurs(copie, solution)
+                status = super().solve(copie)
+                self._borne = super().best_objective_bound
+        _journal.debug('Portefeuille : configuration %d retenue (%s) sur %d',
+                       self.gagnant, status.name, nb)
+        self._duree = time.perf_counter() - debut
+        return status
+
+    def _resoudre_objectif_fixe(self, model, objectif):
+        """Résout une copie du modèle avec l'objectif fixé à `objectif`
+        (valeur prouvée optimale), sans la solution gagnante en indice, avec
+        un seul chercheur (recherche déterministe, et rapide une fois
+        l'objectif fixé) : même modèle, même affectation, d'un lancement à
+        l'autre."""
+        copie = model.clone()
+        proto = copie.proto.objective
+        echelle = proto.scaling_factor or 1
+        valeur = round(objectif / echelle - proto.offset)
+        fixe = copie.proto.constraints.add().linear
+        fixe.vars.extend(proto.vars)
+        fixe.coeffs.extend(proto.coeffs)
+        fixe.domain.extend([valeur, valeur])
+        chercheurs = self.parameters.num_search_workers
+        self.parameters.num_search_workers = 1
+        status = super().solve(copie)
+        self.parameters.num_search_workers = chercheurs
+        return status
+
+    def _rejouer(self, model, solution):
+        """Rejoue `solution` (toutes les variables) sur une copie du modèle,
+        sans recherche."""
+        copie = model.clone()
+        _indiquer_valeurs(copie, solution)
+        chercheurs = self.parameters.num_search_workers
+        self.parameters.fix_variables_to_their_hinted_value = True
+        self.parameters.num_search_workers = 1
+        status = super().solve(copie)
+        self.parameters.fix_variables_to_their_hinted_value = False
+        self.parameters.num_search_workers = chercheurs
+        return status
+
+
+def _ajouter_durees_consecutives(model, agents, creneaux_ouverts, x_agent_cren,
+                                 ideal_pour, tolere_pour):
+    """
+    C1/C2 : durée de travail CONSÉCUTIVE par agent (seuil idéal / seuil toléré,
+    cf. solve_day).
+
+    Formulation en taille LINÉAIRE (09/2026) : l'ancienne version énumérait
+    toutes les fenêtres (début, fin) de créneaux contigus et reconstruisait
+    pour chacune une somme sur toutes les sections — O(n_cren²) contraintes
+    par agent, ingérable sur une grille au quart d'heure. Ici, par agent et
+    par créneau : un booléen "travaille à c" et un compteur `consec` des
+    minutes travaillées d'affilée jusqu'à la fin de c (remis à zéro dès que
+    l'agent ne travaille pas c, ou à chaque rupture de la grille). Chaque
+    créneau où ce compteur dépasse un seuil est pénalisé une fois, par le
+    seul palier atteint (comme l'ancien `if … elif`, sans cumul) :
+    - au-delà du seuil TOLÉRÉ : 150, à ajouter aux pénalités de passe 1 ;
+    - au-delà du seuil IDÉAL, sans dépasser le toléré : 40, à ajouter aux
+      pénalités de qualité.
+    Les variables ne sont créées que là où le seuil est atteignable (durée
+    maximale d'affilée possible, vu les créneaux admissibles de l'agent).
+
+    Retourne (termes_couverture, termes_qualite).
+    """
+    termes_couverture, termes_qualite = [], []
+    for a in agents:
+        ideal_c  = ideal_pour(a)
+        tolere_c = tolere_pour(a)
+        # Blocs de créneaux contigus où l'agent PEUT travailler, avec la durée
+        # maximale d'affilée atteignable à la fin de chaque créneau. Un bloc
+        # qui ne peut pas dépasser le seuil idéal ne crée aucune variable.
+        blocs, bloc, max_prec = [], [], 0
+        for c, (cs, ce) in enumerate(creneaux_ouverts):
+            contigu = c > 0 and creneaux_ouverts[c - 1][1] == cs
+            if not x_agent_cren[a, c] or not contigu:
+                if bloc:
+                    blocs.append(bloc)
+                bloc, max_prec = [], 0
+            if x_agent_cren[a, c]:
+                max_prec += ce - cs
+                bloc.append((c, ce - cs, max_prec))
+        if bloc:
+            blocs.append(bloc)
+
+        for bloc in blocs:
+            if bloc[-1][2] <= ideal_c:
+                continue
+            consec_prec = 0
+            for c, duree, max_c in bloc:
+                travaille = model.new_bool_var(f'travaille_{a}_{c}')
+                model.add(travaille == sum(x_agent_cren[a, c]))
+                consec = model.new_int_var(0, max_c, f'consec_{a}_{c}')
+                model.add(consec == consec_prec + duree).only_enforce_if(travaille)
+                model.add(consec == 0).only_enforce_if(travaille.negated())
+                au_dela_tolere = []
+                if max_c > tolere_c:
+                    viol_tolere = model.new_bool_var(f'consec_tolere_viol_{a}_{c}')
+                    model.add(consec <= tolere_c).only_enforce_if(viol_tolere.negated())
+                    model.add(consec > tolere_c).only_enforce_if(viol_tolere)
+                    termes_couverture.append(150 * viol_tolere)
+                    au_dela_tolere = [viol_tolere.negated()]
+                if max_c > ideal_c:
+                    viol = model.new_bool_var(f'consec_viol_{a}_{c}')
+                    model.add(consec <= ideal_c).only_enforce_if([viol.negated()]
+                                                                 + au_dela_tolere)
+                    termes_qualite.append(40 * viol)
+                consec_prec = consec
+    return termes_couverture, termes_qualite
+
+
+class GabaritJour:
+    """
+    Modèle CP-SAT d'une journée, construit une fois pour toutes pour une
+    combinaison (jour, samedi, période, grille de créneaux, agents, B3/D1,
+    swaps) — cf. solve_day / _construire_gabarit_jour. Ne contient QUE ce qui
+    est identique d'une date à l'autre ; ce qui est propre à la date est
+    porté par des variables (ou des bornes de x) fixées dans `instancier`.
+    """
+
+    def __init__(self, agents, model, x, penalites, penalites_stabilite,
+                 penalites_qualite, penalites_equite, alertes, jeunesse_requis,
+                 jeunesse_pt, lignes_jeunesse, pt_indexed, fill_requis,
+                 depas_par_agent, ev_minutes, cumul_avant):
+        self.agents              = agents
+        self._ligne              = {a: i for i, a in enumerate(agents)}
+        self.model               = model
+        self.x                   = x
+        self.penalites           = penalites
+        self.penalites_stabilite = penalites_stabilite
+        self.penalites_qualite   = penalites_qualite
+        self.penalites_equite    = penalites_equite
+        self.alertes             = alertes
+        self.jeunesse_requis     = jeunesse_requis
+        self.jeunesse_pt         = jeunesse_pt
+        self.lignes_jeunesse     = lignes_jeunesse
+        self.pt_indexed          = pt_indexed
+        self.fill_requis         = fill_requis
+        self.depas_par_agent     = depas_par_agent
+        self.ev_minutes          = ev_minutes
+        self.cumul_avant         = cumul_avant
+
+    def instancier(self, dispo, ev_minutes, cumul_hebdo_avant):
+        """
+        Copie du modèle pour UNE date, bornes corrigées (cf. recaler) —
+        le modèle d'origine n'est jamais modifié (les passes de solve_day
+        ajoutent leurs bornes à la copie). Les variables du gabarit restent
+        valables telles quelles sur la copie (mêmes indices).
+        Retourne (model, x_jour, jeunesse_requis).
+        """
+        model = self.model.clone()
+        x_jour, jeunesse_requis = self.recaler(model, dispo, ev_minutes,
+                                               cumul_hebdo_avant)
+        return model, x_jour, jeunesse_requis
+
+    def recaler(self, model, dispo, ev_minutes, cumul_hebdo_avant=None):
+        """
+        Fixe dans `model` (le modèle du gabarit ou une copie) les bornes
+        propres à UNE date :
+        - dispo : matrice agents × créneaux de disponibilité du jour
+          (IndexDisponibilite.dispo) — x fixé à 0 là où l'agent est pris
+          (événement) ;
+        - besoin Jeunesse hors vacances plafonné aux agents disponibles ;
+        - minutes d'événements et cumul hebdo de chaque agent
+          (cumul_hebdo_avant=None : cumul laissé libre — solve_week le relie
+          aux jours précédents de la semaine).
+        Retourne (x_jour, jeunesse_requis) — x_jour : triplets réellement
+        admissibles ce jour-là.
+        """
+        def fixer(var, valeur):
+            domaine = model.proto.variables[var.index].domain
+            domaine.clear()
+            domaine.extend([valeur, valeur])
+
+        x_jour = {}
+        for (a, c, s), var in self.x.items():
+            if dispo[self._ligne[a], c]:
+                x_jour[a, c, s] = var
+            else:
+                fixer(var, 0)
+        jeunesse_requis = dict(self.jeunesse_requis)
+        for c, (nb_pt, requis) in self.jeunesse_pt.items():
+            nb_requis = min(nb_pt, int(dispo[self.lignes_jeunesse, c].sum()))
+            fixer(requis, nb_requis)
+            jeunesse_requis[c] = nb_requis
+        for a, var in self.ev_minutes.items():
+            fixer(var, ev_minutes.get(a, 0))
+        if cumul_hebdo_avant is not None:
+            for a, var in self.cumul_avant.items():
+                fixer(var, cumul_hebdo_avant.get(a, 0))
+        return x_jour, jeunesse_requis
+
+
+def _construire_gabarit_jour(jour, creneaux_ouverts, agents, masque, agents_bloques,
+                             affectations, categories, responsables, pause_flex,
+                             priorite_rdc, horaires_agents, besoins_jeunesse,
+                             planning_type_jour, samedi_type, periode, swap_map,
+                             model=None, hypotheses=None):
+    """
+    Construit le modèle CP-SAT d'une journée (contraintes et 4 niveaux de
+    pénalités de solve_day) et le retourne sous forme de GabaritJour —
+    dans un modèle neuf, ou ajouté à `model` (plusieurs jours, solve_week).
+    `masque` : disponibilité B1/B2 (agents × créneaux, même ordre que
+    `agents`) servant à créer les x ; `agents_bloques` : agents exclus toute
+    la journée (B3/D1).
+    hypotheses : mode diagnostic (cf. diagnostiquer_jour) — dict rempli ici
+    de {(famille, agent, créneau): littéral} : chaque contrainte dure n'est
+    active que si son littéral l'est (FAMILLES_DURES ; agent / créneau à
+    None quand la contrainte porte sur tous). Une variable est alors créée
+    pour TOUS les triplets, les règles d'admissibilité devenant des
+    contraintes == 0 ; `x` ne garde que les triplets admissibles, les autres
+    n'entrent que dans les contraintes dures (via x_agent_cren / x_cren_sect).
+    """
+
+    if model is None:
+        model = cp_model.CpModel()
+    agents = list(agents)
     n_cren = len(creneaux_ouverts)
 
+    # ══ CONTRAINTES DURES "PAR VARIABLE" → MASQUE D'ADMISSIBILITÉ ═══════
+    # (cf. solve_day) : x n'est créée que pour les triplets admissibles.
+    #   A1/A2/A3 : sections, ci-dessous ; B3/D1 : agents_bloques ;
+    #   B1/B2 : masque de disponibilité (agents × créneaux)
+    def sections_admissibles(a):
+        if a in agents_bloques:
+            return []
+        sects_ok = set(affectations.get(a, []))                      # A1
+        return [s for s in SECTIONS
+                if s in sects_ok
+                and not (is_vacataire(a) and s == 'RDC')               # A2
+                and not (a == 'Stéphane' and s != 'MF')]               # A3
+
+    def dure(contrainte, famille, agent=None, c=None):
+        """Contrainte dure de la famille `famille` — en mode diagnostic,
+        subordonnée à l'hypothèse (famille, agent, créneau)."""
+        if hypotheses is not None:
+            cle = (famille, agent, c)
+            if cle not in hypotheses:
+                hypotheses[cle] = model.new_bool_var(f'hyp_{famille}_{agent}_{c}')
+            contrainte.only_enforce_if(hypotheses[cle])
+        return contrainte
+
+    def exclusions(a, i, c, s):
+        """Règles qui interdisent le triplet (mode diagnostic)."""
+        if a in agents_bloques:
+            yield 'B3' if is_vacataire(a) else 'D1'
+        if s not in affectations.get(a, []):
+            yield 'A1'
+        if is_vacataire(a) and s == 'RDC':
+            yield 'A2'
+        if a == 'Stéphane' and s != 'MF':
+            yield 'A3'
+        if not masque[i, c]:
+            yield 'B1/B2'
+
     # ── Variables de décision ──────────────────────────────────
-    # x[a][c][s] = 1 si agent a travaille au créneau c en section s
+    # x[a, c, s] = 1 si agent a travaille au créneau c en section s
+    # (n'existe que pour les triplets admissibles, cf. ci-dessus)
     x = {}
-    for a in agents:
-        for c in range(n_cren):
-            for s in SECTIONS:
-                x[a, c, s] = model.new_bool_var(f'x_{a}_{c}_{s}')
+    x_agent_cren = defaultdict(list)  # {(a, c): [x...]}  toutes sections de a à c
+    x_cren_sect  = defaultdict(list)  # {(c, s): [x...]}  tous agents de s à c
+    for i, a in enumerate(agents):
+        sects_a = sections_admissibles(a)
+        if hypotheses is not None:
+            triplets = [(c, s) for c in range(n_cren) for s in SECTIONS]
+        else:
+            triplets = [(int(c), s) for c in np.flatnonzero(masque[i])  # B1/B2
+                        for s in sects_a]
+        for c, s in triplets:
+            var = model.new_bool_var(f'x_{a}_{c}_{s}')
+            x_agent_cren[a, c].append(var)
+            x_cren_sect[c, s].append(var)
+            interdit = False
+            if hypotheses is not None:
+                for famille in exclusions(a, i, c, s):
+                    dure(model.add(var == 0), famille, a,
+                         c if famille == 'B1/B2' else None)
+                    interdit = True
+            if not interdit:
+                x[a, c, s] = var
+
+    def x_de(a, c, s):
+        """Variable x[a, c, s] si le triplet est admissible, 0 sinon."""
+        return x.get((a, c, s), 0)
 
     # ══ CONTRAINTES DURES ════════════════════════════════════
 
-    # A2 : vacataires jamais en RDC
-    for a in agents:
-        if is_vacataire(a):
-            for c in range(n_cren):
-                model.add(x[a, c, 'RDC'] == 0)
-
-    # A3 : Stéphane uniquement MF
-    if 'Stéphane' in agents:
-        for c in range(n_cren):
-            for s in SECTIONS:
-                if s != 'MF':
-                    model.add(x['Stéphane', c, s] == 0)
-
-    # A1 : sections habilitées uniquement
-    for a in agents:
-        sects_ok = set(affectations.get(a, []))
-        for c in range(n_cren):
-            for s in SECTIONS:
-                if s not in sects_ok:
-                    model.add(x[a, c, s] == 0)
-
     # A4 : max 1 agent par section/créneau pour RDC, Adulte, MF
     for c in range(n_cren):
         for s in ['RDC', 'Adulte', 'MF']:
-            model.add_at_most_one(x[a, c, s] for a in agents)
+            if len(x_cren_sect[c, s]) > 1:
+                dure(model.add_at_most_one(x_cren_sect[c, s]), 'A4', c=c)
 
     # D13 : 1 agent = 1 section par créneau
-    for a in agents:
-        for c in range(n_cren):
-            model.add_at_most_one(x[a, c, s] for s in SECTIONS)
-
-    # B1/B2 : disponibilité contractuelle
-    for a in agents:
-        cs_ce_list = creneaux_ouverts
-        for c, (cs, ce) in enumerate(cs_ce_list):
-            if not agent_disponible(a, jour, cs, ce, horaires_agents,
-                                    evenements, date_str, pause_flex,
-                                    presences_vac=presences_vac):
-                for s in SECTIONS:
-                    model.add(x[a, c, s] == 0)
-
-    # B3 : vacataires uniquement les jours autorisés
-    # Si presences_vac est défini → un vacataire est autorisé ce jour s'il est listé
-    # Si presences_vac vide → fallback sur mode_vac
-    _pv = presences_vac or {}
-    for a in agents:
-        if not is_vacataire(a):
-            continue
-        # Autorisé si présence explicite définie pour cette date
-        if date_str in _pv and a in _pv[date_str]:
-            continue
-        # Autorisé si mode_vac global inclut ce jour
-        if jour in (mode_vac or set()):
-            continue
-        # Sinon → bloqué
-        for c in range(n_cren):
-            for s in SECTIONS:
-                model.add(x[a, c, s] == 0)
-
-    # D1 : roulement samedi ROUGE/BLEU
-    if jour == 'Samedi' and samedi_type:
-        for a in agents:
-            if is_vacataire(a):
-                continue
-            roul_agent = roulement_agents.get(a)
-            if roul_agent and roul_agent != samedi_type:
-                for c in range(n_cren):
-                    for s in SECTIONS:
-                        model.add(x[a, c, s] == 0)
+    for (a, c), vars_ac in x_agent_cren.items():
+        if len(vars_ac) > 1:
+            dure(model.add_at_most_one(vars_ac), 'D13', a, c)
 
 
     # C3 : pause déjeuner ≥ 1h (12h-14h)
@@ -1053,11 +1978,11 @@ def solve_day(jour, date_str, creneaux_ouverts, agents_eligibles,
                                   for c in pause_creneaux)
             if pause_total_dur >= 60:
                 duree_travaillee = sum(
-                    (creneaux_ouverts[c][1] - creneaux_ouverts[c][0]) * x[a, c, s]
-                    for c in pause_creneaux for s in SECTIONS
+                    (creneaux_ouverts[c][1] - creneaux_ouverts[c][0]) * v
+                    for c in pause_creneaux for v in x_agent_cren[a, c]
                 )
                 # Au moins 60 minutes NON travaillées dans la fenêtre 12h-14h
-                model.add(duree_travaillee <= pause_total_dur - 60)
+                dure(model.add(duree_travaillee <= pause_total_dur - 60), 'C3', a)
 
     # ══ Pénalités et alertes (souple) — déclarées ici pour être utilisées
     #    par F1/F2 (Jeunesse) et D_FILL (RDC/Adulte/MF) ci-dessous
@@ -1066,7 +1991,7 @@ def solve_day(jour, date_str, creneaux_ouverts, agents_eligibles,
                                # présent et normalement à sa place, sauf nécessité réelle.
                                # Voir §résolution en 3 passes plus bas.
     penalites_qualite = []  # objectif de 3e RANG (passe 3/4) — QUI remplace le mieux
-                             # (G2/J1/J3/I1/préférence vacataires) — indépendant des heures
+                             # (G2/J1/J3/préférence vacataires) — indépendant des heures
     penalites_equite = []  # objectif de 4e RANG (passe 4/4) — équité des heures SEULEMENT
                             # (dépassement ET manque par rapport au PT). Résolue en DERNIER
                             # pour ne jamais pouvoir dégrader le choix qualitatif du meilleur
@@ -1075,10 +2000,8 @@ def solve_day(jour, date_str, creneaux_ouverts, agents_eligibles,
                             # bonne section ou une responsable pour économiser quelques
                             # minutes de dépassement ailleurs)
     alertes = []  # [(cren_idx, section, message)] — créneaux non pourvus malgré le besoin
-    ALERTE_POIDS = 5000  # pénalité très forte : remplir RDC/Adulte/MF (D_FILL) — priorité maximale
-    JEUNESSE_POIDS = 200  # pénalité plus faible : atteindre le nombre visé en Jeunesse cède
-                           # le pas si ça entre en conflit avec le remplissage RDC/Adulte/MF
     jeunesse_requis = {}   # {cren_idx: besoin} — mémorisé pour vérif post-résolution
+    jeunesse_pt = {}       # {cren_idx: (nb PT, variable du besoin du jour)} — hors vacances
     fill_requis = {}       # {(cren_idx, section): True} — sections PT à vérifier post-résolution
 
     # F1/F2 : besoins Jeunesse
@@ -1122,17 +2045,20 @@ def solve_day(jour, date_str, creneaux_ouverts, agents_eligibles,
                     # Correspondance exacte en repli si aucune sous-tranche trouvée
                     cren_str = f'{cs//60:02d}:{cs%60:02d}-{ce//60:02d}:{ce%60:02d}'
                     besoin = besoins_jour.get(cren_str, 0)
-                jeunesse_vars = [x[a, c, 'Jeunesse'] for a in agents]
+                jeunesse_vars = x_cren_sect[c, 'Jeunesse']
                 sum_j = sum(jeunesse_vars)
                 jeunesse_requis[c] = besoin
                 if besoin > 0:
                     shortfall = model.new_int_var(0, besoin, f'shortfall_jeu_{c}')
                     model.add(shortfall >= besoin - sum_j)
-                    model.add(sum_j <= besoin)
+                    dure(model.add(sum_j <= besoin), 'F1/F2', c=c)
                     penalites.append(JEUNESSE_POIDS * shortfall)
                 else:
-                    model.add(sum_j == 0)
-    else:
+                    dure(model.add(sum_j == 0), 'F1/F2', c=c)
+
+    lignes_jeunesse = [i for i, a in enumerate(agents)
+                       if 'Jeunesse' in affectations.get(a, [])]
+    if not est_vacances:
         # Hors vacances : nombre exact d'agents Jeunesse = ce que dit le PT
         for c, (cs, ce) in enumerate(creneaux_ouverts):
             # Compter le nombre d'agents Jeunesse prévus dans le PT pour ce créneau
@@ -1145,34 +2071,34 @@ def solve_day(jour, date_str, creneaux_ouverts, agents_eligibles,
                 if cs >= pt_cs and ce <= pt_ce:
                     nb_pt_jeunesse = len([a for a in sect_agents.get('Jeunesse', [])
                                           if a and a.strip()])
-            # Plafonner au nombre d'agents Jeunesse réellement disponibles à ce créneau
-            # (évite l'infaisabilité quand les agents PT sont absents)
-            jeunesse_dispo = [a for a in agents
-                              if 'Jeunesse' in affectations.get(a, [])
-                              and agent_disponible(a, jour, cs, ce, horaires_agents,
-                                                   evenements, date_str, pause_flex,
-                                                   presences_vac=presences_vac)]
-            nb_possible = len(jeunesse_dispo)
-            nb_requis = min(nb_pt_jeunesse, nb_possible)
-            jeunesse_vars = [x[a, c, 'Jeunesse'] for a in agents]
+            jeunesse_vars = x_cren_sect[c, 'Jeunesse']
             sum_j = sum(jeunesse_vars)
-            jeunesse_requis[c] = nb_requis
-            if nb_requis > 0:
-                shortfall = model.new_int_var(0, nb_requis, f'shortfall_jeu_{c}')
+            if nb_pt_jeunesse > 0:
+                # Plafonné au nombre d'agents Jeunesse réellement disponibles à
+                # ce créneau (évite l'infaisabilité quand les agents PT sont
+                # absents) : dépend des événements du jour, donc porté par une
+                # variable fixée à chaque instanciation (GabaritJour.instancier).
+                nb_requis = model.new_int_var(0, nb_pt_jeunesse, f'requis_jeu_{c}')
+                jeunesse_pt[c] = (nb_pt_jeunesse, nb_requis)
+                shortfall = model.new_int_var(0, nb_pt_jeunesse, f'shortfall_jeu_{c}')
                 model.add(shortfall >= nb_requis - sum_j)
-                model.add(sum_j <= nb_requis)
+                dure(model.add(sum_j <= nb_requis), 'F1/F2', c=c)
                 penalites.append(JEUNESSE_POIDS * shortfall)
             else:
-                model.add(sum_j == 0)
+                jeunesse_requis[c] = 0
+                dure(model.add(sum_j == 0), 'F1/F2', c=c)
 
     # K3 (dure) : vacataire seul en Jeunesse uniquement 12h-14h
     for c, (cs, ce) in enumerate(creneaux_ouverts):
         is_in_12_14 = (cs >= 720 and ce <= 840)
         if not is_in_12_14:
             for a_vac in [a for a in agents if is_vacataire(a)]:
+                if (a_vac, c, 'Jeunesse') not in x:
+                    continue
                 # Si vacataire en Jeunesse → au moins 1 régulier aussi en Jeunesse
-                reguliers_j = [x[a, c, 'Jeunesse'] for a in agents if not is_vacataire(a)]
-                model.add(x[a_vac, c, 'Jeunesse'] <= sum(reguliers_j))
+                reguliers_j = [x[a, c, 'Jeunesse'] for a in agents
+                               if not is_vacataire(a) and (a, c, 'Jeunesse') in x]
+                dure(model.add(x[a_vac, c, 'Jeunesse'] <= sum(reguliers_j)), 'K3', a_vac, c)
 
     # ══ PRÉ-CALCUL PT INDEXÉ (partagé dures + molles) ══════════
     # Convertir planning_type_jour en {cren_idx: {section: [agents]}}
@@ -1203,7 +2129,7 @@ def solve_day(jour, date_str, creneaux_ouverts, agents_eligibles,
             if not agents_possibles:
                 alertes.append((c, s, 'aucun agent habilité disponible'))
                 continue  # Aucun agent possible → alerte, on laisse vide
-            sum_x = sum(x[a, c, s] for a in agents)
+            sum_x = sum(x_cren_sect[c, s])
             fill_requis[(c, s)] = True
             # Le "au plus 1" est déjà garanti par A4 (add_at_most_one) plus haut.
             # Ici on pousse fortement vers "exactement 1" sans jamais bloquer le solveur.
@@ -1221,7 +2147,8 @@ def solve_day(jour, date_str, creneaux_ouverts, agents_eligibles,
     for c in range(n_cren):
         for s in ['RDC', 'Adulte', 'MF']:
             if (c, s) not in fill_requis:
-                model.add(sum(x[a, c, s] for a in agents) == 0)
+                if x_cren_sect[c, s]:
+                    dure(model.add(sum(x_cren_sect[c, s]) == 0), 'D0', c=c)
 
     # C1/C2 : durées consécutives — DEUX seuils désormais distincts (corrigé 08/2026,
     # suite à la proposition de l'utilisatrice sur vendredi 4/09 : Marie-France
@@ -1244,42 +2171,18 @@ def solve_day(jour, date_str, creneaux_ouverts, agents_eligibles,
             return 5 * 60  # exception validée
         return 4 * 60  # plafond dur commun à tous les jours désormais
 
-    for a in agents:
-        ideal_c  = ideal_consec_pour(a)
-        tolere_c = tolere_consec_pour(a)
-        for c_start in range(n_cren):
-            total_dur = 0
-            c_end = c_start
-            while c_end < n_cren:
-                cs_e, ce_e = creneaux_ouverts[c_end]
-                if c_end > c_start:
-                    cs_prev, ce_prev = creneaux_ouverts[c_end - 1]
-                    if cs_e != ce_prev:
-                        break
-                total_dur += ce_e - cs_e
-                consec_vars = [x[a, c, s] for c in range(c_start, c_end + 1)
-                               for s in SECTIONS]
-                limit = c_end - c_start
-                if total_dur > tolere_c:
-                    # Plafond quasi-dur : très fortement découragé (poids proche de
-                    # D_FILL/Jeunesse, tier 1) mais pas absolument bloquant — sinon
-                    # une vraie impossibilité de couverture (ex: samedi 5/09, Jeunesse)
-                    # devient une alerte plutôt qu'un dépassement exceptionnel de 4h,
-                    # ce qui va à l'encontre du principe "une alerte est pire qu'un
-                    # léger débordement". Revient à l'esprit d'origine, mais isolé du
-                    # seuil idéal (voir ci-dessous) pour ne plus l'écraser inutilement.
-                    viol = model.new_bool_var(f'consec_tolere_viol_{a}_{c_start}_{c_end}')
-                    model.add(sum(consec_vars) <= limit).only_enforce_if(viol.negated())
-                    model.add(sum(consec_vars) <= limit + len(SECTIONS)).only_enforce_if(viol)
-                    penalites.append(150 * viol)
-                elif total_dur > ideal_c:
-                    # Préférence SOUPLE : comparée en passe 3/4 (qualité), plus en
-                    # passe 1 — ne domine plus automatiquement G2/J1/J3.
-                    viol = model.new_bool_var(f'consec_viol_{a}_{c_start}_{c_end}')
-                    model.add(sum(consec_vars) <= limit).only_enforce_if(viol.negated())
-                    model.add(sum(consec_vars) <= limit + len(SECTIONS)).only_enforce_if(viol)
-                    penalites_qualite.append(40 * viol)
-                c_end += 1
+    consec_couverture, consec_qualite = _ajouter_durees_consecutives(
+        model, agents, creneaux_ouverts, x_agent_cren,
+        ideal_consec_pour, tolere_consec_pour)
+    # Plafond quasi-dur : très fortement découragé (poids proche de
+    # D_FILL/Jeunesse, tier 1) mais pas absolument bloquant — sinon une vraie
+    # impossibilité de couverture (ex: samedi 5/09, Jeunesse) devient une
+    # alerte plutôt qu'un dépassement exceptionnel de 4h, ce qui va à
+    # l'encontre du principe "une alerte est pire qu'un léger débordement".
+    penalites.extend(consec_couverture)
+    # Préférence SOUPLE : comparée en passe 3/4 (qualité), plus en passe 1 —
+    # ne domine plus automatiquement G2/J1/J3.
+    penalites_qualite.extend(consec_qualite)
 
 
     # PLAFOND QUOTIDIEN (nouveau, sécurité anti-surcharge) : un régulier ne peut
@@ -1291,9 +2194,9 @@ def solve_day(jour, date_str, creneaux_ouverts, agents_eligibles,
     for a in agents:
         if is_vacataire(a):
             continue
-        total_jour = sum((creneaux_ouverts[c][1] - creneaux_ouverts[c][0]) * x[a, c, s]
-                          for c in range(n_cren) for s in SECTIONS)
-        model.add(total_jour <= PLAFOND_JOUR_MINUTES)
+        total_jour = sum((creneaux_ouverts[c][1] - creneaux_ouverts[c][0]) * v
+                          for c in range(n_cren) for v in x_agent_cren[a, c])
+        dure(model.add(total_jour <= PLAFOND_JOUR_MINUTES), 'P7', a)
 
     # G1 : préférer l'agent du PT dans sa section
     # Sur les jours où un/des vacataire(s) sont présents (peu importe le jour de la semaine,
@@ -1318,24 +2221,24 @@ def solve_day(jour, date_str, creneaux_ouverts, agents_eligibles,
                 if a_effectif in agents:
                     # L'agent normalement prévu (ou son remplaçant swap) est PRÉSENT ce
                     # jour-là : le déplacer de sa place n'est jamais anodin → pénalité de
-                    # STABILITÉ, résolue en passe 2 (avant G2/J1/J3/I1/équité), pour qu'elle
+                    # STABILITÉ, résolue en passe 2 (avant G2/J1/J3/équité), pour qu'elle
                     # ne puisse jamais être "battue" par une somme de petites préférences.
                     not_in_pt = model.new_bool_var(f'not_in_pt_{a_effectif}_{c}_{s}')
-                    model.add(not_in_pt == 1 - x[a_effectif, c, s])
+                    model.add(not_in_pt == 1 - x_de(a_effectif, c, s))
                     penalites_stabilite.append(g1_poids(s) * not_in_pt)
                 elif a_pt in agents:
                     not_in_pt = model.new_bool_var(f'not_in_pt_{a_pt}_{c}_{s}')
-                    model.add(not_in_pt == 1 - x[a_pt, c, s])
+                    model.add(not_in_pt == 1 - x_de(a_pt, c, s))
                     penalites_stabilite.append(g1_poids(s) * not_in_pt)
                 else:
                     # Agent PT réellement absent, pas de swap → pénalité si remplacement
                     # par agent de section différente (G2). Ici il ne s'agit plus de
                     # stabilité (personne à sa place n'est déplacée) mais de la QUALITÉ
-                    # du remplacement → reste avec G2/J1/J3/I1/équité (passe 3).
+                    # du remplacement → reste avec G2/J1/J3/équité (passe 3).
                     wrong_sect = []
                     for a in agents:
                         sect_prim = (affectations.get(a) or [''])[0]
-                        if sect_prim != s:
+                        if sect_prim != s and (a, c, s) in x:
                             wrong_sect.append(x[a, c, s])
                     if wrong_sect:
                         v = model.new_bool_var(f'wrong_sect_{c}_{s}')
@@ -1359,25 +2262,12 @@ def solve_day(jour, date_str, creneaux_ouverts, agents_eligibles,
 
     agents_equite = [a for a in agents if not is_vacataire(a) and a not in responsables]
 
-    # Minutes d'événements du jour, par agent (règle utilisatrice 08/2026) :
-    # un agent occupé par un accueil de classe, une animation ou une réunion
-    # est tout autant "chargé" que s'il faisait du service public au comptoir
-    # — sans ça, il aurait l'air "disponible" pour un remplacement alors qu'il
-    # a déjà donné son heure de travail, juste ailleurs. Équivalence stricte
-    # 1h événement = 1h service public, quel que soit le type d'événement
-    # (Accueil/Animation/Réunion) — pas de pondération différenciée.
-    # ⚠️ L'onglet Événements contient AUSSI les congés/absences/formations
-    # (ex: "congé" sur 9h-19h) — ce ne sont PAS des heures travaillées, il ne
-    # faut surtout pas les compter ici (sinon un agent absent toute la journée
-    # se retrouverait crédité de 10h de "travail équivalent"). On exclut donc
-    # les mêmes mots-clés d'absence que ceux utilisés côté génération Excel
-    # (colonne J : congé/RTT/vacation/absence/formation).
-    evenements_jour = [ev for ev in evenements if ev['date'] == date_str
-                        and not _est_evenement_absence(ev['nom'])]
-    ev_minutes_agent = {
-        a: sum(ev['ce'] - ev['cs'] for ev in evenements_jour if a in ev['agents'])
-        for a in agents_equite
-    }
+    # Minutes d'événements du jour (hors absences), par agent — comptées
+    # comme du service public, cf. solve_day. Propres à la date : portées par
+    # des variables fixées à chaque instanciation, comme le cumul hebdo.
+    ev_minutes_agent = {a: model.new_int_var(0, 24 * 60, f'ev_minutes_{a}')
+                        for a in agents_equite}
+    cumul_avant = {}  # {agent: minutes déjà cumulées cette semaine, fixées par jour}
 
     depas_par_agent = {}  # {agent: variable CP-SAT du dépassement NET du jour}
                            # conservé pour (a) l'équité hebdo ci-dessous et
@@ -1386,10 +2276,10 @@ def solve_day(jour, date_str, creneaux_ouverts, agents_eligibles,
     if agents_equite:
         depassements_pos = []
         for a in agents_equite:
-            travail = sum((creneaux_ouverts[c][1] - creneaux_ouverts[c][0]) * x[a, c, s]
-                          for c in range(n_cren) for s in SECTIONS)
+            travail = sum((creneaux_ouverts[c][1] - creneaux_ouverts[c][0]) * v
+                          for c in range(n_cren) for v in x_agent_cren[a, c])
             pt_a = pt_minutes_agent.get(a, 0)
-            ev_a = ev_minutes_agent.get(a, 0)
+            ev_a = ev_minutes_agent[a]
             depas = model.new_int_var(-2000, 2000, f'depas_{a}')
             # Dépassement NET = (service public réel + événements du jour) −
             # service public prévu au planning-type. Les événements comptent
@@ -1397,7 +2287,7 @@ def solve_day(jour, date_str, creneaux_ouverts, agents_eligibles,
             # en plus, aussi bien pour la franchise du jour que pour le
             # cumul hebdomadaire (depas_par_agent est repris tel quel plus
             # bas pour les deux niveaux, et retourné à compute_full_planning).
-            model.add(depas == travail - pt_a + ev_a)
+            dure(model.add(depas == travail - pt_a + ev_a), 'H2', a)
             depas_par_agent[a] = depas
             depas_pos = model.new_int_var(0, 2000, f'depas_pos_{a}')
             model.add(depas_pos >= depas)
@@ -1431,9 +2321,9 @@ def solve_day(jour, date_str, creneaux_ouverts, agents_eligibles,
         FRANCHISE_HEBDO = 180  # 3h de tolérance sur la semaine
         cumuls_pos_hebdo = []
         for a in agents_equite:
-            avant = cumul_hebdo_avant.get(a, 0)
+            avant = cumul_avant[a] = model.new_int_var(-4000, 4000, f'cumul_avant_{a}')
             cumul_total = model.new_int_var(-4000, 4000, f'cumul_hebdo_{a}')
-            model.add(cumul_total == depas_par_agent[a] + avant)
+            dure(model.add(cumul_total == depas_par_agent[a] + avant), 'H2', a)
             cumul_pos = model.new_int_var(0, 4000, f'cumul_hebdo_pos_{a}')
             model.add(cumul_pos >= cumul_total)
             model.add(cumul_pos >= 0)
@@ -1461,9 +2351,9 @@ def solve_day(jour, date_str, creneaux_ouverts, agents_eligibles,
         # celui dont le manque est le plus grand (réduit davantage l'objectif).
         manque_pos_hebdo = []
         for a in agents_equite:
-            avant = cumul_hebdo_avant.get(a, 0)
+            avant = cumul_avant[a]
             cumul_total_m = model.new_int_var(-4000, 4000, f'cumul_hebdo_m_{a}')
-            model.add(cumul_total_m == depas_par_agent[a] + avant)
+            dure(model.add(cumul_total_m == depas_par_agent[a] + avant), 'H2', a)
             manque = model.new_int_var(0, 4000, f'manque_hebdo_{a}')
             model.add(manque >= -cumul_total_m)
             model.add(manque >= 0)
@@ -1501,8 +2391,8 @@ def solve_day(jour, date_str, creneaux_ouverts, agents_eligibles,
             for s in SECTIONS:
                 if s in sects_equiv:
                     continue  # section primaire/équivalente → pas de pénalité
-                if s not in sects:
-                    continue  # pas habilité → géré par A1
+                if (a, c, s) not in x:
+                    continue  # non admissible (A1/A2/A3, B1-B3, D1) → jamais 1
                 rang = sects.index(s) + 1
                 if rang == 2 and cat != 'A':
                     penalites_qualite.append(POIDS['J1_section_principale'] * x[a, c, s])
@@ -1524,8 +2414,8 @@ def solve_day(jour, date_str, creneaux_ouverts, agents_eligibles,
     for a in responsables:
         if a in agents:
             for c in range(n_cren):
-                for s in SECTIONS:
-                    penalites_qualite.append(POIDS['J3_responsable'] * x[a, c, s])
+                for v in x_agent_cren[a, c]:
+                    penalites_qualite.append(POIDS['J3_responsable'] * v)
 
     # K1 (redéfinie 08/2026 v2, règle utilisatrice précisée) :
     #   - Vacataire 1 : maximisé (suit le PT / comble un maximum de créneaux),
@@ -1544,34 +2434,270 @@ def solve_day(jour, date_str, creneaux_ouverts, agents_eligibles,
         if a == 'Vacataire 1':
             for c in range(n_cren):
                 for s in ('Jeunesse', 'MF', 'Adulte'):
-                    penalites_qualite.append(-VAC_BONUS[s] * x[a, c, s])
+                    if (a, c, s) in x:
+                        penalites_qualite.append(-VAC_BONUS[s] * x[a, c, s])
         else:
             # Vacataire 2, 3... : légère pénalité pour ne s'en servir qu'en
             # dernier recours (D_FILL=5000 et Jeunesse=200 restent prioritaires
             # et forceront quand même son usage si aucun régulier n'est possible)
             for c in range(n_cren):
-                for s in SECTIONS:
-                    penalites_qualite.append(VAC2_DERNIER_RECOURS * x[a, c, s])
-
-    # I1 : non-fragmentation (pénalité si agent travaille des créneaux non consécutifs)
-    for a in agents:
-        for c in range(n_cren - 1):
-            cs_c,  ce_c  = creneaux_ouverts[c]
-            cs_n,  ce_n  = creneaux_ouverts[c + 1]
-            if ce_c != cs_n:  # pas consécutifs
-                # Pénalité si l'agent travaille c mais pas c+1, et travaille c+2 ou plus
-                for c2 in range(c + 2, n_cren):
-                    travaille_c  = sum(x[a, c, s]  for s in SECTIONS)
-                    travaille_c2 = sum(x[a, c2, s] for s in SECTIONS)
-                    gap = model.new_bool_var(f'gap_{a}_{c}_{c2}')
-                    model.add(travaille_c  >= 1).only_enforce_if(gap)
-                    model.add(travaille_c2 >= 1).only_enforce_if(gap)
-                    penalites_qualite.append(POIDS['I1_non_fragmentation'] * gap)
+                for v in x_agent_cren[a, c]:
+                    penalites_qualite.append(VAC2_DERNIER_RECOURS * v)
 
     # Objectif PRINCIPAL : minimiser les pénalités structurelles pures
     # (couverture des besoins : D_FILL, Jeunesse, consécutif — rien d'autre)
     model.minimize(sum(penalites))
 
+    return GabaritJour(
+        agents=agents, model=model, x=x,
+        penalites=penalites, penalites_stabilite=penalites_stabilite,
+        penalites_qualite=penalites_qualite, penalites_equite=penalites_equite,
+        alertes=alertes, jeunesse_requis=jeunesse_requis, jeunesse_pt=jeunesse_pt,
+        lignes_jeunesse=lignes_jeunesse, pt_indexed=pt_indexed,
+        fill_requis=fill_requis, depas_par_agent=depas_par_agent,
+        ev_minutes=ev_minutes_agent, cumul_avant=cumul_avant,
+    )
+
+
+def _modeliser_jour(jour, date_str, creneaux_ouverts, agents_eligibles,
+                    affectations, categories, responsables, pause_flex, priorite_rdc,
+                    horaires_agents, evenements, besoins_jeunesse,
+                    planning_type_jour, roulement_agents,
+                    samedi_type=None, periode='Hors Vacances scolaires',
+                    mode_vac=None, swap_map=None, presences_vac=None,
+                    gabarits=None, model=None, hypotheses=None):
+    """
+    Partie "modélisation" de solve_day, partagée avec solve_week (mêmes
+    paramètres que solve_day) : admissibilité, disponibilités du jour,
+    gabarit du modèle — pris dans le cache `gabarits`, ou construit
+    directement dans `model` quand plusieurs jours partagent un modèle —
+    et minutes d'événements par agent. hypotheses : mode diagnostic, cf.
+    _construire_gabarit_jour (sans cache).
+    Retourne (gabarit, dispo, ev_minutes).
+    """
+    if swap_map is None:
+        swap_map = {}
+    if mode_vac is None:
+        mode_vac = JOURS_VAC
+    evenements = _index_evenements(evenements)
+
+    agents = list(agents_eligibles)
+
+    # ══ CONTRAINTES DURES "PAR VARIABLE" → MASQUE D'ADMISSIBILITÉ ═══════
+    # Les règles ci-dessous interdisent, chacune, certains triplets
+    # (agent, créneau, section). Plutôt que de créer une variable pour chaque
+    # triplet puis de la forcer à 0 (des milliers de `x == 0` à chaque
+    # passe), on ne crée la variable x que pour les triplets admissibles :
+    # un triplet absent de `x` vaut 0 par construction.
+    #   A1 : sections habilitées uniquement
+    #   A2 : vacataires jamais en RDC
+    #   A3 : Stéphane uniquement MF
+    #   B1/B2 : disponibilité contractuelle (horaires, pause, événements)
+    #   B3 : vacataires uniquement les jours autorisés
+    #        Si presences_vac est défini → un vacataire est autorisé ce jour s'il est listé
+    #        Si presences_vac vide → fallback sur mode_vac
+    #   D1 : roulement samedi ROUGE/BLEU
+    _pv = presences_vac or {}
+    agents_bloques = set()  # agents exclus toute la journée (B3/D1)
+    for a in agents:
+        if is_vacataire(a):
+            # Autorisé si présence explicite définie pour cette date, ou si
+            # mode_vac global inclut ce jour ; sinon → bloqué (B3)
+            if not ((date_str in _pv and a in _pv[date_str])
+                    or jour in (mode_vac or set())):
+                agents_bloques.add(a)
+        elif jour == 'Samedi' and samedi_type:
+            roul_agent = roulement_agents.get(a)
+            if roul_agent and roul_agent != samedi_type:
+                agents_bloques.add(a)  # D1
+
+    # Disponibilité B1/B2 de tous les agents sur tous les créneaux du jour,
+    # calculée une seule fois (reprise aussi par F1/F2 Jeunesse, cf. gabarit)
+    dispo = IndexDisponibilite(agents, creneaux_ouverts, jour, date_str,
+                               horaires_agents, evenements, pause_flex,
+                               presences_vac=presences_vac)
+
+    # ══ GABARIT DU MODÈLE (09/2026) ════════════════════════════════
+    # La structure du modèle ne dépend que du jour de la semaine, du type de
+    # samedi, de la période, de la grille de créneaux, des agents (et de
+    # B3/D1, des swaps, des horaires) — identique pour tous les mardis
+    # "hors vacances" du mois, par exemple. Avec un cache `gabarits`, on ne
+    # la construit qu'une fois par combinaison, x créés sur la disponibilité
+    # SANS événements ; chaque date en reçoit ensuite une copie où seuls les
+    # x des agents pris par un événement, le besoin Jeunesse hors vacances,
+    # les minutes d'événements et le cumul hebdo sont recalés.
+    if gabarits is None:
+        masque, cle_gabarit = dispo.dispo, None
+    else:
+        masque = IndexDisponibilite(agents, creneaux_ouverts, jour, date_str,
+                                    horaires_agents, [], pause_flex,
+                                    presences_vac=presences_vac).dispo
+        cle_gabarit = (jour, samedi_type, periode, tuple(creneaux_ouverts),
+                       tuple(agents), frozenset(agents_bloques),
+                       tuple(sorted(swap_map.items())), masque.tobytes())
+    gabarit = gabarits.get(cle_gabarit) if gabarits is not None else None
+    if gabarit is None:
+        gabarit = _construire_gabarit_jour(
+            jour, creneaux_ouverts, agents, masque, agents_bloques,
+            affectations, categories, responsables, pause_flex, priorite_rdc,
+            horaires_agents, besoins_jeunesse, planning_type_jour,
+            samedi_type, periode, swap_map, model=model, hypotheses=hypotheses)
+        if gabarits is not None:
+            gabarits[cle_gabarit] = gabarit
+
+    # Minutes d'événements du jour, par agent (règle utilisatrice 08/2026) :
+    # un agent occupé par un accueil de classe, une animation ou une réunion
+    # est tout autant "chargé" que s'il faisait du service public au comptoir
+    # — sans ça, il aurait l'air "disponible" pour un remplacement alors qu'il
+    # a déjà donné son heure de travail, juste ailleurs. Équivalence stricte
+    # 1h événement = 1h service public, quel que soit le type d'événement
+    # (Accueil/Animation/Réunion) — pas de pondération différenciée.
+    # ⚠️ L'onglet Événements contient AUSSI les congés/absences/formations
+    # (ex: "congé" sur 9h-19h) — ce ne sont PAS des heures travaillées, il ne
+    # faut surtout pas les compter ici (sinon un agent absent toute la journée
+    # se retrouverait crédité de 10h de "travail équivalent"). On exclut donc
+    # les mêmes mots-clés d'absence que ceux utilisés côté génération Excel
+    # (colonne J : congé/RTT/vacation/absence/formation).
+    ev_minutes = {
+        a: sum(ev['ce'] - ev['cs'] for ev in evenements.du_jour(date_str, agent=a)
+               if not _est_evenement_absence(ev['nom']))
+        for a in gabarit.ev_minutes
+    }
+    return gabarit, dispo, ev_minutes
+
+
+def _indice_planning_type(gabarit, x, swap_map, jeunesse_requis):
+    """Placements du planning-type retenus comme indice de la passe 1
+    (cf. solve_day) : ensemble de triplets (agent, créneau, section)."""
+    agents      = gabarit.agents
+    pt_indexed  = gabarit.pt_indexed
+    fill_requis = gabarit.fill_requis
+    indice = set()
+    agent_place = set()  # (agent, créneau) déjà pris dans l'indice
+    for c in sorted(pt_indexed):
+        for s in SECTIONS:
+            for a_pt in pt_indexed[c].get(s, []):
+                if not a_pt or not a_pt.strip():
+                    continue
+                a = swap_map.get(a_pt, a_pt)
+                if a not in agents:
+                    a = a_pt
+                if (a, c, s) not in x or (a, c) in agent_place:
+                    continue
+                if s == 'Jeunesse':
+                    deja = sum(1 for (a2, c2, s2) in indice if c2 == c and s2 == s)
+                    if deja >= jeunesse_requis.get(c, 0):
+                        continue
+                elif (c, s) not in fill_requis or any(
+                        c2 == c and s2 == s for (_, c2, s2) in indice):
+                    continue
+                indice.add((a, c, s))
+                agent_place.add((a, c))
+    return indice
+
+
+def _analyser_couverture(gabarit, x, jeunesse_requis):
+    """
+    Pré-analyse de la couverture d'une journée, sans CP-SAT (09/2026) : pour
+    chaque créneau, couplage maximal entre les agents disponibles (x du
+    jour) et les places à pourvoir — une par section RDC/Adulte/MF exigée
+    (D_FILL), jeunesse_requis[c] en Jeunesse —, un agent ne tenant qu'une
+    place par créneau (D13). Les places D_FILL sont couplées en premier :
+    leur poids domine celui de Jeunesse, et un chemin augmentant ne libère
+    jamais une place déjà pourvue — le couplage obtenu minimise donc
+    exactement la pénalité de couverture du créneau.
+    Chaque créneau est pris isolément (ni pause C3, ni durées consécutives,
+    ni K3) : les manques trouvés sont inévitables, pas forcément les seuls.
+    Retourne (borne, manques, forcees) :
+    - borne : minorant de l'objectif de la passe 1 ;
+    - manques : {créneau: [sections restées vides]} (Jeunesse répétée par
+      agent manquant) — alertes certaines avant toute résolution ;
+    - forcees : {(agent, créneau, section)} pour les places qu'un seul agent
+      disponible peut tenir (Jeunesse : pas plus d'agents que de places).
+    """
+    candidats = defaultdict(list)  # {(c, s): [agents disponibles]}
+    for a, c, s in x:
+        candidats[c, s].append(a)
+    creneaux = ({c for c, _ in gabarit.fill_requis}
+                | {c for c, besoin in jeunesse_requis.items() if besoin > 0})
+    borne, manques, forcees = 0, {}, set()
+    for c in sorted(creneaux):
+        places = [s for s in ('RDC', 'Adulte', 'MF') if (c, s) in gabarit.fill_requis]
+        places += ['Jeunesse'] * jeunesse_requis.get(c, 0)
+        tenue = {}  # {agent: indice de la place qu'il tient}
+
+        def augmenter(i, vus):
+            for a in candidats[c, places[i]]:
+                if a not in vus:
+                    vus.add(a)
+                    if a not in tenue or augmenter(tenue[a], vus):
+                        tenue[a] = i
+                        return True
+            return False
+
+        vides = [places[i] for i in range(len(places)) if not augmenter(i, set())]
+        if vides:
+            manques[c] = vides
+            borne += sum(JEUNESSE_POIDS if s == 'Jeunesse' else ALERTE_POIDS for s in vides)
+        for s in set(places):
+            if len(candidats[c, s]) <= places.count(s):
+                forcees.update((a, c, s) for a in candidats[c, s])
+    return borne, manques, forcees
+
+
+def _preparer_passe_1(gabarit, model, x, jeunesse_requis, swap_map, indice_pt, date_str):
+    """
+    Avant la passe 1 de solve_day / solve_week : pré-analyse de couverture
+    (cf. _analyser_couverture, manques inévitables journalisés) et, si
+    indice_pt, indice initial complet sur x — planning-type du jour (cf.
+    _indice_planning_type), complété des places qu'un seul agent peut
+    tenir là où le PT les laisse vides. Retourne le minorant de l'objectif
+    de la passe 1.
+    """
+    borne, manques, forcees = _analyser_couverture(gabarit, x, jeunesse_requis)
+    if manques:
+        _journal.info('%s : manques de couverture inévitables — %s', date_str, '; '.join(
+            f'créneau {c} : {", ".join(sections)}' for c, sections in manques.items()))
+    if indice_pt:
+        indice = _indice_planning_type(gabarit, x, swap_map, jeunesse_requis)
+        # Places forcées : seulement sur une place que l'indice laisse libre,
+        # et pour un agent qu'il ne place pas déjà à ce créneau
+        occupees = defaultdict(int)
+        for _, c, s in indice:
+            occupees[c, s] += 1
+        agent_place = {(a, c) for a, c, _ in indice}
+        for a, c, s in sorted(forcees):
+            limite = jeunesse_requis.get(c, 0) if s == 'Jeunesse' else 1
+            if (a, c) in agent_place or occupees[c, s] >= limite:
+                continue
+            indice.add((a, c, s))
+            occupees[c, s] += 1
+            agent_place.add((a, c))
+        for cle, var in gabarit.x.items():
+            model.add_hint(var, 1 if cle in indice else 0)
+    return borne
+
+
+def _nb_passes(penalites_stabilite, penalites_qualite, penalites_equite):
+    return 1 + bool(penalites_stabilite) + bool(penalites_qualite) + bool(penalites_equite)
+
+
+def _resoudre_par_passes(model, penalites, penalites_stabilite, penalites_qualite,
+                         penalites_equite, reparer_indices, budget, borne_couverture=None,
+                         portefeuille=False, temps_max=None):
+    """
+    Résolution lexicographique en 4 passes de solve_day (solve_week : passes
+    1 à 3 de chaque jour, penalites_equite vide). Temps pris sur la journée
+    ouverte dans `budget` par l'appelant. Retourne le solveur de la dernière
+    passe réussie, ou None si la passe 1 n'a trouvé aucune solution.
+    borne_couverture : minorant de l'objectif de la passe 1 (cf.
+    _analyser_couverture) — permet d'essayer de s'en passer, voir plus bas.
+    portefeuille : chaque passe résolue par un SolveurPortefeuille.
+    temps_max : plafond de chaque passe, en plus de sa part du budget —
+    TEMPS_MAX_PASSE pour les passes d'un jour seul dans une période de
+    plusieurs jours (solve_week, solve_glissant), où le plafond par défaut
+    de la période vaut TEMPS_MAX_PASSE × nombre de jours.
+    """
     # ══ RÉSOLUTION EN 4 PASSES (mis à jour 08/2026 — ex-3 passes) ══════════
     # Passe 1 : couverture des besoins seule (D_FILL, Jeunesse, consécutif).
     #           Rien ne doit jamais dégrader ça.
@@ -1579,7 +2705,7 @@ def solve_day(jour, date_str, creneaux_ouverts, agents_eligibles,
     #           d'agents déjà correctement placés (stabilité — G1 pour un
     #           agent présent).
     # Passe 3 : à couverture + stabilité FIXÉES, choisir le MEILLEUR
-    #           remplaçant possible (G2/J1/J3/I1, préférence vacataires) —
+    #           remplaçant possible (G2/J1/J3, préférence vacataires) —
     #           SANS regarder les heures de qui que ce soit.
     # Passe 4 (NOUVEAU — corrige régression du 11/08) : à qualité de
     #           remplacement FIXÉE, optimiser en dernier l'équité des heures
@@ -1593,64 +2719,180 @@ def solve_day(jour, date_str, creneaux_ouverts, agents_eligibles,
     #           quelques minutes. Désormais l'équité ne peut plus jamais
     #           changer QUI est choisi comme remplaçant — seulement départager
     #           entre choix par ailleurs strictement équivalents en qualité.
-    solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = 30.0
-    solver.parameters.num_search_workers  = 4
-    # Graine fixe (08/2026) : sans ça, avec 4 chercheurs en parallèle, le
-    # solveur peut trancher différemment entre deux solutions à égalité de
-    # score d'un lancement à l'autre — même moteur, mêmes données, résultat
-    # parfois différent. Fixer la graine rend le planning reproductible.
-    solver.parameters.random_seed = 42
-    status = solver.solve(model)
-
-    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-        return None, [('*', '*', 'aucune solution trouvée (structurellement impossible)')], {}
-
-    if penalites_stabilite:
-        valeur_optimale = round(solver.objective_value)
-        model.add(sum(penalites) <= valeur_optimale)
+    # Indices de solution (08/2026) : chaque passe repart de la solution
+    # optimale de la précédente, qui respecte par construction la borne
+    # qu'on vient d'ajouter (≤ sa propre valeur) — les passes 2 à 4 démarrent
+    # donc d'un point déjà faisable et n'ont plus qu'à l'améliorer / prouver
+    # l'optimalité, au lieu de tout rechercher à nouveau.
+    # Budget de temps (09/2026) : chaque passe reçoit sa part du temps
+    # restant du jour (cf. BudgetTemps) ; une passe d'affinage sans budget
+    # est sautée, la solution de la passe précédente est alors conservée.
+    # Passe 1 évitée (09/2026) : la passe 1 ne sert qu'à connaître la
+    # meilleure couverture possible, bornée ensuite pour la passe 2. Quand
+    # la pré-analyse en donne un minorant, on lance DIRECTEMENT la passe 2
+    # avec la couverture bornée à ce minorant : une solution trouvée atteint
+    # forcément l'optimum de la passe 1 (on ne peut pas faire mieux que le
+    # minorant), qui n'a donc pas besoin d'être calculé. Sinon (minorant
+    # inatteignable à cause des contraintes entre créneaux — pause, durées
+    # consécutives...), la borne est retirée et les passes 1 et 2 sont
+    # faites normalement ; seul le temps de l'essai est perdu.
+    def temps_passe(obligatoire=False):
+        temps = budget.temps_passe(obligatoire)
+        return temps if temps is None or temps_max is None else min(temps, temps_max)
+
+    budget.reprendre()
+    solver = None
+    if borne_couverture is not None and penalites_stabilite:
+        essai = model.add(sum(penalites) <= borne_couverture)
         model.minimize(sum(penalites_stabilite))
-        solver_stab = cp_model.CpSolver()
-        solver_stab.parameters.max_time_in_seconds = 30.0
-        solver_stab.parameters.num_search_workers  = 4
-        solver_stab.parameters.random_seed = 42
-        status_stab = solver_stab.solve(model)
-        if status_stab in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-            solver = solver_stab  # utiliser la solution la plus stable (même couverture)
-
-    if penalites_qualite:
+        solver_essai = _creer_solveur(reparer_indices, temps_passe(obligatoire=True),
+                                      portefeuille)
+        status_essai = _resoudre(solver_essai, model)
+        if status_essai in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            budget.noter_passe(solver_essai, status_essai, passes=2, nom='couverture+stabilité',
+                               model=model)
+            solver = solver_essai
+        else:
+            budget.noter_passe(solver_essai, status_essai, passes=0, nom='couverture+stabilité',
+                               model=model)
+            essai.proto.clear_linear()
+
+    if solver is None:
+        model.minimize(sum(penalites))
+        solver = _creer_solveur(reparer_indices, temps_passe(obligatoire=True),
+                                portefeuille)
+        status = _resoudre(solver, model)
+        budget.noter_passe(solver, status, nom='couverture', model=model)
+
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return None
+
+        if penalites_stabilite and budget.temps_passe() is None:
+            budget.sauter_passe('stabilité')
+        elif penalites_stabilite:
+            valeur_optimale = round(solver.objective_value)
+            model.add(sum(penalites) <= valeur_optimale)
+            model.minimize(sum(penalites_stabilite))
+            _indiquer_solution(model, solver)
+            solver_stab = _creer_solveur(reparer_indices, temps_passe(), portefeuille)
+            status_stab = _resoudre(solver_stab, model)
+            budget.noter_passe(solver_stab, status_stab, nom='stabilité', model=model)
+            if status_stab in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                solver = solver_stab  # utiliser la solution la plus stable (même couverture)
+
+    if penalites_qualite and budget.temps_passe() is None:
+        budget.sauter_passe('qualité')
+    elif penalites_qualite:
         if penalites_stabilite:
             valeur_stabilite = sum(solver.value(v) for v in penalites_stabilite)
             model.add(sum(penalites_stabilite) <= valeur_stabilite)
         model.minimize(sum(penalites_qualite))
-        solver_qual = cp_model.CpSolver()
-        solver_qual.parameters.max_time_in_seconds = 30.0
-        solver_qual.parameters.num_search_workers  = 4
-        solver_qual.parameters.random_seed = 42
-        status_qual = solver_qual.solve(model)
+        _indiquer_solution(model, solver)
+        solver_qual = _creer_solveur(reparer_indices, temps_passe(), portefeuille)
+        status_qual = _resoudre(solver_qual, model)
+        budget.noter_passe(solver_qual, status_qual, nom='qualité', model=model)
         if status_qual in (cp_model.OPTIMAL, cp_model.FEASIBLE):
             solver = solver_qual  # utiliser la solution avec le meilleur remplaçant
 
-    if penalites_equite:
+    if penalites_equite and budget.temps_passe() is None:
+        budget.sauter_passe('équité')
+    elif penalites_equite:
         if penalites_qualite:
             valeur_qualite = sum(solver.value(v) for v in penalites_qualite)
             model.add(sum(penalites_qualite) <= valeur_qualite)
         model.minimize(sum(penalites_equite))
-        solver2 = cp_model.CpSolver()
-        solver2.parameters.max_time_in_seconds = 30.0
-        solver2.parameters.num_search_workers  = 4
-        solver2.parameters.random_seed = 42
-        status2 = solver2.solve(model)
+        _indiquer_solution(model, solver)
+        solver2 = _creer_solveur(reparer_indices, temps_passe(), portefeuille)
+        status2 = _resoudre(solver2, model)
+        budget.noter_passe(solver2, status2, nom='équité', model=model)
         if status2 in (cp_model.OPTIMAL, cp_model.FEASIBLE):
             solver = solver2  # utiliser la solution équilibrée (même couverture + même stabilité + même qualité)
 
+    return solver
+
+
+# Objectif unique (09/2026) : écart maximal de l'objectif pondéré. CP-SAT
+# calcule l'objectif en entiers 64 bits (et refuse un modèle qui pourrait
+# déborder) : au-delà, le jour est résolu en passes, comme d'habitude.
+LIMITE_OBJECTIF_UNIQUE = 2 ** 62
+
+
+def _poids_lexicographiques(model, niveaux):
+    """
+    Poids des niveaux de pénalités (du plus prioritaire au moins
+    prioritaire) pour les fondre en un seul objectif SANS changer l'ordre
+    lexicographique des passes : chaque niveau pèse 1 de plus que le plus
+    grand écart possible de TOUS les niveaux suivants pondérés, écart
+    prouvé par les domaines des variables de `model` (bornes du jour
+    comprises, cf. GabaritJour.recaler). Un point gagné sur un niveau vaut
+    donc toujours plus que n'importe quelle dégradation des suivants.
+    Retourne la liste des poids, ou None au-delà de LIMITE_OBJECTIF_UNIQUE.
+    """
+    amplitudes = []
+    for termes in niveaux:
+        # Expression aplatie (variables, coefficients) lue dans l'objectif
+        model.minimize(sum(termes))
+        objectif = model.proto.objective
+        bas = haut = 0
+        for ref, coef in zip(objectif.vars, objectif.coeffs):
+            # (list : pas d'indice négatif sur un champ répété du proto)
+            domaine = list(model.proto.variables[ref if ref >= 0 else -ref - 1].domain)
+            bornes = (coef * domaine[0], coef * domaine[-1])
+            bas += min(bornes)
+            haut += max(bornes)
+        amplitudes.append(haut - bas)
+    model.clear_objective()
+    poids = []
+    ecart_suivants = 0
+    for amplitude in reversed(amplitudes):
+        poids.append(ecart_suivants + 1)
+        ecart_suivants += poids[-1] * amplitude
+    if ecart_suivants > LIMITE_OBJECTIF_UNIQUE:
+        return None
+    return poids[::-1]
+
+
+def _resoudre_objectif_unique(model, niveaux, poids, reparer_indices, budget,
+                              borne_couverture=None, portefeuille=False):
+    """
+    Variante expérimentale de _resoudre_par_passes : une seule résolution, sur
+    la somme des niveaux pondérés par _poids_lexicographiques. Résolue à
+    l'optimum, elle donne les mêmes valeurs de chaque niveau que les passes
+    (pas forcément la même affectation, à valeurs égales) ; arrêtée par le
+    temps, un niveau peut rester au-dessus de son optimum sans que les
+    suivants aient été affinés (cf. "plafond atteint").
+    borne_couverture : minorant du niveau 1 (cf. _analyser_couverture),
+    ajouté comme contrainte — aide CP-SAT à prouver l'optimum.
+    portefeuille : résolution par un SolveurPortefeuille.
+    Retourne le solveur, ou None si aucune solution n'a été trouvée.
+    """
+    if borne_couverture is not None:
+        model.add(sum(niveaux[0]) >= borne_couverture)
+    model.minimize(sum(p * sum(termes) for p, termes in zip(poids, niveaux)))
+    solver = _creer_solveur(reparer_indices, budget.temps_passe(obligatoire=True),
+                            portefeuille)
+    status = _resoudre(solver, model)
+    budget.noter_passe(solver, status, nom='objectif unique', model=model)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return None
+    return solver
+
+
+def _extraire_jour(solver, gabarit, x, creneaux_ouverts, jeunesse_requis):
+    """Solution d'une journée lue dans `solver` : (solution, alertes,
+    depas_jour), format de retour de solve_day."""
     # ══ EXTRACTION DE LA SOLUTION ═════════════════════════════
+    agents          = gabarit.agents
+    fill_requis     = gabarit.fill_requis
+    depas_par_agent = gabarit.depas_par_agent
+    alertes         = list(gabarit.alertes)
+
     result = {}
-    for c in range(n_cren):
+    for c in range(len(creneaux_ouverts)):
         result[c] = {s: [] for s in SECTIONS}
         for a in agents:
             for s in SECTIONS:
-                if solver.value(x[a, c, s]) == 1:
+                if (a, c, s) in x and solver.value(x[a, c, s]) == 1:
                     result[c][s].append(a)
 
     # ══ VÉRIFICATION POST-RÉSOLUTION DES ALERTES ═══════════════
@@ -1671,6 +2913,633 @@ def solve_day(jour, date_str, creneaux_ouverts, agents_eligibles,
     return result, alertes, depas_jour
 
 
+def solve_day(jour, date_str, creneaux_ouverts, agents_eligibles,
+              affectations, categories, responsables, pause_flex, priorite_rdc,
+              horaires_agents, evenements, besoins_jeunesse,
+              planning_type_jour, roulement_agents,
+              samedi_type=None, periode='Hors Vacances scolaires',
+              mode_vac=None, swap_map=None, presences_vac=None,
+              cumul_hebdo_avant=None, reparer_indices=False, indice_pt=True,
+              gabarits=None, budget=None, objectif_unique=False, portefeuille=False,
+              enregistrement=None):
+    """
+    swap_map : {agent_absent: agent_remplacant} pour ce jour
+               ex: {'Guillaume': 'Robin'} si Guillaume est BLEU ce samedi ROUGE
+               et Robin a pris sa place
+    cumul_hebdo_avant : {agent: minutes de dépassement déjà cumulées cette
+               semaine, avant ce jour} — fourni par compute_full_planning,
+               remis à zéro à chaque nouvelle semaine. Sert à l'équité
+               hebdomadaire (§7bis, 08/2026) : évite qu'un même agent soit
+               systématiquement choisi comme remplaçant tous les jours de la
+               semaine, en tenant compte de ce qu'il a déjà fait en plus les
+               jours précédents.
+    reparer_indices : si True, les passes 2 à 4 (qui repartent de la
+               solution de la passe précédente) activent le mode
+               `repair_hint` de CP-SAT — voir _creer_solveur.
+    indice_pt : si True (défaut), la passe 1 part du planning-type du jour
+               (swaps résolus, agents indisponibles retirés) comme indice
+               de solution complet sur x — cf. plus bas avant la passe 1.
+    gabarits : dict servant de cache de modèles (GabaritJour) d'un appel à
+               l'autre, pour UN MÊME jeu de données de préparation — le
+               modèle n'est alors construit qu'une fois par combinaison
+               (jour, samedi, période, grille, agents...) et seulement
+               copié / recalé pour chaque date. None : pas de cache.
+    budget : BudgetTemps partagé avec les autres jours (temps de chaque
+               passe, suivi "plafond atteint" du jour dans budget.journal).
+               None : 30 s par passe, comme avant.
+    objectif_unique : si True (expérimental, en général PLUS LENT que les
+               passes), une seule résolution sur les 4 niveaux de
+               pénalités pondérés de façon à garder leur priorité (cf.
+               _poids_lexicographiques), au lieu des 4 passes — repli sur
+               les passes si les poids deviennent trop grands.
+    portefeuille : si True, chaque résolution lance plusieurs réglages de
+               CP-SAT en parallèle et garde le meilleur (cf.
+               SolveurPortefeuille) — pour les journées difficiles.
+    enregistrement : "puits" du corpus de rejeu — fonction appelée, une
+               fois le jour résolu, avec un dict {date, moteur, arguments
+               (tous ceux de cet appel sauf gabarits / budget), profil,
+               modeles (modèle et paramètres CP-SAT de chaque passe, cf.
+               BudgetTemps), resultat} ; ex. enregistreur_corpus(chemin).
+    """
+    if enregistrement is not None:
+        arguments = {cle: valeur for cle, valeur in locals().items()
+                     if cle not in ('gabarits', 'budget', 'enregistrement')}
+        arguments['cumul_hebdo_avant'] = dict(cumul_hebdo_avant or {})
+    if swap_map is None:
+        swap_map = {}
+    if cumul_hebdo_avant is None:
+        cumul_hebdo_avant = {}
+    if budget is None:
+        budget = BudgetTemps()
+    if enregistrement is not None:
+        budget.modeles = []
+    """
+    Résout le planning d'une journée avec CP-SAT.
+
+    Paramètres :
+    - creneaux_ouverts : liste de (cs, ce)
+    - agents_eligibles : liste d'agents pouvant travailler ce jour
+    - planning_type_jour : {creneau_str: {section: [agents]}}
+    - roulement_agents : {agent: 'ROUGE'|'BLEU'} pour ce jour (samedi)
+
+    Retourne : {creneau_idx: {section: [agents]}} ou None si infaisable
+    """
+    gabarit, dispo, ev_minutes = _modeliser_jour(
+        jour, date_str, creneaux_ouverts, agents_eligibles,
+        affectations, categories, responsables, pause_flex, priorite_rdc,
+        horaires_agents, evenements, besoins_jeunesse,
+        planning_type_jour, roulement_agents,
+        samedi_type=samedi_type, periode=periode, mode_vac=mode_vac,
+        swap_map=swap_map, presences_vac=presences_vac, gabarits=gabarits)
+    model, x, jeunesse_requis = gabarit.instancier(dispo.dispo, ev_minutes,
+                                                   cumul_hebdo_avant)
+
+    # Indice initial de la passe 1 : le planning-type lui-même. G1 (stabilité)
+    # étant l'objectif mou dominant, le PT est déjà très proche de la solution
+    # finale la plupart des jours. On ne garde que les placements PT réellement
+    # possibles (même résolution swap_map que G1, triplet admissible, au plus
+    # 1 par section RDC/Adulte/MF là où D_FILL l'exige, besoin Jeunesse non
+    # dépassé, 1 seule section par agent) ; toutes les autres variables x sont
+    # indiquées à 0 → indice complet sur x. Avant ça, pré-analyse de la
+    # couverture (09/2026) : manques inévitables, places qu'un seul agent
+    # peut tenir, minorant de la passe 1 — cf. _preparer_passe_1.
+    borne_couverture = _preparer_passe_1(gabarit, model, x, jeunesse_requis,
+                                         swap_map, indice_pt, date_str)
+
+    niveaux = [termes for termes in (gabarit.penalites, gabarit.penalites_stabilite,
+                                     gabarit.penalites_qualite, gabarit.penalites_equite)
+               if termes]
+    poids = _poids_lexicographiques(model, niveaux) if objectif_unique else None
+    if poids is not None:
+        budget.ouvrir_jour(date_str, 1)
+        solver = _resoudre_objectif_unique(
+            model, niveaux, poids, reparer_indices, budget,
+            borne_couverture if gabarit.penalites else None, portefeuille)
+    else:
+        budget.ouvrir_jour(date_str, _nb_passes(gabarit.penalites_stabilite,
+                                                gabarit.penalites_qualite,
+                                                gabarit.penalites_equite))
+        solver = _resoudre_par_passes(
+            model, gabarit.penalites, gabarit.penalites_stabilite,
+            gabarit.penalites_qualite, gabarit.penalites_equite,
+            reparer_indices, budget, borne_couverture, portefeuille)
+    budget.fermer_jour()
+    if solver is None:
+        resultat = None, diagnostiquer_jour(
+            jour, date_str, creneaux_ouverts, agents_eligibles,
+            affectations, categories, responsables, pause_flex, priorite_rdc,
+            horaires_agents, evenements, besoins_jeunesse,
+            planning_type_jour, roulement_agents,
+            samedi_type=samedi_type, periode=periode, mode_vac=mode_vac,
+            swap_map=swap_map, presences_vac=presences_vac,
+            cumul_hebdo_avant=cumul_hebdo_avant), {}
+    else:
+        resultat = _extraire_jour(solver, gabarit, x, creneaux_ouverts, jeunesse_requis)
+    if enregistrement is not None:
+        enregistrement({'date': date_str, 'moteur': _empreinte_moteur(),
+                        'arguments': arguments, 'profil': budget.journal[-1],
+                        'modeles': budget.modeles, 'resultat': resultat})
+        budget.modeles = None
+    return resultat
+
+
+def diagnostiquer_jour(jour, date_str, creneaux_ouverts, agents_eligibles,
+                       affectations, categories, responsables, pause_flex, priorite_rdc,
+                       horaires_agents, evenements, besoins_jeunesse,
+                       planning_type_jour, roulement_agents,
+                       samedi_type=None, periode='Hors Vacances scolaires',
+                       mode_vac=None, swap_map=None, presences_vac=None,
+                       cumul_hebdo_avant=None, temps_max=TEMPS_DIAGNOSTIC):
+    """
+    Diagnostic d'une journée sans solution (09/2026, mêmes paramètres que
+    solve_day) : au lieu d'une alerte générique, désigne les règles en
+    conflit, pour savoir quel onglet corriger sans relancer tout le mois.
+
+    Le modèle du jour est reconstruit en mode "hypothèses" (cf.
+    _construire_gabarit_jour) : chaque contrainte dure n'y est active que si
+    son littéral l'est, et tous les littéraux sont posés comme hypothèses
+    de CP-SAT. S'il reste infaisable, CP-SAT donne un sous-ensemble
+    d'hypothèses suffisant pour l'infaisabilité, réduit ensuite règle par
+    règle (une règle est écartée si le modèle reste infaisable sans elle)
+    jusqu'à un ensemble minimal, dans la limite de temps_max secondes.
+    Retourne des alertes au format de solve_day : une d'en-tête puis une
+    par règle en conflit (créneau concerné ou '*').
+    """
+    debut = time.perf_counter()
+    model = cp_model.CpModel()
+    hypotheses = {}
+    gabarit, dispo, ev_minutes = _modeliser_jour(
+        jour, date_str, creneaux_ouverts, agents_eligibles,
+        affectations, categories, responsables, pause_flex, priorite_rdc,
+        horaires_agents, evenements, besoins_jeunesse,
+        planning_type_jour, roulement_agents,
+        samedi_type=samedi_type, periode=periode, mode_vac=mode_vac,
+        swap_map=swap_map, presences_vac=presences_vac,
+        model=model, hypotheses=hypotheses)
+    gabarit.recaler(model, dispo.dispo, ev_minutes, cumul_hebdo_avant or {})
+    model.clear_objective()
+    par_index = {lit.index: cle for cle, lit in hypotheses.items()}
+
+    def resoudre(cles):
+        model.clear_assumptions()
+        model.add_assumptions([hypotheses[cle] for cle in cles])
+        solver = cp_model.CpSolver()
+        solver.parameters.num_workers = 1  # noyau d'hypothèses : 1 seul chercheur
+        solver.parameters.max_time_in_seconds = max(
+            TEMPS_MIN_PASSE, temps_max - (time.perf_counter() - debut))
+        status = solver.solve(model)
+        if status != cp_model.INFEASIBLE:
+            return status, None
+        return status, [par_index[i] for i in solver.sufficient_assumptions_for_infeasibility()]
+
+    status, noyau = resoudre(list(hypotheses))
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return [('*', '*', "aucune solution trouvée dans le temps imparti — la journée a "
+                           "pourtant une solution : augmenter Budget_calcul_minutes")]
+    if noyau is None:
+        return [('*', '*', 'aucune solution trouvée (diagnostic non concluant '
+                           f'en {temps_max:.0f} s)')]
+
+    i = 0
+    while i < len(noyau) and time.perf_counter() - debut < temps_max:
+        reste = noyau[:i] + noyau[i + 1:]
+        status, plus_petit = resoudre(reste)
+        if plus_petit is not None:
+            # règle i inutile au conflit (et d'autres, peut-être) ; l'ordre
+            # est conservé pour ne pas retester les règles déjà jugées utiles
+            noyau = [cle for cle in reste if cle in set(plus_petit)]
+        else:
+            i += 1
+    _journal.warning('%s : aucune solution — règles en conflit : %s', date_str, noyau)
+
+    alertes = [('*', '*', 'aucune solution : règles incompatibles ci-dessous '
+                          '(à corriger dans la préparation)')]
+    for famille, agent, c in sorted(noyau, key=lambda cle: tuple(map(str, cle))):
+        message = f'{famille} — {FAMILLES_DURES[famille]}'
+        if agent is not None:
+            message += f' ({agent})'
+        alertes.append(('*' if c is None else c, '*', message))
+    return alertes
+
+
+def _passes_1_a_3(args, reparer_indices, indice_pt, budget, gabarits, temps_max=None):
+    """
+    Passes 1 à 3 (couverture, stabilité, qualité) d'UN jour seul, sur le
+    temps de la période ouverte dans `budget` — première étape de
+    solve_week / solve_glissant. Ne dépendent pas du cumul hebdo.
+    temps_max : plafond de chaque passe (cf. _resoudre_par_passes).
+    Retourne (args, gabarit, x, jeunesse_requis, solveur, valeurs des 3
+    niveaux), ou None si le jour n'a aucune solution.
+    """
+    gabarit, dispo, ev_minutes = _modeliser_jour(**args, gabarits=gabarits)
+    model, x, jeunesse_requis = gabarit.instancier(dispo.dispo, ev_minutes, {})
+    borne_couverture = _preparer_passe_1(gabarit, model, x, jeunesse_requis,
+                                         args.get('swap_map') or {}, indice_pt,
+                                         args['date_str'])
+    solver = _resoudre_par_passes(
+        model, gabarit.penalites, gabarit.penalites_stabilite,
+        gabarit.penalites_qualite, [], reparer_indices, budget, borne_couverture,
+        temps_max=temps_max)
+    if solver is None:
+        return None
+    valeurs = tuple(sum(solver.value(t) for t in termes)
+                    for termes in (gabarit.penalites, gabarit.penalites_stabilite,
+                                   gabarit.penalites_qualite))
+    return args, gabarit, x, jeunesse_requis, solver, valeurs
+
+
+def _equite_jointe(par_jour, cumul_hebdo_avant, indices, reparer_indices, budget,
+                   temps_max=None):
+    """
+    Passe 4 (équité) commune à plusieurs jours CONSÉCUTIFS d'une semaine :
+    chaque jour garde toutes ses contraintes (même construction, cf.
+    _modeliser_jour), bornées aux valeurs de SES passes 1 à 3 (par_jour :
+    résultats de _passes_1_a_3) ; le cumul "avant ce jour" de chaque agent
+    y EST la somme des variables de dépassement des jours précédents, à
+    partir de cumul_hebdo_avant (constante : jours déjà figés).
+    indices : point de départ de chaque jour, {triplet: 0/1}.
+    Temps pris sur la période ouverte dans `budget`, plafonné à temps_max.
+    Retourne (solveur, [(creneaux, gabarit, x, jeunesse_requis)] par jour)
+    dans le modèle commun, ou None si la passe est sautée faute de budget
+    ou n'a pas trouvé de solution.
+    """
+    temps = budget.temps_passe()
+    if temps is None:
+        budget.sauter_passe('équité jointe')
+        return None
+    if temps_max is not None:
+        temps = min(temps, temps_max)
+    model = cp_model.CpModel()
+    equite = []
+    jours = []
+    cumul = dict(cumul_hebdo_avant)  # {agent: expression du cumul avant le jour courant}
+    for (args, _, _, _, _, valeurs), indice in zip(par_jour, indices):
+        gabarit, dispo, ev_minutes = _modeliser_jour(**args, model=model)
+        x, jeunesse_requis = gabarit.recaler(model, dispo.dispo, ev_minutes)
+        for termes, valeur in zip((gabarit.penalites, gabarit.penalites_stabilite,
+                                   gabarit.penalites_qualite), valeurs):
+            if termes:
+                model.add(sum(termes) <= valeur)
+        for a, avant in gabarit.cumul_avant.items():
+            model.add(avant == cumul.get(a, 0))
+        for a, depas in gabarit.depas_par_agent.items():
+            cumul[a] = cumul.get(a, 0) + depas
+        equite.extend(gabarit.penalites_equite)
+        for cle, var in gabarit.x.items():
+            model.add_hint(var, indice.get(cle, 0))
+        jours.append((args['creneaux_ouverts'], gabarit, x, jeunesse_requis))
+    model.minimize(sum(equite))
+    solver = _creer_solveur(reparer_indices, temps)
+    status = _resoudre(solver, model)
+    budget.noter_passe(solver, status, nom='équité jointe', model=model)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return None
+    return solver, jours
+
+
+def _valeurs_x(solver, x):
+    return {cle: solver.value(var) for cle, var in x.items()}
+
+
+def solve_week(jours, cumul_hebdo_avant=None, reparer_indices=False,
+               indice_pt=True, budget=None, gabarits=None):
+    """
+    Résout les jours d'une semaine avec une équité hebdomadaire optimisée
+    sur TOUTE la semaine (mode "semaine" de compute_full_planning, 09/2026).
+
+    En mode "jour", le cumul des jours précédents est une constante, reprise
+    du calcul déjà figé de la veille : le mardi ne peut pas anticiper le
+    samedi. Ici :
+    1. Passes 1 à 3 (couverture, stabilité, qualité des remplaçants) jour
+       par jour, exactement comme solve_day : elles ne dépendent que du jour
+       lui-même, leur optimum sur la semaine est donc celui de chaque jour —
+       et 5 petits modèles se résolvent bien plus vite qu'un gros (mesuré :
+       ~15× sur les passes 2-3).
+    2. Passe 4 (équité) sur UN modèle commun à toute la semaine, cf.
+       _equite_jointe, en partant des solutions des passes 1 à 3.
+
+    jours : paramètres de solve_day de chaque jour, dans l'ordre de la
+            semaine (cf. _preparer_jour), sans cumul_hebdo_avant.
+    cumul_hebdo_avant : cumul déjà acquis avant le premier jour (défaut : 0).
+    budget : BudgetTemps — la semaine y compte pour len(jours) jours.
+    gabarits : cache de modèles des passes 1 à 3 (cf. solve_day).
+    Retourne la liste des (solution, alertes, depas_jour) de chaque jour, au
+    format de solve_day, ou None si un des jours n'a aucune solution.
+    """
+    if cumul_hebdo_avant is None:
+        cumul_hebdo_avant = {}
+    if budget is None:
+        budget = BudgetTemps(nb_jours=len(jours))
+
+    budget.ouvrir_jour(jours[0]['date_str'], 1 + sum(
+        _nb_passes(True, True, False) for _ in jours), nb_jours=len(jours))
+
+    # ── 1. Passes 1 à 3, jour par jour
+    par_jour = []
+    for args in jours:
+        # Chaque passe d'un jour reste plafonnée à TEMPS_MAX_PASSE : la
+        # période ouverte pour len(jours) jours ne vaut que pour l'équité.
+        resultat = _passes_1_a_3(args, reparer_indices, indice_pt, budget, gabarits,
+                                 TEMPS_MAX_PASSE)
+        if resultat is None:
+            budget.fermer_jour()
+            return None
+        par_jour.append(resultat)
+
+    # ── 2. Passe 4 : équité sur la semaine entière
+    indices = [_valeurs_x(solver, x) for _, _, x, _, solver, _ in par_jour]
+    joint = _equite_jointe(par_jour, cumul_hebdo_avant, indices, reparer_indices, budget)
+    if joint is not None:
+        solver, semaine = joint
+        budget.fermer_jour()
+        return [_extraire_jour(solver, gabarit, x, creneaux_ouverts, jeunesse_requis)
+                for creneaux_ouverts, gabarit, x, jeunesse_requis in semaine]
+
+    # Équité non optimisée (budget épuisé / échec) : solutions des passes 1 à 3
+    budget.fermer_jour()
+    return [_extraire_jour(solver, gabarit, x, args['creneaux_ouverts'], jeunesse_requis)
+            for args, gabarit, x, jeunesse_requis, solver, _ in par_jour]
+
+
+def solve_glissant(jours, cumul_hebdo_avant=None, fenetre=2, reparer_indices=False,
+                   indice_pt=True, budget=None, gabarits=None):
+    """
+    Horizon glissant (mode "glissant" de compute_full_planning, 09/2026),
+    entre solve_day (chaque jour ignore les suivants) et solve_week (un
+    modèle d'équité pour toute la semaine, de plus en plus coûteux avec la
+    taille de la semaine). Pour chaque jour d, passe 4 (équité) commune aux
+    jours d à d+fenetre-1 (cf. _equite_jointe), dont SEUL le jour d est
+    retenu — les suivants n'y servent qu'à éviter de charger aujourd'hui
+    l'agent dont on aura besoin demain — puis la fenêtre avance d'un jour,
+    le cumul hebdo repartant du jour retenu, comme en mode "jour".
+
+    Passes 1 à 3 : une seule fois par jour (elles ne dépendent pas du
+    cumul, cf. solve_week), quand le jour entre dans sa première fenêtre.
+    Chaque fenêtre part de la solution de la fenêtre précédente pour les
+    jours qu'elle reprend, de celle des passes 1 à 3 pour le nouveau jour.
+    Coût d'une fenêtre borné : modèle de fenetre jours, passe 4 plafonnée
+    à TEMPS_MAX_PASSE × fenetre ; passes 1 à 3 de chaque jour plafonnées à
+    TEMPS_MAX_PASSE, comme en mode "jour" (la période ouverte pour toute la
+    semaine n'en relève pas le plafond).
+
+    Mêmes paramètres et même retour que solve_week ; fenetre : nombre de
+    jours résolus ensemble (1 : équivalent du mode "jour").
+    """
+    if cumul_hebdo_avant is None:
+        cumul_hebdo_avant = {}
+    if budget is None:
+        budget = BudgetTemps(nb_jours=len(jours))
+    fenetre = max(1, int(fenetre))
+
+    budget.ouvrir_jour(jours[0]['date_str'],
+                       len(jours) * (_nb_passes(True, True, False) + 1),
+                       nb_jours=len(jours))
+    cumul = dict(cumul_hebdo_avant)  # jours déjà retenus uniquement
+    par_jour = []  # résultats des passes 1 à 3, au fur et à mesure
+    indices = []   # point de départ de chaque jour pour sa prochaine fenêtre
+    resultats = []
+    for d in range(len(jours)):
+        while len(par_jour) < min(d + fenetre, len(jours)):
+            resultat = _passes_1_a_3(jours[len(par_jour)], reparer_indices,
+                                     indice_pt, budget, gabarits, TEMPS_MAX_PASSE)
+            if resultat is None:
+                budget.fermer_jour()
+                return None
+            _, _, x, _, solver, _ = resultat
+            par_jour.append(resultat)
+            indices.append(_valeurs_x(solver, x))
+
+        budget.reprendre()
+        joint = _equite_jointe(par_jour[d:d + fenetre], cumul, indices[d:d + fenetre],
+                               reparer_indices, budget, TEMPS_MAX_PASSE * fenetre)
+        if joint is None:
+            # Équité non optimisée (budget épuisé / échec) : passes 1 à 3
+            args, gabarit, x, jeunesse_requis, solver, _ = par_jour[d]
+            retenu = _extraire_jour(solver, gabarit, x, args['creneaux_ouverts'],
+                                    jeunesse_requis)
+        else:
+            solver, fenetre_jours = joint
+            creneaux_ouverts, gabarit, x, jeunesse_requis = fenetre_jours[0]
+            retenu = _extraire_jour(solver, gabarit, x, creneaux_ouverts, jeunesse_requis)
+            for k, (_, _, x_k, _) in enumerate(fenetre_jours[1:], d + 1):
+                indices[k] = _valeurs_x(solver, x_k)
+        resultats.append(retenu)
+        for a, depas in retenu[2].items():
+            cumul[a] = cumul.get(a, 0) + depas
+
+    budget.fermer_jour()
+    return resultats
+
+
+# ══════════════════════════════════════════════════════════════
+#  CACHE DE SOLUTIONS SUR DISQUE
+# ══════════════════════════════════════════════════════════════
+
+# Corriger une coquille dans l'onglet Événements puis relancer le calcul
+# refaisait tout le mois. Désormais chaque journée résolue par solve_day est
+# rangée sur disque sous l'empreinte de TOUTES ses données d'entrée (cf.
+# _empreinte_jour) : une journée dont rien n'a changé est reprise telle
+# quelle, sans CP-SAT. Taille bornée (les entrées les moins récemment lues
+# sont effacées en premier). Désactivable par PLANNING_CACHE_SOLUTIONS=0, ou
+# déplaçable en y mettant un autre chemin de fichier.
+CHEMIN_CACHE_SOLUTIONS = os.path.join(os.path.expanduser('~'), '.cache',
+                                      'planning_mediatheque', 'solutions.sqlite')
+TAILLE_MAX_CACHE = 50 * 1024 * 1024  # octets
+
+_version_moteur = None
+
+
+def _empreinte_moteur():
+    """Empreinte du code de ce module : toute modification du moteur (poids,
+    contraintes...) invalide les solutions déjà en cache."""
+    global _version_moteur
+    if _version_moteur is None:
+        with open(__file__, 'rb') as f:
+            _version_moteur = hashlib.sha256(f.read()).hexdigest()
+    return _version_moteur
+
+
+def _canonique(valeur):
+    if isinstance(valeur, (set, frozenset)):
+        return sorted(valeur)
+    return str(valeur)
+
+
+def _hacher(valeur):
+    """sha256 d'une sérialisation JSON canonique (clés triées, ensembles
+    triés) : deux valeurs égales donnent la même empreinte, quel que soit
+    l'ordre de lecture du fichier de préparation."""
+    texte = json.dumps(valeur, sort_keys=True, ensure_ascii=False, default=_canonique)
+    return hashlib.sha256(texte.encode('utf-8')).hexdigest()
+
+
+# Composantes des données d'un jour (cf. _empreintes_jour) et leur libellé
+# dans les raisons de recalcul (cf. compute_full_planning, `precedent`).
+COMPOSANTES_JOUR = {
+    'moteur':           'moteur de calcul',
+    'mode':             'mode de calcul',
+    'grille':           'créneaux / période',
+    'agents':           'agents / affectations',
+    'horaires':         'horaires',
+    'evenements':       'événements',
+    'planning_type':    'planning-type',
+    'besoins_jeunesse': 'besoins Jeunesse',
+    'presences':        'présences vacataires',
+    'cumul_hebdo':      'cumul hebdo (jour précédent recalculé)',
+}
+
+
+def _empreintes_jour(args, mode=None):
+    """
+    Empreinte, composante par composante, des données d'entrée d'un appel à
+    solve_day (args : cf. _preparer_jour), réduites à ce qui concerne CE
+    jour : données des agents éligibles seulement, horaires de ce jour de
+    la semaine, événements et présences vacataires de cette date. Le cumul
+    hebdo (composante 'cumul_hebdo') est ajouté par l'appelant.
+    Retourne {composante: sha256} (cf. COMPOSANTES_JOUR).
+    """
+    agents   = list(args['agents_eligibles'])
+    jour     = args['jour']
+    date_str = args['date_str']
+    composantes = {
+        'moteur': _empreinte_moteur(),
+        'grille': [jour, date_str, args['creneaux_ouverts'], args.get('samedi_type'),
+                   args.get('periode', 'Hors Vacances scolaires')],
+        'agents': {
+            'agents':       agents,
+            'affectations': {a: args['affectations'].get(a) for a in agents},
+            'categories':   {a: args['categories'].get(a) for a in agents},
+            'responsables': sorted(set(args['responsables']) & set(agents)),
+            'pause_flex':   sorted(set(args['pause_flex']) & set(agents)),
+            'priorite_rdc': {a: args['priorite_rdc'].get(a) for a in agents},
+            'roulement':    {a: args['roulement_agents'].get(a) for a in agents},
+            'swap_map':     args.get('swap_map') or {},
+            'mode_vac':     args.get('mode_vac') or JOURS_VAC,
+        },
+        'horaires':         {a: args['horaires_agents'].get(a, {}).get(jour) for a in agents},
+        'evenements':       _index_evenements(args['evenements']).du_jour(date_str),
+        'planning_type':    args['planning_type_jour'],
+        'besoins_jeunesse': args['besoins_jeunesse'],
+        'presences':        (args.get('presences_vac') or {}).get(date_str, {}),
+    }
+    if mode is not None:
+        composantes['mode'] = mode
+    return {nom: _hacher(valeur) for nom, valeur in composantes.items()}
+
+
+def _empreinte_jour(args, cumul_hebdo_avant, mode=None):
+    """Clé du cache de solutions : empreinte de TOUTES les données d'entrée
+    d'un appel à solve_day, cumul hebdo compris (cf. _empreintes_jour) ;
+    mode : 'objectif_unique' pour une résolution à objectif unique (None :
+    passes)."""
+    empreintes = _empreintes_jour(args, mode)
+    empreintes['cumul_hebdo'] = _hacher(cumul_hebdo_avant or {})
+    return _hacher(empreintes)
+
+
+def _raison_recalcul(precedent, empreintes, ignorer=()):
+    """
+    Pourquoi le jour `precedent` d'un calcul précédent (dict de weeks_data)
+    ne peut pas être repris tel quel, vu les empreintes de ses données
+    actuelles : texte de la raison, ou None s'il peut l'être. Même règle
+    que le cache de solutions : un jour sans solution, ou arrêté par le
+    temps (passe plafonnée ou sautée), est recalculé même inchangé — sinon
+    un mois calculé avec un budget serré le resterait à chaque reprise.
+    """
+    if precedent is None or 'empreintes' not in precedent:
+        return 'absent du calcul précédent'
+    modifiees = [COMPOSANTES_JOUR[nom] for nom in COMPOSANTES_JOUR
+                 if nom not in ignorer
+                 and precedent['empreintes'].get(nom) != empreintes.get(nom)]
+    if modifiees:
+        return 'modifié : ' + ', '.join(modifiees)
+    if precedent.get('infaisable'):
+        return 'sans solution au calcul précédent'
+    if precedent.get('plafond_atteint'):
+        return 'plafond atteint au calcul précédent'
+    return None
+
+
+class CacheSolutions:
+    """
+    Solutions de solve_day (solution, alertes, depas_jour) rangées dans un
+    fichier SQLite, par empreinte des données du jour (cf. _empreinte_jour).
+    Au-delà de taille_max octets, les solutions les moins récemment lues
+    sont effacées. Une connexion par opération : l'objet ne garde que le
+    chemin et peut être envoyé aux processus fils du mode parallèle (SQLite
+    gère lui-même les accès simultanés au fichier).
+
+    Le cache n'est qu'une accélération : toute erreur d'accès (disque
+    plein, dossier en lecture seule...) est journalisée puis ignorée, le
+    jour est alors simplement recalculé.
+    """
+
+    def __init__(self, chemin=CHEMIN_CACHE_SOLUTIONS, taille_max=TAILLE_MAX_CACHE):
+        self.chemin     = chemin
+        self.taille_max = taille_max
+
+    @contextmanager
+    def _connexion(self):
+        dossier = os.path.dirname(self.chemin)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        connexion = sqlite3.connect(self.chemin, timeout=30)
+        try:
+            connexion.execute('CREATE TABLE IF NOT EXISTS solutions ('
+                              'cle TEXT PRIMARY KEY, valeur TEXT NOT NULL, '
+                              'taille INTEGER NOT NULL, dernier_acces REAL NOT NULL)')
+            with connexion:
+                yield connexion
+        finally:
+            connexion.close()
+
+    def lire(self, cle):
+        """Solution rangée sous `cle` au format de solve_day, ou None."""
+        try:
+            with self._connexion() as connexion:
+                ligne = connexion.execute('SELECT valeur FROM solutions WHERE cle = ?',
+                                          (cle,)).fetchone()
+                if ligne is None:
+                    return None
+                connexion.execute('UPDATE solutions SET dernier_acces = ? WHERE cle = ?',
+                                  (time.time(), cle))
+        except (sqlite3.Error, OSError) as erreur:
+            _journal.warning('Cache de solutions illisible (%s) : %s', self.chemin, erreur)
+            return None
+        donnees = json.loads(ligne[0])
+        solution = {int(c): sections for c, sections in donnees['solution'].items()}
+        alertes = [tuple(alerte) for alerte in donnees['alertes']]
+        return solution, alertes, donnees['depas_jour']
+
+    def ecrire(self, cle, resultat):
+        """Range `resultat` (format de solve_day) puis ramène le fichier sous
+        taille_max, en effaçant d'abord les solutions lues le moins récemment."""
+        solution, alertes, depas_jour = resultat
+        valeur = json.dumps({'solution': solution, 'alertes': alertes,
+                             'depas_jour': depas_jour}, ensure_ascii=False)
+        try:
+            with self._connexion() as connexion:
+                connexion.execute('INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?)',
+                                  (cle, valeur, len(valeur.encode('utf-8')), time.time()))
+                connexion.execute(
+                    'DELETE FROM solutions WHERE cle IN ('
+                    ' SELECT cle FROM (SELECT cle, SUM(taille) OVER '
+                    '  (ORDER BY dernier_acces DESC, cle) AS cumul FROM solutions)'
+                    ' WHERE cumul > ?)', (self.taille_max,))
+        except (sqlite3.Error, OSError) as erreur:
+            _journal.warning('Cache de solutions non enregistré (%s) : %s', self.chemin, erreur)
+
+
+def _cache_par_defaut():
+    """Cache de compute_full_planning quand l'appelant n'en précise pas :
+    variable d'environnement PLANNING_CACHE_SOLUTIONS (chemin du fichier, ou
+    0 / non pour désactiver), sinon CHEMIN_CACHE_SOLUTIONS."""
+    chemin = os.environ.get('PLANNING_CACHE_SOLUTIONS', '').strip()
+    if chemin.lower() in ('0', 'non', 'false', 'off'):
+        return None
+    return CacheSolutions(chemin or CHEMIN_CACHE_SOLUTIONS)
+
+
 # ══════════════════════════════════════════════════════════════
 #  POINT D'ENTRÉE PRINCIPAL
 # ══════════════════════════════════════════════════════════════
@@ -1702,13 +3571,329 @@ def parse_horaires_ouverture(raw):
             result[jour] = plages
     return result
 
-def compute_full_planning(filepath):
+def _resoudre_besoins_jour(besoins_jeunesse, jour_x, samedi_type_x):
+    """Besoins_Jeunesse "vacances" du jour ({cren_str: besoin}), en tolérant
+    les variations d'écriture de la colonne samedi (rouge/bleu)."""
+    periode_key = next((p for p in besoins_jeunesse if 'Hors' not in p), None)
+    if not periode_key:
+        return {}
+    jours_dict = besoins_jeunesse.get(periode_key, {})
+    if jour_x == 'Samedi' and samedi_type_x:
+        def _norm(s):
+            return s.lower().replace('_', ' ').replace('-', ' ').strip()
+        cible = _norm(f'samedi {samedi_type_x}')
+        jour_key = next((k for k in jours_dict if _norm(k) == cible),
+                         f'Samedi_{samedi_type_x.lower()}')
+    else:
+        jour_key = jour_x
+    return jours_dict.get(jour_key, {})
+
+
+# Grille horaire spécifique aux jours "vacances" : construite à partir des
+# tranches du tableau Besoins_Jeunesse (plus fine que la liste standard),
+# car aucune liste de créneaux "vacances" n'existe dans l'onglet Paramètres.
+# ⚠️ Corrigé 08/2026 : construite désormais PAR JOUR (pas une grille unique
+# partagée), et les sous-tranches consécutives avec le MÊME besoin Jeunesse
+# sont fusionnées — évite de fragmenter un bloc homogène (ex: 15h30-17h
+# devenait à tort 15h30-16h + 16h-17h alors que le besoin ne change pas,
+# ce qui laissait le solveur choisir 2 agents différents sur un même bloc).
+def _construire_grille_vacances_jour(besoins_jeunesse, params, jour_x, samedi_type_x):
+    besoins_jour = _resoudre_besoins_jour(besoins_jeunesse, jour_x, samedi_type_x)
+    ranges = []
+    for cren_str, besoin in besoins_jour.items():
+        parsed = parse_creneau(cren_str)
+        if parsed:
+            ranges.append((parsed[0], parsed[1], besoin))
+    ranges.sort()
+    if not ranges:
+        return []
+    # Blocs "standards" (hors vacances) pour ce jour : la fusion des sous-tranches
+    # ne doit JAMAIS dépasser ces limites, sinon ça fusionne aussi les blocs
+    # RDC/Adulte/MF du planning-type qui, eux, gardent leurs propres frontières
+    # (ex: fusionner au-delà casserait le remplissage de ces sections).
+    blocs_standards = (params['creneaux_ms'] if jour_x in ('Mercredi', 'Samedi')
+                        else params['creneaux_mjv'])
+
+    merged = []
+    for bs, be in blocs_standards:
+        # Sous-tranches Besoins_Jeunesse contenues dans ce bloc standard
+        sous = [(cs, ce, b) for (cs, ce, b) in ranges if cs >= bs and ce <= be]
+        if not sous:
+            merged.append((bs, be))
+            continue
+        cur = list(sous[0])
+        for cs, ce, b in sous[1:]:
+            if cs == cur[1] and b == cur[2]:
+                cur[1] = ce  # même besoin ET contigu → fusion (dans ce bloc uniquement)
+            else:
+                merged.append((cur[0], cur[1]))
+                cur = [cs, ce, b]
+        merged.append((cur[0], cur[1]))
+    return merged
+
+
+def _preparer_jour(semaine, jour_info, contexte):
     """
-    Calcule le planning complet du mois.
-    Retourne (weeks_data, metadata) au même format que l'ancien moteur.
+    Rassemble tous les paramètres de solve_day pour un jour du calendrier
+    (sauf cumul_hebdo_avant, qui dépend des jours précédents de la semaine).
+    Retourne un dict directement utilisable en `solve_day(**args, cumul_hebdo_avant=...)`.
     """
-    raw = load_excel_data(filepath)
+    params               = contexte['params']
+    horaires_agents      = contexte['horaires_agents']
+    roulement_type       = contexte['roulement_type']
+    roulement_exceptions = contexte['roulement_exceptions']
+
+    week_num = semaine['num']
+    periode  = params['semaines'].get(week_num, 'Hors Vacances scolaires')
+    date_str = jour_info['date']
+    jour     = jour_info['jour']
+    sam_type = jour_info.get('samedi_type')
+
+    # Roulement samedi (avec exceptions)
+    roulement_agents = dict(roulement_type)
+    for agent_exc, roul_exc in roulement_exceptions.get(week_num, {}).items():
+        roulement_agents[agent_exc] = roul_exc.upper()
+
+    # Période effective : le réglage par semaine (Semaine_N) sert de défaut,
+    # mais un jour marqué "vacances" dans l'onglet Jours_speciaux prime dessus
+    # (ex : un pont ponctuel en vacances au sein d'une semaine "Hors Vacances")
+    periode_effective = periode
+    js_info = contexte['jours_speciaux'].get(date_str)
+    if js_info and js_info.get('vacances'):
+        periode_effective = 'Vacances Scolaires'
+
+    # Agents éligibles ce jour
+    agents_eligibles = []
+    pv = params.get('presences_vac', {})
+    use_presences = bool(pv)  # Si tableau défini → utiliser exclusivement
+    for a in contexte['agents_tous']:
+        if is_vacataire(a):
+            if use_presences:
+                # Présence explicite uniquement
+                if date_str in pv and a in pv[date_str]:
+                    agents_eligibles.append(a)
+            else:
+                # Fallback mode_vac global
+                if jour in params['mode_vac']:
+                    agents_eligibles.append(a)
+        else:
+            h = horaires_agents.get(a, {}).get(jour)
+            if h and any(v is not None for v in h):
+                agents_eligibles.append(a)
 
+    # Planning type pour ce jour
+    if jour == 'Samedi' and sam_type:
+        pt_jour_key = f'Samedi_{sam_type}'
+    else:
+        pt_jour_key = jour
+    pt_jour = contexte['planning_type'].get(pt_jour_key, {})
+
+    # Créneaux ouverts : grille "vacances" (fine, fusionnée, propre à ce
+    # jour) si le jour est en mode vacances (via Jours_speciaux ou
+    # Semaine_N), sinon liste standard selon le jour
+    creneaux_vacances_jour = (_construire_grille_vacances_jour(
+                                  contexte['besoins_jeunesse'], params, jour, sam_type)
+                               if 'Hors' not in periode_effective else [])
+    if creneaux_vacances_jour:
+        creneaux_ouverts = creneaux_vacances_jour
+    elif jour in ('Mercredi', 'Samedi'):
+        creneaux_ouverts = params['creneaux_ms']
+    else:
+        creneaux_ouverts = params['creneaux_mjv']
+
+    # Construire le swap_map pour ce samedi
+    # Si agent A normalement ROUGE est passé BLEU (exception) et B est passé ROUGE
+    # → B remplace A dans les slots PT de A
+    swap_map = {}
+    if jour == 'Samedi' and sam_type:
+        exc = roulement_exceptions.get(week_num, {})
+        # Agents qui ont changé de roulement ce samedi
+        vers_autre = {a: r for a, r in exc.items() if r != sam_type}  # absents
+        vers_ce_sam = {a: r for a, r in exc.items() if r == sam_type}  # présents par exception
+        # Aussi les agents dont le type normal diffère du samedi actuel
+        # absents_normal = ceux qui sont normalement de l'autre couleur MAIS
+        # ont été swappés vers ce samedi
+        normal_absents = [a for a, r in roulement_type.items()
+                          if r != sam_type and a not in exc]
+        # Pour chaque absent normal qui a un swap entrant → construire le map
+        # Heuristique : chercher dans vers_autre si l'agent PT ROUGE est absent
+        for a_absent, r_absent in vers_autre.items():
+            # Trouver qui l'a remplacé (celui qui est passé vers ce samedi)
+            for a_repl, r_repl in vers_ce_sam.items():
+                if a_absent not in swap_map:
+                    swap_map[a_absent] = a_repl
+
+    return dict(
+        jour=jour,
+        date_str=date_str,
+        creneaux_ouverts=creneaux_ouverts,
+        agents_eligibles=agents_eligibles,
+        affectations=contexte['affectations'],
+        categories=contexte['categories'],
+        responsables=contexte['responsables'],
+        pause_flex=contexte['pause_flex'],
+        priorite_rdc=contexte['priorite_rdc'],
+        horaires_agents=horaires_agents,
+        evenements=contexte['evenements'],
+        besoins_jeunesse=contexte['besoins_jeunesse'],
+        planning_type_jour=pt_jour,
+        roulement_agents=roulement_agents,
+        samedi_type=sam_type,
+        periode=periode_effective,
+        mode_vac=params['mode_vac'],
+        swap_map=swap_map,
+        presences_vac=params.get('presences_vac', {}),
+    )
+
+
+def _calculer_semaine(semaine, contexte, gabarits=None, budget=None, mode='jour',
+                      cache=None, precedents=None, portefeuille=False,
+                      enregistrement=None):
+    """
+    Résout tous les jours d'UNE semaine du calendrier, dans l'ordre, en
+    enchaînant le carnet d'équité hebdomadaire. Fonction de module (et non
+    imbriquée) pour pouvoir être envoyée telle quelle à un processus fils en
+    mode parallèle — voir compute_full_planning.
+    gabarits : cache de modèles partagé entre semaines (cf. solve_day) ;
+    None → cache propre à cette semaine.
+    budget : BudgetTemps partagé entre semaines ; None → sans budget global.
+    mode : 'jour' (un modèle par jour, cumul hebdo enchaîné), 'semaine'
+    (équité sur toute la semaine, cf. solve_week) ou 'glissant' (équité
+    sur des fenêtres de 2 jours, cf. solve_glissant) — repli sur 'jour' si
+    un des jours de la semaine n'a pas de solution — ou 'objectif_unique'
+    (expérimental : comme 'jour', en une résolution par jour, cf.
+    solve_day, objectif_unique).
+    cache : CacheSolutions où reprendre / ranger les jours résolus un par
+    un (modes 'jour', 'objectif_unique' et replis) ; None → pas de cache. Les modes 'semaine'
+    et 'glissant' n'y passent pas : leur résultat d'un jour dépend aussi
+    des jours suivants.
+    precedents : {date: jour de weeks_data} d'un calcul précédent — les
+    jours dont aucune donnée n'a changé en sont repris tels quels (cf.
+    compute_full_planning, `precedent`) ; None → tout est recalculé.
+    portefeuille : jours résolus un par un avec un portefeuille de
+    réglages CP-SAT (cf. solve_day).
+    enregistrement : puits du corpus de rejeu de chaque jour résolu un par
+    un (cf. solve_day) — ni les jours repris ni les modes 'semaine' /
+    'glissant' n'y passent.
+    """
+    if gabarits is None:
+        gabarits = {}
+    if precedents is None:
+        precedents = {}
+    if budget is None:
+        budget = BudgetTemps(nb_jours=len(semaine['jours']))
+    week_plan = {'week_num': semaine['num'], 'jours': []}
+
+    # Carnet de compte de l'équité HEBDOMADAIRE (08/2026) : {agent: minutes
+    # de dépassement net cumulées depuis le début de CETTE semaine}. Remis
+    # à zéro à chaque nouvelle semaine (nouvel appel de cette fonction),
+    # mis à jour jour après jour au fur et à mesure qu'on avance dans la
+    # semaine — voir §7bis du contexte.
+    cumul_hebdo = {}
+
+    jours_args = [_preparer_jour(semaine, jour_info, contexte)
+                  for jour_info in semaine['jours']]
+    empreintes_jours = [_empreintes_jour(args, mode) for args in jours_args]
+
+    # Recalcul incrémental (09/2026) : un jour ne dépend que de ses propres
+    # données et, par le cumul hebdo, des jours précédents de SA semaine.
+    # Un jour aux données inchangées, dont le cumul d'entrée est lui aussi
+    # inchangé (jours précédents repris, ou recalculés à l'identique), est
+    # repris du calcul précédent ; les autres sont recalculés, raison à
+    # l'appui. Modes 'semaine' / 'glissant' : tout jour modifié fait
+    # recalculer toute sa semaine.
+    raisons_semaine = [_raison_recalcul(precedents.get(args['date_str']), empreintes,
+                                        ignorer=('cumul_hebdo',))
+                       for args, empreintes in zip(jours_args, empreintes_jours)]
+
+    resultats_semaine = None
+    if (mode in ('semaine', 'glissant') and jours_args
+            and any(raison is not None for raison in raisons_semaine)):
+        resoudre = solve_week if mode == 'semaine' else solve_glissant
+        resultats_semaine = resoudre(jours_args, budget=budget, gabarits=gabarits)
+        # Temps de calcul de la semaine réparti à parts égales entre ses jours ;
+        # ses passes sont portées au profil du premier jour seulement (une
+        # passe commune n'est comptée qu'une fois, cf. agreger_profils).
+        suivi_semaine = dict(budget.journal[-1])
+        suivi_semaine['utilise'] /= len(jours_args)
+        passes_semaine = suivi_semaine['passes']
+
+    for i, args in enumerate(jours_args):
+        empreintes = dict(empreintes_jours[i], cumul_hebdo=_hacher(cumul_hebdo))
+        if resultats_semaine is not None:
+            solution, alertes, depas_jour = resultats_semaine[i]
+            suivi = dict(suivi_semaine, passes=passes_semaine if i == 0 else [])
+            raison = raisons_semaine[i] or 'semaine recalculée'
+        else:
+            raison = _raison_recalcul(precedents.get(args['date_str']), empreintes)
+            if raison is None:
+                # Jour repris du calcul précédent (compte pour un jour du
+                # budget, sans temps pris) ; son cumul de sortie est donc lui
+                # aussi inchangé.
+                budget.ouvrir_jour(args['date_str'], 1)
+                suivi = budget.fermer_jour()
+                jour_repris = dict(precedents[args['date_str']], temps_calcul=0.0,
+                                   en_cache=False, recalcul=None, empreintes=empreintes,
+                                   profil=dict(suivi, date=args['date_str']))
+                cumul_hebdo = dict(jour_repris['cumul_hebdo_apres'])
+                week_plan['jours'].append(jour_repris)
+                continue
+            cle = (_empreinte_jour(args, cumul_hebdo,
+                                   'objectif_unique' if mode == 'objectif_unique' else None)
+                   if cache is not None else None)
+            resultat = cache.lire(cle) if cle else None
+            if resultat is not None:
+                # Jour inchangé depuis un calcul précédent : rien à résoudre
+                # (compte quand même pour un jour du budget, sans temps pris)
+                budget.ouvrir_jour(args['date_str'], 1)
+                suivi = budget.fermer_jour()
+                suivi['en_cache'] = True
+            else:
+                resultat = solve_day(**args, cumul_hebdo_avant=cumul_hebdo,
+                                     gabarits=gabarits, budget=budget,
+                                     objectif_unique=mode == 'objectif_unique',
+                                     portefeuille=portefeuille,
+                                     enregistrement=enregistrement)
+                suivi = budget.journal[-1]
+                # Seules les journées résolues jusqu'au bout (optimum prouvé à
+                # chaque passe) sont gardées : une solution arrêtée par le
+                # temps pourrait être améliorée au prochain calcul.
+                if cle and resultat[0] is not None and not suivi['plafond_atteint']:
+                    cache.ecrire(cle, resultat)
+            solution, alertes, depas_jour = resultat
+
+        # Mise à jour du carnet hebdo : on ajoute le dépassement NET de ce
+        # jour à ce qui était déjà cumulé cette semaine, pour que le jour
+        # suivant en tienne compte.
+        for a, d in depas_jour.items():
+            cumul_hebdo[a] = cumul_hebdo.get(a, 0) + d
+
+        week_plan['jours'].append({
+            'date':      args['date_str'],
+            'jour':      args['jour'],
+            'sam_type':  args['samedi_type'],
+            'creneaux':  args['creneaux_ouverts'],
+            'solution':  solution,   # {cren_idx: {section: [agents]}}
+            'infaisable': solution is None,
+            'alertes':   alertes,    # [(cren_idx, section, message)]
+            'cumul_hebdo_apres': dict(cumul_hebdo),  # utile pour debug/traçabilité
+            'temps_calcul':    suivi['utilise'],          # secondes CP-SAT, 4 passes
+            'plafond_atteint': suivi['plafond_atteint'],  # passe arrêtée par le temps / sautée
+            'en_cache':        suivi.get('en_cache', False),  # repris du cache de solutions
+            'recalcul':        raison,      # pourquoi recalculé (None : repris tel quel)
+            'empreintes':      empreintes,  # cf. _empreintes_jour, pour le calcul suivant
+            'profil':          dict(suivi, date=args['date_str']),  # passes : cf. BudgetTemps
+        })
+
+    return week_plan
+
+
+def _contexte_calcul(raw):
+    """
+    Parse une fois pour toutes les onglets de préparation nécessaires au
+    calcul et retourne le "contexte" du mois (dict de données simples, sans
+    objet openpyxl) : tout ce dont _preparer_jour/_calculer_semaine ont besoin.
+    """
     params         = parse_parametres(raw)
     affectations, categories, responsables, pause_flex, priorite_rdc = parse_affectations(raw)
     # Lecture directe de la grille collaborative "horaires d'équipes" ; repli sur
@@ -1720,209 +3905,356 @@ def compute_full_planning(filepath):
         horaires_agents = parse_horaires_agents(raw)
     roulement_type, roulement_exceptions = parse_roulement_samedi(raw)
     besoins_jeunesse = parse_besoins_jeunesse(raw)
-    evenements       = parse_evenements(raw, annee_defaut=params.get('annee'))
+    evenements       = IndexEvenements(parse_evenements(raw, annee_defaut=params.get('annee')))
     planning_type    = parse_planning_type(raw)
     jours_speciaux   = parse_jours_speciaux(raw)
 
     calendrier = build_calendar(params['mois'], params['annee'], params['samedis'])
 
-    agents_tous = list(affectations.keys())
-
-    # Grille horaire spécifique aux jours "vacances" : construite à partir des
-    # tranches du tableau Besoins_Jeunesse (plus fine que la liste standard),
-    # car aucune liste de créneaux "vacances" n'existe dans l'onglet Paramètres.
-    # ⚠️ Corrigé 08/2026 : construite désormais PAR JOUR (pas une grille unique
-    # partagée), et les sous-tranches consécutives avec le MÊME besoin Jeunesse
-    # sont fusionnées — évite de fragmenter un bloc homogène (ex: 15h30-17h
-    # devenait à tort 15h30-16h + 16h-17h alors que le besoin ne change pas,
-    # ce qui laissait le solveur choisir 2 agents différents sur un même bloc).
-    def resoudre_besoins_jour(jour_x, samedi_type_x):
-        periode_key = next((p for p in besoins_jeunesse if 'Hors' not in p), None)
-        if not periode_key:
-            return {}
-        jours_dict = besoins_jeunesse.get(periode_key, {})
-        if jour_x == 'Samedi' and samedi_type_x:
-            def _norm(s):
-                return s.lower().replace('_', ' ').replace('-', ' ').strip()
-            cible = _norm(f'samedi {samedi_type_x}')
-            jour_key = next((k for k in jours_dict if _norm(k) == cible),
-                             f'Samedi_{samedi_type_x.lower()}')
-        else:
-            jour_key = jour_x
-        return jours_dict.get(jour_key, {})
-
-    def construire_grille_vacances_jour(jour_x, samedi_type_x):
-        besoins_jour = resoudre_besoins_jour(jour_x, samedi_type_x)
-        ranges = []
-        for cren_str, besoin in besoins_jour.items():
-            parsed = parse_creneau(cren_str)
-            if parsed:
-                ranges.append((parsed[0], parsed[1], besoin))
-        ranges.sort()
-        if not ranges:
-            return []
-        # Blocs "standards" (hors vacances) pour ce jour : la fusion des sous-tranches
-        # ne doit JAMAIS dépasser ces limites, sinon ça fusionne aussi les blocs
-        # RDC/Adulte/MF du planning-type qui, eux, gardent leurs propres frontières
-        # (ex: fusionner au-delà casserait le remplissage de ces sections).
-        blocs_standards = (params['creneaux_ms'] if jour_x in ('Mercredi', 'Samedi')
-                            else params['creneaux_mjv'])
-
-        merged = []
-        for bs, be in blocs_standards:
-            # Sous-tranches Besoins_Jeunesse contenues dans ce bloc standard
-            sous = [(cs, ce, b) for (cs, ce, b) in ranges if cs >= bs and ce <= be]
-            if not sous:
-                merged.append((bs, be))
-                continue
-            cur = list(sous[0])
-            for cs, ce, b in sous[1:]:
-                if cs == cur[1] and b == cur[2]:
-                    cur[1] = ce  # même besoin ET contigu → fusion (dans ce bloc uniquement)
-                else:
-                    merged.append((cur[0], cur[1]))
-                    cur = [cs, ce, b]
-            merged.append((cur[0], cur[1]))
-        return merged
-
-    weeks_data = []
-    for semaine in calendrier:
-        week_num  = semaine['num']
-        periode   = params['semaines'].get(week_num, 'Hors Vacances scolaires')
-        week_plan = {'week_num': week_num, 'jours': []}
-
-        # Carnet de compte de l'équité HEBDOMADAIRE (08/2026) : {agent: minutes
-        # de dépassement net cumulées depuis le début de CETTE semaine}. Remis
-        # à zéro à chaque nouvelle semaine (nouvelle itération de cette boucle),
-        # mis à jour jour après jour au fur et à mesure qu'on avance dans la
-        # semaine — voir §7bis du contexte.
-        cumul_hebdo = {}
-
-        for jour_info in semaine['jours']:
-            date_str   = jour_info['date']
-            jour       = jour_info['jour']
-            sam_type   = jour_info.get('samedi_type')
-
-            # Roulement samedi (avec exceptions)
-            roulement_agents = dict(roulement_type)
-            for agent_exc, roul_exc in roulement_exceptions.get(week_num, {}).items():
-                roulement_agents[agent_exc] = roul_exc.upper()
-
-            # Période effective : le réglage par semaine (Semaine_N) sert de défaut,
-            # mais un jour marqué "vacances" dans l'onglet Jours_speciaux prime dessus
-            # (ex : un pont ponctuel en vacances au sein d'une semaine "Hors Vacances")
-            periode_effective = periode
-            js_info = jours_speciaux.get(date_str)
-            if js_info and js_info.get('vacances'):
-                periode_effective = 'Vacances Scolaires'
-
-            # Agents éligibles ce jour
-            agents_eligibles = []
-            pv = params.get('presences_vac', {})
-            use_presences = bool(pv)  # Si tableau défini → utiliser exclusivement
-            for a in agents_tous:
-                if is_vacataire(a):
-                    if use_presences:
-                        # Présence explicite uniquement
-                        if date_str in pv and a in pv[date_str]:
-                            agents_eligibles.append(a)
-                    else:
-                        # Fallback mode_vac global
-                        if jour in params['mode_vac']:
-                            agents_eligibles.append(a)
-                else:
-                    h = horaires_agents.get(a, {}).get(jour)
-                    if h and any(v is not None for v in h):
-                        agents_eligibles.append(a)
+    # Données simples (dicts/listes) : transmissible tel quel à un processus fils.
+    contexte = {
+        'params':               params,
+        'affectations':         affectations,
+        'categories':           categories,
+        'responsables':         responsables,
+        'pause_flex':           pause_flex,
+        'priorite_rdc':         priorite_rdc,
+        'horaires_agents':      horaires_agents,
+        'roulement_type':       roulement_type,
+        'roulement_exceptions': roulement_exceptions,
+        'besoins_jeunesse':     besoins_jeunesse,
+        'evenements':           evenements,
+        'planning_type':        planning_type,
+        'jours_speciaux':       jours_speciaux,
+        'agents_tous':          list(affectations.keys()),
+        'calendrier':           calendrier,
+    }
+    return contexte
 
-            # Planning type pour ce jour
-            if jour == 'Samedi' and sam_type:
-                pt_jour_key = f'Samedi_{sam_type}'
-            else:
-                pt_jour_key = jour
-            pt_jour = planning_type.get(pt_jour_key, {})
-
-            # Créneaux ouverts : grille "vacances" (fine, fusionnée, propre à ce
-            # jour) si le jour est en mode vacances (via Jours_speciaux ou
-            # Semaine_N), sinon liste standard selon le jour
-            creneaux_vacances_jour = (construire_grille_vacances_jour(jour, sam_type)
-                                       if 'Hors' not in periode_effective else [])
-            if creneaux_vacances_jour:
-                creneaux_ouverts = creneaux_vacances_jour
-            elif jour in ('Mercredi', 'Samedi'):
-                creneaux_ouverts = params['creneaux_ms']
-            else:
-                creneaux_ouverts = params['creneaux_mjv']
-
-            # Résolution CP-SAT
-            # Construire le swap_map pour ce samedi
-            # Si agent A normalement ROUGE est passé BLEU (exception) et B est passé ROUGE
-            # → B remplace A dans les slots PT de A
-            swap_map = {}
-            if jour == 'Samedi' and sam_type:
-                exc = roulement_exceptions.get(week_num, {})
-                # Agents qui ont changé de roulement ce samedi
-                vers_autre = {a: r for a, r in exc.items() if r != sam_type}  # absents
-                vers_ce_sam = {a: r for a, r in exc.items() if r == sam_type}  # présents par exception
-                # Aussi les agents dont le type normal diffère du samedi actuel
-                # absents_normal = ceux qui sont normalement de l'autre couleur MAIS
-                # ont été swappés vers ce samedi
-                normal_absents = [a for a, r in roulement_type.items()
-                                  if r != sam_type and a not in exc]
-                # Pour chaque absent normal qui a un swap entrant → construire le map
-                # Heuristique : chercher dans vers_autre si l'agent PT ROUGE est absent
-                for a_absent, r_absent in vers_autre.items():
-                    # Trouver qui l'a remplacé (celui qui est passé vers ce samedi)
-                    for a_repl, r_repl in vers_ce_sam.items():
-                        if a_absent not in swap_map:
-                            swap_map[a_absent] = a_repl
-
-            solution, alertes, depas_jour = solve_day(
-                jour=jour,
-                date_str=date_str,
-                creneaux_ouverts=creneaux_ouverts,
-                agents_eligibles=agents_eligibles,
-                affectations=affectations,
-                categories=categories,
-                responsables=responsables,
-                pause_flex=pause_flex,
-                priorite_rdc=priorite_rdc,
-                horaires_agents=horaires_agents,
-                evenements=evenements,
-                besoins_jeunesse=besoins_jeunesse,
-                planning_type_jour=pt_jour,
-                roulement_agents=roulement_agents,
-                samedi_type=sam_type,
-                periode=periode_effective,
-                mode_vac=params['mode_vac'],
-                swap_map=swap_map,
-                presences_vac=params.get('presences_vac', {}),
-                cumul_hebdo_avant=cumul_hebdo,
-            )
-
-            # Mise à jour du carnet hebdo : on ajoute le dépassement NET de ce
-            # jour à ce qui était déjà cumulé cette semaine, pour que le jour
-            # suivant en tienne compte.
-            for a, d in depas_jour.items():
-                cumul_hebdo[a] = cumul_hebdo.get(a, 0) + d
-
-            week_plan['jours'].append({
-                'date':      date_str,
-                'jour':      jour,
-                'sam_type':  sam_type,
-                'creneaux':  creneaux_ouverts,
-                'solution':  solution,   # {cren_idx: {section: [agents]}}
-                'infaisable': solution is None,
-                'alertes':   alertes,    # [(cren_idx, section, message)]
-                'cumul_hebdo_apres': dict(cumul_hebdo),  # utile pour debug/traçabilité
-            })
-
-        weeks_data.append(week_plan)
+
+class ContextePreparation:
+    """
+    Fichier de préparation chargé UNE seule fois (09/2026) : avant, generer
+    le chargeait puis en parsait une partie, compute_full_planning le
+    rechargeait et reparsait tout, et la recopie des onglets de préparation
+    pouvait le rouvrir encore — le chargement openpyxl étant le plus gros
+    coût fixe d'un petit mois. S'utilise partout où un chemin de fichier de
+    préparation est attendu (compute_full_planning, generer) et par les
+    fonctions de recopie d'onglets de generate_planning_excel_septembre.
+
+    - chemin   : fichier d'origine ;
+    - feuilles : {nom_onglet: worksheet}, cf. load_excel_data (mise en
+      forme comprise, pour les onglets recopiés tels quels) ; None si
+      lecture_seule ;
+    - donnees  : tables parsées, cf. _contexte_calcul (données simples,
+      transmissibles aux processus fils du mode parallèle) ;
+    - horaires_ouverture : cf. parse_horaires_ouverture.
+
+    lecture_seule : fichier lu en flux (cf. load_excel_data) puis refermé
+    sitôt parsé — pour les appelants qui n'ont besoin que des données
+    (compute_full_planning appelé avec un chemin, benchmarks), pas des
+    onglets à recopier.
+    """
+
+    def __init__(self, chemin, lecture_seule=False):
+        self.chemin             = chemin
+        self.feuilles           = load_excel_data(chemin, lecture_seule=lecture_seule)
+        self.donnees            = _contexte_calcul(self.feuilles)
+        self.horaires_ouverture = parse_horaires_ouverture(self.feuilles)
+        if lecture_seule:
+            for ws in self.feuilles.values():
+                ws.parent.close()
+            self.feuilles = None
+
+
+def charger_preparation(source, lecture_seule=False):
+    """ContextePreparation de `source` : chemin du fichier de préparation
+    (chargé ici, cf. ContextePreparation pour lecture_seule), ou
+    ContextePreparation déjà chargé (rendu tel quel)."""
+    if isinstance(source, ContextePreparation):
+        return source
+    return ContextePreparation(source, lecture_seule=lecture_seule)
+
+
+def agreger_profils(jours):
+    """
+    Agrège les profils de calcul d'un ensemble de jours de weeks_data (une
+    semaine, le mois) : nombre de jours, temps CP-SAT total, jours ayant
+    atteint leur plafond, jours repris (cache / calcul précédent), les 5
+    jours les plus longs, et par passe (dans l'ordre de première
+    apparition) : nombre, temps total et max, plafonds atteints, plus grand
+    écart objectif − borne prouvée (0 : optimum prouvé à chaque fois).
+    """
+    par_passe = {}
+    for jour in jours:
+        for passe in jour['profil']['passes']:
+            agregat = par_passe.setdefault(passe['passe'], {
+                'nombre': 0, 'temps': 0.0, 'temps_max': 0.0, 'plafonds': 0,
+                'ecart_max': 0.0})
+            agregat['nombre']    += 1
+            agregat['temps']     += passe['temps']
+            agregat['temps_max']  = max(agregat['temps_max'], passe['temps'])
+            agregat['plafonds']  += passe['plafond']
+            if passe['objectif'] is not None and passe['borne'] is not None:
+                agregat['ecart_max'] = max(agregat['ecart_max'],
+                                           abs(passe['objectif'] - passe['borne']))
+    return {
+        'jours':    len(jours),
+        'temps':    sum(j['temps_calcul'] for j in jours),
+        'plafonds': sum(j['plafond_atteint'] for j in jours),
+        'repris':   sum(j['en_cache'] or j['recalcul'] is None for j in jours),
+        'jours_les_plus_longs': sorted(((j['date'], j['temps_calcul']) for j in jours),
+                                       key=lambda d: -d[1])[:5],
+        'par_passe': par_passe,
+    }
+
+
+def enregistreur_profils(chemin):
+    """Puits de profils pour compute_full_planning (`profil`) : ajoute le
+    profil de chaque jour, une ligne JSON par jour, au fichier `chemin`."""
+    def enregistrer(profil_jour):
+        with open(chemin, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(profil_jour, ensure_ascii=False) + '\n')
+    return enregistrer
+
+
+def _vers_json(valeur):
+    """Valeur d'un jour du corpus en données JSON : tuples, ensembles,
+    dicts à clés non textuelles et index d'événements sont étiquetés pour
+    être restitués à l'identique par _depuis_json."""
+    if isinstance(valeur, dict):
+        if all(isinstance(cle, str) for cle in valeur):
+            return {cle: _vers_json(v) for cle, v in valeur.items()}
+        return {'__dict__': [[_vers_json(cle), _vers_json(v)] for cle, v in valeur.items()]}
+    if isinstance(valeur, list):
+        return [_vers_json(v) for v in valeur]
+    if isinstance(valeur, tuple):
+        return {'__tuple__': [_vers_json(v) for v in valeur]}
+    if isinstance(valeur, (set, frozenset)):
+        return {'__set__': [_vers_json(v) for v in sorted(valeur, key=str)]}
+    if isinstance(valeur, IndexEvenements):
+        return {'__evenements__': _vers_json(valeur.evenements)}
+    if valeur is None or isinstance(valeur, (str, int, float, bool)):
+        return valeur
+    raise TypeError(f'corpus de rejeu : type non enregistrable {type(valeur).__name__}')
+
+
+def _depuis_json(objet):
+    """object_hook de json.loads : inverse de _vers_json."""
+    if len(objet) == 1:
+        (etiquette, contenu), = objet.items()
+        if etiquette == '__tuple__':
+            return tuple(contenu)
+        if etiquette == '__set__':
+            return set(contenu)
+        if etiquette == '__dict__':
+            return {cle: v for cle, v in contenu}
+        if etiquette == '__evenements__':
+            return IndexEvenements(contenu)
+    return objet
+
+
+class EnregistreurCorpus:
+    """
+    Puits du corpus de rejeu (compute_full_planning / solve_day /
+    regenerer_jours, `enregistrement`) : ajoute chaque jour résolu au
+    fichier `chemin`, une ligne JSON par jour (cf. _vers_json), un membre
+    gzip par ligne. Chaque jour est compressé en mémoire puis écrit d'un
+    seul coup en mode ajout : les processus fils du mode parallèle peuvent
+    écrire dans le même fichier. Classe plutôt que fermeture (cf.
+    enregistreur_profils) pour pouvoir être envoyée à ces processus. Relu
+    par lire_corpus.
+
+    Le corpus ne contient que les données des jours (noms d'agents
+    compris), pas le fichier de préparation : de quoi reproduire un jour
+    lent hors de l'application (benchmarks/rejouer_corpus.py). Données
+    seules (JSON, pas pickle) : un corpus reçu peut être relu sans risque.
+    """
+
+    def __init__(self, chemin):
+        self.chemin = chemin
+
+    def __call__(self, jour):
+        ligne = json.dumps(_vers_json(jour), ensure_ascii=False) + '\n'
+        donnees = gzip.compress(ligne.encode('utf-8'))
+        with open(self.chemin, 'ab') as f:
+            f.write(donnees)
+
+
+def enregistreur_corpus(chemin):
+    """Puits du corpus de rejeu écrivant dans `chemin` (cf. EnregistreurCorpus)."""
+    return EnregistreurCorpus(chemin)
+
+
+def lire_corpus(chemin):
+    """Jours d'un corpus de rejeu (cf. EnregistreurCorpus), dans l'ordre
+    d'enregistrement."""
+    with gzip.open(chemin, 'rt', encoding='utf-8') as f:
+        for ligne in f:
+            yield json.loads(ligne, object_hook=_depuis_json)
+
+
+def compute_full_planning(filepath, parallele=False, nb_workers=None,
+                          budget_secondes=None, mode='jour', cache_solutions=None,
+                          precedent=None, portefeuille=False, profil=None,
+                          enregistrement=None):
+    """
+    Calcule le planning complet du mois.
+    Retourne (weeks_data, metadata) au même format que l'ancien moteur.
+
+    filepath   : fichier de préparation, ou ContextePreparation déjà chargé
+                 (cf. generer : le fichier n'est alors pas relu). Un chemin
+                 est lu en flux, valeurs seules (lecture_seule, cf.
+                 ContextePreparation).
+
+    parallele  : si True, chaque semaine du calendrier est résolue dans un
+                 processus séparé (les semaines sont indépendantes : le seul
+                 état enchaîné d'un jour à l'autre, cumul_hebdo, repart de
+                 zéro chaque semaine). Résultat identique au mode séquentiel,
+                 semaines remises dans l'ordre du calendrier.
+    nb_workers : nombre de processus en mode parallèle (défaut et maximum :
+                 autant que de semaines, dans la limite d'un processus par
+                 NB_CHERCHEURS_MIN cœurs du gouverneur).
+    budget_secondes : temps de calcul CP-SAT total pour le mois, réparti
+                 entre jours et passes (cf. BudgetTemps). Défaut : valeur
+                 "Budget_calcul_minutes" de l'onglet Paramètres, sinon pas de
+                 budget global (30 s par passe). Chaque jour indique ensuite
+                 s'il a atteint son plafond ('plafond_atteint').
+    mode       : 'jour' (défaut) — un modèle par jour, équité hebdomadaire
+                 enchaînée d'un jour au suivant ; 'semaine' — un seul modèle
+                 par semaine, équité optimisée sur toute la semaine d'un coup
+                 (cf. solve_week) ; 'glissant' — équité optimisée sur 2 jours,
+                 le jour courant et le lendemain, fenêtre avancée d'un jour à
+                 la fois (cf. solve_glissant) ; 'objectif_unique' —
+                 EXPÉRIMENTAL, comme 'jour' mais chaque jour en une seule
+                 résolution au lieu de 4 passes (cf. solve_day,
+                 objectif_unique). Pas plus rapide : les poids qui gardent
+                 l'ordre des niveaux sont énormes et CP-SAT prouve mal
+                 l'optimum (mois d'essai 4,7 fois plus long, plafond de 30 s
+                 atteint ; cf. benchmarks/verif_objectif_unique.py). Ne pas
+                 le choisir pour gagner du temps.
+    cache_solutions : CacheSolutions des jours déjà résolus lors d'un calcul
+                 précédent (mode 'jour'), ou chemin de son fichier. Défaut :
+                 cf. _cache_par_defaut ; False : pas de cache. Chaque jour
+                 indique s'il en a été repris ('en_cache').
+    precedent  : weeks_data d'un calcul précédent (même mois, fichier de
+                 préparation modifié depuis). Seuls sont recalculés les jours
+                 dont les données ont changé (événements, horaires,
+                 planning-type, présences... cf. _empreintes_jour) et, dans
+                 la même semaine, les jours suivants dont le cumul hebdo
+                 d'entrée en est changé, ainsi que les jours restés sans
+                 solution ou arrêtés par le temps la fois précédente ; les
+                 autres sont repris tels quels. Chaque jour indique pourquoi il a été recalculé ('recalcul',
+                 None s'il a été repris), résumé dans metadata['recalculs'].
+    portefeuille : si True, chaque jour résolu seul (modes 'jour' et
+                 'objectif_unique') lance plusieurs réglages de CP-SAT en parallèle et
+                 garde le meilleur (cf. SolveurPortefeuille) — utile sur une
+                 machine à plusieurs cœurs quand certains jours sont longs.
+    profil     : "puits" des profils de calcul — fonction appelée avec le
+                 profil de chaque jour (cf. BudgetTemps : temps, statut,
+                 objectif, borne et taille du modèle de chaque passe) dès que
+                 sa semaine est calculée ; ex. enregistreur_profils(chemin).
+                 Dans tous les cas, chaque jour garde son profil ('profil')
+                 et metadata['profil'] les agrège par semaine et pour le
+                 mois (cf. agreger_profils).
+    enregistrement : puits du corpus de rejeu (cf. solve_day) — appelé pour
+                 chaque jour résolu, avec tous ses arguments et le modèle
+                 CP-SAT de chacune de ses passes ; ex. enregistreur_corpus(
+                 chemin), rejoué par benchmarks/rejouer_corpus.py. En mode
+                 parallèle, appelé dans les processus fils (doit pouvoir
+                 leur être envoyé : EnregistreurCorpus).
+    """
+    contexte   = charger_preparation(filepath, lecture_seule=True).donnees
+    params     = contexte['params']
+    evenements = contexte['evenements']
+    calendrier = contexte['calendrier']
+    if budget_secondes is None:
+        budget_secondes = params.get('budget_calcul')
+    nb_jours = sum(len(semaine['jours']) for semaine in calendrier)
+    if cache_solutions is None:
+        cache_solutions = _cache_par_defaut()
+    elif cache_solutions is False:
+        cache_solutions = None
+    elif isinstance(cache_solutions, str):
+        cache_solutions = CacheSolutions(cache_solutions)
+    jours_precedents = {j['date']: j for w in (precedent or []) for j in w['jours']}
+    precedents = [{j['date']: jours_precedents[j['date']] for j in semaine['jours']
+                   if j['date'] in jours_precedents}
+                  for semaine in calendrier]
+
+    def emettre_profils(week_plan):
+        if profil is not None:
+            for jour in week_plan['jours']:
+                profil(jour['profil'])
+
+    if parallele and len(calendrier) > 1:
+        # Un processus par semaine (et non un thread : CP-SAT libère bien le
+        # GIL, mais toute la construction du modèle est du Python pur).
+        # Chaque solve utilise déjà plusieurs chercheurs CP-SAT : chaque
+        # processus fils ne dispose que de sa part des cœurs du gouverneur de
+        # ce processus-ci, et son gouverneur en accorde toujours au moins
+        # NB_CHERCHEURS_MIN — au-delà de capacite // NB_CHERCHEURS_MIN
+        # processus, la machine serait sur-souscrite (ex. 8 cœurs, 5
+        # semaines : 5 × 3 chercheurs sur 8 cœurs).
+        limite = max(1, min(len(calendrier), GOUVERNEUR.capacite // NB_CHERCHEURS_MIN))
+        if nb_workers is None:
+            nb_workers = limite
+        elif int(nb_workers) > limite:
+            _journal.info('Mode parallèle : %d processus demandés, ramenés à %d '
+                          '(%d cœurs, %d chercheurs minimum par résolution)',
+                          int(nb_workers), limite, GOUVERNEUR.capacite, NB_CHERCHEURS_MIN)
+            nb_workers = limite
+        nb_workers = max(1, int(nb_workers))
+        # Budget : chaque semaine reçoit une part proportionnelle à son
+        # nombre de jours (le report d'un jour facile à un jour difficile ne
+        # joue alors qu'à l'intérieur d'une même semaine).
+        budgets = [BudgetTemps(None if budget_secondes is None
+                               else budget_secondes * len(semaine['jours']) / nb_jours,
+                               len(semaine['jours']))
+                   for semaine in calendrier]
+        with ProcessPoolExecutor(max_workers=nb_workers,
+                                 initializer=configurer_gouverneur,
+                                 initargs=(max(1, GOUVERNEUR.capacite // nb_workers),)) as pool:
+            # map() restitue les résultats dans l'ordre des semaines soumises,
+            # quel que soit l'ordre dans lequel les processus terminent.
+            weeks_data = list(pool.map(_calculer_semaine, calendrier,
+                                       [contexte] * len(calendrier),
+                                       [None] * len(calendrier), budgets,
+                                       [mode] * len(calendrier),
+                                       [cache_solutions] * len(calendrier),
+                                       precedents, [portefeuille] * len(calendrier),
+                                       [enregistrement] * len(calendrier)))
+        for week_plan in weeks_data:
+            emettre_profils(week_plan)
+    else:
+        # Un seul cache de modèles pour tout le mois : chaque combinaison
+        # (jour, samedi, période...) n'est construite qu'une fois. En mode
+        # parallèle, chaque processus garde le sien (les modèles ne se
+        # partagent pas d'un processus à l'autre).
+        gabarits = {}
+        budget = BudgetTemps(budget_secondes, nb_jours)
+        weeks_data = []
+        for semaine, precedents_semaine in zip(calendrier, precedents):
+            weeks_data.append(_calculer_semaine(semaine, contexte, gabarits, budget, mode,
+                                                cache_solutions, precedents_semaine,
+                                                portefeuille, enregistrement))
+            emettre_profils(weeks_data[-1])
 
     metadata = {
         'mois':       params['mois'],
         'annee':      params['annee'],
-        'evenements': evenements,
+        'evenements': evenements.evenements,
+        'recalculs':  [(j['date'], j['recalcul']) for w in weeks_data for j in w['jours']
+                       if j['recalcul'] is not None],
+        'profil':     {
+            'mois':     agreger_profils([j for w in weeks_data for j in w['jours']]),
+            'semaines': [dict(agreger_profils(w['jours']), semaine=w['week_num'])
+                         for w in weeks_data],
+        },
     }
+    if precedent is not None:
+        _journal.info('Recalcul incrémental : %d jour(s) recalculé(s) sur %d — %s',
+                      len(metadata['recalculs']), nb_jours,
+                      '; '.join(f'{d} ({r})' for d, r in metadata['recalculs']) or 'aucun')
 
     return weeks_data, metadata
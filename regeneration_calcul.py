@@ -105,7 +105,7 @@ def _construire_swap_map(jour_cap, sam_type, semaine_num, roulement_type, roulem
 #  BRIQUE 2 — POINT D'ENTRÉE
 # ─────────────────────────────────────────────────────────────
 
-def regenerer_jours(lecture_resultat, cumul_hebdo_initial=None):
+def regenerer_jours(lecture_resultat, cumul_hebdo_initial=None, enregistrement=None):
     """
     - lecture_resultat : sortie de lire_planning_pour_regeneration() (brique 1).
     - cumul_hebdo_initial : {agent: minutes} — compteur d'équité hebdomadaire
@@ -115,6 +115,9 @@ def regenerer_jours(lecture_resultat, cumul_hebdo_initial=None):
       semaine restent fixes), il n'y a pas aujourd'hui de moyen fiable de
       reconstituer ce compteur à partir du fichier Excel déjà rempli (cette
       information n'y est pas conservée) — limite déjà signalée.
+    - enregistrement : puits du corpus de rejeu, transmis tel quel à
+      solve_day (ex. planning_engine_cpsat.enregistreur_corpus(chemin)) —
+      chaque jour régénéré y est ajouté avec tous ses arguments.
 
     Ne bloque PAS sur les conflits détectés dans la zone à régénérer (choix
     explicite du 20/08) : le calcul tourne quand même, les données déjà
@@ -237,6 +240,7 @@ def regenerer_jours(lecture_resultat, cumul_hebdo_initial=None):
             swap_map=swap_map,
             presences_vac=presences_vac,
             cumul_hebdo_avant=cumul_hebdo,
+            enregistrement=enregistrement,
         )
 
         for a, d in depas_jour.items():
@@ -43,9 +43,7 @@ from planning_checker import (
     charger_donnees_preparation, JOUR_CAPITALISE,
     est_ignore, est_eloise, ALL_AGENTS_CONNUS,
 )
-
-import openpyxl
-from io import BytesIO
+from lecture_xlsx import ouvrir_classeur
 
 
 # Types d'occurrence qui viennent des colonnes B à G (affectation de service
@@ -119,7 +117,7 @@ def lire_planning_pour_regeneration(file_bytes, semaine_num, jours_a_regenerer):
 
     Ne modifie rien, ne recalcule rien — lecture seule.
     """
-    wb = openpyxl.load_workbook(BytesIO(file_bytes), data_only=True)
+    wb = ouvrir_classeur(file_bytes)  # valeurs seules, cf. lecture_xlsx
 
     nom_onglet = f'Semaine_{semaine_num}'
     if nom_onglet not in wb.sheetnames: